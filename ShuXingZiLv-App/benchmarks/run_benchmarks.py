@@ -0,0 +1,303 @@
+"""
+数据层/目标树基准测试
+
+用法（在ShuXingZiLv-App目录下运行）：
+    python -m benchmarks.run_benchmarks                       # 默认规模：1千/1万/10万个目标
+    python -m benchmarks.run_benchmarks --targets 5000 --depth 6 --fanout 3 --repeat 10
+    python -m benchmarks.run_benchmarks --compare             # 与results.jsonl中上一次同配置的结果对比
+    python benchmarks/run_benchmarks.py                       # 也可以直接按脚本运行（自动把应用目录加入导入路径）
+
+每个规模在独立的子进程和临时数据目录（环境变量SHUXING_DATA_DIR）中运行，不会读写真实数据；
+结果每个规模追加一行JSON到输出文件（默认benchmarks/results.jsonl，已在.gitignore中忽略），便于回归对比
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.jsonl")
+if not __package__:
+    sys.path.insert(0, APP_DIR)  # 按脚本运行时，utils/benchmarks等包相对应用目录导入
+RESULT_PREFIX = "BENCH_RESULT "  # 子进程输出结果行的前缀（应用本身也会打印日志）
+REGRESSION_THRESHOLD = 0.2  # 对比时中位数变慢超过20%标记为回归
+
+# ==================== 默认配置 ====================
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_CONFIG = {
+    "depth": 5,  # 目标树最大层数
+    "fanout": 4,  # 每个目标的子任务数
+    "points_records": 50000,  # 积分流水条数
+    "rating_systems": 3,  # 评价体系数
+    "abilities": 200,  # 每个评价体系的能力项数
+    "growth_records": 2000,  # 成长记录条数
+    "history_points": 100000,  # 第一个能力项的能力值历史记录条数
+    "repeat": 5,  # 每项操作的重复次数（取中位数/最小值）
+    "seed": 0,
+}
+
+
+# ==================== 子进程：实际计时 ====================
+class Timer:
+    def __init__(self, repeat: int):
+        self.repeat = repeat
+        self.results: Dict[str, Dict] = {}
+
+    def run(self, name: str, func: Callable, setup: Callable = None, repeat: int = None):
+        """每次计时前调用setup（不计入耗时），记录各次耗时的最小值和中位数"""
+        runs = []
+        for _ in range(repeat or self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            runs.append((time.perf_counter() - start) * 1000)
+        self.results[name] = {
+            "min_ms": round(min(runs), 3),
+            "median_ms": round(statistics.median(runs), 3),
+            "runs": len(runs),
+        }
+        print(f"    {name:<28}{self.results[name]['median_ms']:10.2f} ms", file=sys.stderr)
+
+
+def _deepest_leaf(index) -> List[str]:
+    """返回最深叶子节点的路径（根 -> 叶子）"""
+    best = []
+    for root in index.roots():
+        stack = [[root["id"]]]
+        while stack:
+            path = stack.pop()
+            children = index.children_of(path[-1])
+            if not children and len(path) > len(best):
+                best = path
+            stack.extend(path + [child["id"]] for child in children)
+    return best
+
+
+def _largest_root(index) -> str:
+    return max(index.roots(), key=lambda t: index.subtree_size(t["id"]))["id"]
+
+
+def run_child(config: Dict):
+    """在临时数据目录中计时（由父进程通过环境变量指定目录）"""
+    from PyQt6.QtWidgets import QApplication, QMessageBox
+    app = QApplication.instance() or QApplication([sys.argv[0], "-platform", "offscreen"])
+    import utils.data_handler as dh
+    from utils.target_index import TargetIndex
+    from utils.search_index import SearchIndex
+    from utils.deadline_index import DeadlineIndex
+    from ui import target_manager
+    from ui.target_manager import TargetManager
+    from ui.save_worker import get_save_queue
+
+    timer = Timer(config["repeat"])
+    with open(dh.USER_DATA_PATH, "r", encoding="utf-8") as f:
+        raw = f.read()
+
+    # 1. 数据读写
+    docs = []
+    timer.run("migrate_data", lambda: dh.migrate_data(docs[-1]), setup=lambda: docs.append(json.loads(raw)))
+    docs.clear()
+    timer.run("read_data_first", dh.read_data, setup=dh.data_store.invalidate, repeat=1)  # 含迁移（写回交给落盘任务）
+    timer.run("read_data_cold", dh.read_data, setup=dh.data_store.invalidate)
+    timer.run("read_data_warm", dh.read_data)
+    data = dh.read_data()
+    timer.run("write_data_full", lambda: dh.write_data(data))
+    timer.run("write_data_append", lambda: dh.write_data(data),
+              setup=lambda: dh.add_points_record(data, 10, "基准测试"))
+    timer.run("snapshot", dh.data_store.snapshot)
+
+    # 2. 索引
+    timer.run("target_index_build", lambda: TargetIndex(data["targets"]))
+    timer.run("search_index_build", lambda: SearchIndex(data["targets"]))
+    timer.run("search_query", lambda: dh.search_targets("Python基础"), setup=dh.get_search_index)
+    timer.run("deadline_index_build", lambda: DeadlineIndex(data["targets"]))
+    timer.run("deadline_overdue", dh.get_overdue_targets, setup=dh.get_deadline_index)
+
+    # 子树汇总：整体自底向上构建；单个叶子目标完成状态变化时沿祖先路径增量更新
+    from utils.target_aggregates import TargetAggregates
+    timer.run("aggregate_build", lambda: TargetAggregates(data["targets"]))
+    aggregates = dh.get_target_aggregates()
+    leaf = dh.get_target_index().get(_deepest_leaf(dh.get_target_index())[-1])
+
+    def toggle_leaf():
+        leaf["status"] = "未开始" if leaf["status"] == "已完成" else "已完成"
+        aggregates.add_item(leaf)
+    timer.run("aggregate_update_leaf", toggle_leaf)
+
+    # 能力值历史：第一个能力项有config["history_points"]条记录（由父进程生成），按800像素宽度降采样
+    from utils.ability_history import AbilityHistory, DOWNSAMPLE_MINMAX
+    ability_id = data["rating_systems"][0]["abilities"][0]["id"]
+    timer.run("history_load", lambda: AbilityHistory(dh.ABILITY_HISTORY_PATH).count(ability_id))
+    history = dh.get_ability_history()
+    timer.run("history_lttb_800px", lambda: history.downsampled(ability_id, 800))
+    timer.run("history_minmax_800px", lambda: history.downsampled(ability_id, 800, DOWNSAMPLE_MINMAX))
+
+    # 3. 目标树（与页面中的调用路径一致）
+    managers = []
+    timer.run("create_target_manager", lambda: managers.append(TargetManager()), repeat=1)
+    manager = managers[-1]
+    model = manager.tree_model
+    timer.run("load_targets", manager.load_targets)
+
+    def expand_all():
+        from PyQt6.QtCore import QModelIndex
+        stack = [QModelIndex()]
+        while stack:
+            parent = stack.pop()
+            while model.canFetchMore(parent):
+                model.fetchMore(parent)
+            stack.extend(model.index(row, 0, parent) for row in range(model.rowCount(parent)))
+    timer.run("expand_all", expand_all, setup=manager.load_targets)
+
+    # 完成最深叶子：路径上每一层的兄弟都已完成，逐级自动完成到根目标
+    index = dh.get_target_index()
+    path = _deepest_leaf(index)
+
+    def prepare_cascade():
+        for target_id in path:
+            for sibling in index.children_of(index.get(target_id)["parent_id"]):
+                sibling["status"] = "已完成"
+        for target_id in path:
+            index.get(target_id)["status"] = "未开始"
+    timer.run("cascade_complete_leaf", lambda: manager.on_button_status_toggle(path[-1]), setup=prepare_cascade)
+
+    # 取消完成最大的根目标：重置整棵子树
+    root_id = _largest_root(index)
+
+    def prepare_reset():
+        for target in index.iter_subtree(root_id):
+            target["status"] = "已完成"
+    timer.run("cascade_reset_root", lambda: manager.on_button_status_toggle(root_id), setup=prepare_reset)
+
+    # 递归删除最大的根目标（跳过确认对话框）；每次从磁盘重新加载原始数据
+    target_manager.QMessageBox.question = staticmethod(lambda *args, **kwargs: QMessageBox.StandardButton.Yes)
+
+    def prepare_delete():
+        dh.data_store.invalidate()
+        manager.load_targets()
+        manager.locate_target(_largest_root(dh.get_target_index()))
+    timer.run("recursive_delete", manager.delete_target, setup=prepare_delete)
+
+    get_save_queue().shutdown()
+    dh.data_store.invalidate()  # 删除操作未保存，不需要落盘
+    return {
+        "file_size_bytes": os.path.getsize(dh.USER_DATA_PATH),
+        "deepest_path": len(path),
+        "results": timer.results,
+    }
+
+
+# ==================== 父进程：生成数据、汇总结果 ====================
+def run_size(targets: int, config: Dict, keep: bool) -> Dict:
+    from benchmarks.synthetic_data import generate_document, write_document, write_ability_history
+    data_dir = tempfile.mkdtemp(prefix="shuxing_bench_")
+    try:
+        document = generate_document(targets=targets, depth=config["depth"], fanout=config["fanout"],
+                                     points_records=config["points_records"],
+                                     rating_systems=config["rating_systems"], abilities=config["abilities"],
+                                     growth_records=config["growth_records"], seed=config["seed"])
+        write_document(os.path.join(data_dir, "user_data.json"), document)
+        if document["rating_systems"] and document["rating_systems"][0]["abilities"]:
+            write_ability_history(os.path.join(data_dir, "ability_history.bin"),
+                                  document["rating_systems"][0]["abilities"][0]["id"],
+                                  config["history_points"], config["seed"])
+        env = dict(os.environ, SHUXING_DATA_DIR=data_dir, QT_QPA_PLATFORM="offscreen")
+        child_config = dict(config, targets=targets)
+        proc = subprocess.run([sys.executable, "-m", "benchmarks.run_benchmarks", "--child", json.dumps(child_config)],
+                              cwd=APP_DIR, env=env, stdout=subprocess.PIPE, text=True, encoding="utf-8")
+        lines = [line for line in proc.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+        if proc.returncode != 0 or not lines:
+            raise RuntimeError(f"基准测试子进程失败（退出码 {proc.returncode}）")
+        result = json.loads(lines[-1][len(RESULT_PREFIX):])
+    finally:
+        if keep:
+            print(f"📁 数据目录已保留：{data_dir}")
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return {
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": child_config,
+        **result,
+    }
+
+
+def load_previous(path: str, config: Dict) -> Optional[Dict]:
+    """结果文件中最近一次相同配置的记录"""
+    previous = None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("config") == config:
+                    previous = record
+    except OSError:
+        pass
+    return previous
+
+
+def compare(previous: Dict, current: Dict):
+    print(f"    与 {previous['time']} 的结果对比（中位数）：")
+    for name, now in current["results"].items():
+        before = previous["results"].get(name)
+        if not before or not before["median_ms"]:
+            continue
+        change = now["median_ms"] / before["median_ms"] - 1
+        mark = "⚠️ " if change > REGRESSION_THRESHOLD else "  "
+        print(f"    {mark}{name:<28}{before['median_ms']:10.2f} -> {now['median_ms']:10.2f} ms ({change:+.0%})")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="数据层/目标树基准测试")
+    parser.add_argument("--targets", type=int, nargs="+", default=DEFAULT_SIZES, help="目标数量（可多个）")
+    parser.add_argument("--depth", type=int, default=DEFAULT_CONFIG["depth"])
+    parser.add_argument("--fanout", type=int, default=DEFAULT_CONFIG["fanout"])
+    parser.add_argument("--points-records", type=int, default=DEFAULT_CONFIG["points_records"])
+    parser.add_argument("--rating-systems", type=int, default=DEFAULT_CONFIG["rating_systems"])
+    parser.add_argument("--abilities", type=int, default=DEFAULT_CONFIG["abilities"])
+    parser.add_argument("--growth-records", type=int, default=DEFAULT_CONFIG["growth_records"])
+    parser.add_argument("--history-points", type=int, default=DEFAULT_CONFIG["history_points"])
+    parser.add_argument("--repeat", type=int, default=DEFAULT_CONFIG["repeat"])
+    parser.add_argument("--seed", type=int, default=DEFAULT_CONFIG["seed"])
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="结果文件（JSON lines，追加写入）")
+    parser.add_argument("--compare", action="store_true", help="与结果文件中上一次同配置的结果对比")
+    parser.add_argument("--keep", action="store_true", help="保留生成的临时数据目录")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(RESULT_PREFIX + json.dumps(run_child(json.loads(args.child)), ensure_ascii=False))
+        return 0
+
+    config = {key: getattr(args, key) for key in DEFAULT_CONFIG}
+    for targets in args.targets:
+        print(f"⏱️  {targets} 个目标（深度 {args.depth}，子任务数 {args.fanout}）：", flush=True)
+        try:
+            record = run_size(targets, config, args.keep)
+        except Exception as e:
+            print(f"❌ {str(e)}")
+            return 1
+        previous = load_previous(args.output, record["config"]) if args.compare else None
+        if previous:
+            compare(previous, record)
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"✅ 结果已追加到 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import json
+import random
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+# ==================== 生成配置 ====================
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+START_TIME = datetime(2024, 1, 1, 8, 0, 0)  # 积分流水/成长记录的起始时间（固定，保证可复现）
+NAME_WORDS = ["完成", "Python", "基础", "学习", "每天", "运动", "30分钟", "阅读", "英语", "单词",
+              "项目", "复习", "数学", "写作", "早起", "健身", "整理", "笔记", "练习", "算法"]
+DONE_RATIO = 0.3  # 已完成目标的比例
+
+
+def generate_targets(count: int, depth: int, fanout: int, rng: random.Random) -> List[Dict]:
+    """
+    生成count个目标：每棵树按广度优先展开，最多depth层、每个节点fanout个子任务，
+    一棵树填满后再开新的根目标（与旧版数据一样带reward_points字段，不带schema_version）
+    """
+    targets = []
+
+    def make(parent_id: str, level: int) -> Dict:
+        points = rng.choice([5, 10, 20, 30, 50])
+        deadline = (START_TIME + timedelta(days=rng.randint(-90, 365))).strftime("%Y-%m-%d")
+        target = {
+            "id": f"target_{len(targets):08x}",
+            "name": "".join(rng.sample(NAME_WORDS, 3)) + f"-{len(targets)}",
+            "deadline": deadline,
+            "status": "已完成" if rng.random() < DONE_RATIO else "未开始",
+            "reward_points": points,
+            "parent_id": parent_id,
+            "points": points,
+        }
+        targets.append(target)
+        return target
+
+    while len(targets) < count:
+        frontier = deque([(make("root", 1), 1)])
+        while frontier and len(targets) < count:
+            parent, level = frontier.popleft()
+            if level >= depth:
+                continue
+            for _ in range(fanout):
+                if len(targets) >= count:
+                    break
+                frontier.append((make(parent["id"], level + 1), level + 1))
+    return targets
+
+
+def generate_points_records(count: int, targets: List[Dict], rng: random.Random) -> List[Dict]:
+    """生成按时间递增的积分流水（完成/取消完成任务）"""
+    records = []
+    when = START_TIME
+    for _ in range(count):
+        when += timedelta(seconds=rng.randint(60, 7200))
+        target = rng.choice(targets) if targets else {"id": None, "name": "", "points": 10}
+        sign = 1 if rng.random() < 0.85 else -1
+        records.append({
+            "time": when.strftime(TIME_FORMAT),
+            "reason": f"{'完成' if sign > 0 else '取消完成'}任务：{target['name']}",
+            "points": sign * target["points"],
+            "target_id": target["id"],
+        })
+    return records
+
+
+def generate_rating_systems(systems: int, abilities: int, rng: random.Random) -> List[Dict]:
+    rank_rules = [
+        {"rank": "S", "min": 90, "max": 100},
+        {"rank": "A", "min": 80, "max": 89},
+        {"rank": "B", "min": 70, "max": 79},
+        {"rank": "C", "min": 60, "max": 69},
+        {"rank": "D", "min": 50, "max": 59},
+        {"rank": "E", "min": 40, "max": 49},
+        {"rank": "F", "min": 0, "max": 39},
+    ]
+    return [{
+        "id": f"rating_{s:08x}",
+        "name": f"评价体系{s + 1}",
+        "abilities": [{"id": f"ability_{s:04x}{a:04x}", "name": f"能力{a + 1}",
+                       "value": round(rng.uniform(0, 100), 1)} for a in range(abilities)],
+        "rank_rules": [dict(rule) for rule in rank_rules],
+    } for s in range(systems)]
+
+
+def generate_growth_records(count: int, rng: random.Random) -> List[Dict]:
+    when = START_TIME
+    records = []
+    for i in range(count):
+        when += timedelta(hours=rng.randint(1, 48))
+        records.append({
+            "id": f"record_{i:08x}",
+            "time": when.strftime(TIME_FORMAT),
+            "content": "今天" + "，".join(rng.sample(NAME_WORDS, 5)),
+            "images": [],
+        })
+    return records
+
+
+def generate_document(targets: int = 1000, depth: int = 4, fanout: int = 5, points_records: int = 10000,
+                      rating_systems: int = 3, abilities: int = 50, growth_records: int = 1000,
+                      seed: int = 0) -> Dict:
+    """生成旧版格式（schema_version 0）的完整文档，读取时会走一遍数据迁移"""
+    rng = random.Random(seed)
+    target_list = generate_targets(targets, depth, fanout, rng)
+    records = generate_points_records(points_records, target_list, rng)
+    return {
+        "targets": target_list,
+        "rating_systems": generate_rating_systems(rating_systems, abilities, rng),
+        "growth_records": generate_growth_records(growth_records, rng),
+        "points_account": {"total": sum(r["points"] for r in records), "records": records},
+    }
+
+
+def write_document(path: str, document: Dict):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+
+
+def write_ability_history(path: str, ability_id: str, points: int, seed: int = 0):
+    """生成一个能力项每小时一条的能力值历史（能力值历史文件格式见utils.ability_history）"""
+    import numpy as np
+    from utils.ability_history import HEADER, MAGIC, VERSION, RECORD_DTYPE
+    rng = np.random.default_rng(seed)
+    records = np.zeros(points, dtype=RECORD_DTYPE)
+    records["time"] = int(START_TIME.timestamp()) + np.arange(points, dtype=np.int64) * 3600
+    records["value"] = np.clip(50 + np.cumsum(rng.normal(0, 0.5, points)), 0, 100)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0))
+        f.write(records.tobytes())
+    with open(path[:-len(".bin")] + ".names.jsonl", "w", encoding="utf-8") as f:
+        f.write(json.dumps(ability_id) + "\n")
@@ -1,29 +1,45 @@
+from utils.startup_timer import startup_timer  # 最先导入，作为启动计时起点
+import os
 import sys
 import warnings
-import matplotlib
 
 warnings.filterwarnings('ignore', category=DeprecationWarning, module='PyQt6.QtCore')
 warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
 
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                             QHBoxLayout, QPushButton, QStackedWidget)
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPalette, QColor
+with startup_timer.measure("import PyQt6"):
+    from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
+                                 QHBoxLayout, QPushButton, QStackedWidget, QMessageBox)
+    from PyQt6.QtCore import Qt, QObject, QEvent
+    from PyQt6.QtGui import QPalette, QColor
 
-# 集成 Matplotlib QT 后端
-import matplotlib
+# 导入页面组件（能力评价页依赖matplotlib/numpy，首次打开时才导入）
+with startup_timer.measure("import utils.data_handler"):
+    from utils.data_handler import DATA_DIR
+    from utils.image_store import GC_BUCKETS_PER_RUN
+with startup_timer.measure("import ui.target_manager"):
+    from ui.target_manager import TargetManager
+from ui.save_worker import get_save_queue
 
-matplotlib.use('QtAgg')
+STARTUP_LOG_PATH = os.path.join(DATA_DIR, "startup_timing.jsonl")  # 启动耗时记录（每次启动追加一行）
 
-# 导入页面组件（新增RatingManager）
-from ui.target_manager import TargetManager
-from ui.rating_manager import RatingManager
+
+class FirstPaintWatcher(QObject):
+    """监听主窗口的第一次绘制，记录首帧时间并输出启动耗时统计"""
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and not startup_timer.reported:
+            startup_timer.mark("first_paint")
+            obj.removeEventFilter(self)
+            startup_timer.report(STARTUP_LOG_PATH)
+        return False
 
 
 class TreeSelfDisciplineApp(QMainWindow):
     def __init__(self):
         super().__init__()
         self.init_ui()
+        # 后台保存失败时统一提示
+        get_save_queue().save_failed.connect(self.on_save_failed)
 
     def init_ui(self):
         # 1. 主窗口基础设置
@@ -62,21 +78,20 @@ class TreeSelfDisciplineApp(QMainWindow):
             nav_layout.addWidget(btn, stretch=1)
 
         main_layout.addLayout(nav_layout)
-        self.set_selected_button(0)
+        self.switch_page(0)  # 创建并显示默认页面
 
     def init_pages(self):
-        """初始化页面（核心修改：添加实际功能页面）"""
-        # 页面1：目标管理（已实现）
-        self.target_page = TargetManager()
-        self.stacked_widget.addWidget(self.target_page)
-
-        # 页面2：能力评价（本次新增）
-        self.rating_page = RatingManager()
-        self.stacked_widget.addWidget(self.rating_page)
-
-        # 页面3-4：空白占位页面（后续开发）
+        """初始化页面：功能页面先放占位控件，首次切换到该页时才真正创建（加快启动）"""
+        # 页面1：目标管理；页面2：能力评价；页面3：成长记录
+        self.target_page = None
+        self.rating_page = None
+        self.growth_page = None
+        self.page_factories = {0: self.create_target_page, 1: self.create_rating_page, 2: self.create_growth_page}
+        for _ in self.page_factories:
+            self.stacked_widget.addWidget(QWidget())
+
+        # 页面4：空白占位页面（后续开发）
         page_colors = [
-            QColor(242, 243, 244),  # 成长记录页面
             QColor(239, 240, 241)  # 自律管控页面
         ]
 
@@ -113,7 +128,38 @@ class TreeSelfDisciplineApp(QMainWindow):
         btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         return btn
 
+    def create_target_page(self):
+        with startup_timer.measure("create TargetManager"):
+            self.target_page = TargetManager()
+        return self.target_page
+
+    def create_rating_page(self):
+        # 首次打开能力评价页时才导入matplotlib/numpy
+        with startup_timer.measure("import ui.rating_manager"):
+            from ui.rating_manager import RatingManager
+        with startup_timer.measure("create RatingManager"):
+            self.rating_page = RatingManager()
+        return self.rating_page
+
+    def create_growth_page(self):
+        with startup_timer.measure("import ui.growth_manager"):
+            from ui.growth_manager import GrowthManager
+        with startup_timer.measure("create GrowthManager"):
+            self.growth_page = GrowthManager()
+        return self.growth_page
+
+    def ensure_page(self, index):
+        """页面未创建时，创建并替换掉占位控件"""
+        factory = self.page_factories.pop(index, None)
+        if factory is None:
+            return
+        placeholder = self.stacked_widget.widget(index)
+        self.stacked_widget.insertWidget(index, factory())
+        self.stacked_widget.removeWidget(placeholder)
+        placeholder.deleteLater()
+
     def switch_page(self, index):
+        self.ensure_page(index)
         self.stacked_widget.setCurrentIndex(index)
         self.set_selected_button(index)
 
@@ -121,6 +167,9 @@ class TreeSelfDisciplineApp(QMainWindow):
         for i, btn in enumerate(self.nav_buttons):
             btn.setChecked(i == index)
 
+    def on_save_failed(self, error):
+        QMessageBox.warning(self, "保存失败", f"数据写入错误：{error}")
+
     def center_window(self):
         screen_geometry = QApplication.primaryScreen().availableGeometry()
         window_geometry = self.frameGeometry()
@@ -128,8 +177,22 @@ class TreeSelfDisciplineApp(QMainWindow):
         self.move(window_geometry.topLeft())
 
 
+def run_image_gc(argv) -> int:
+    """命令行回收没有被成长记录引用的图片：python main.py --gc-images [--all]（默认只扫描少量分片）"""
+    from utils.data_handler import collect_image_garbage
+    stats = collect_image_garbage(-1 if "--all" in argv else GC_BUCKETS_PER_RUN)
+    print(f"🧹 图片回收完成：扫描 {stats['scanned_buckets']} 个分片，删除 {stats['deleted']} 个文件，"
+          f"释放 {stats['freed_bytes'] / 1024 / 1024:.2f} MB")
+    return 0
+
+
 if __name__ == "__main__":
+    if "--gc-images" in sys.argv:
+        sys.exit(run_image_gc(sys.argv))
     app = QApplication(sys.argv)
+    startup_timer.mark("qapplication_ready")
     window = TreeSelfDisciplineApp()
+    first_paint_watcher = FirstPaintWatcher()
+    window.installEventFilter(first_paint_watcher)
     window.show()
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,227 @@
+from typing import Callable, Dict, List
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QDoubleSpinBox
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QRectF, QEvent, QSize, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QPen
+
+
+class AbilityListModel(QAbstractListModel):
+    """
+    能力项列表模型：直接引用评分系统中的abilities列表，单个数值变化时只刷新对应行
+    批量编辑模式下修改的数值先暂存在pending中（显示暂存值，不改abilities），应用时一次写回
+    """
+    IdRole = Qt.ItemDataRole.UserRole
+    ValueRole = Qt.ItemDataRole.UserRole + 1
+    RankRole = Qt.ItemDataRole.UserRole + 2
+    PendingRole = Qt.ItemDataRole.UserRole + 3
+
+    value_edited = pyqtSignal(str, float)  # (能力项id, 新数值)
+
+    def __init__(self, rank_func: Callable[[float], str], parent=None):
+        super().__init__(parent)
+        self.rank_func = rank_func  # 数值 -> 段位
+        self.abilities: List[Dict] = []
+        self._rows: Dict[str, int] = {}  # 能力项id -> 行号
+        self.pending: Dict[str, float] = {}  # 批量编辑中暂存的数值：能力项id -> 新数值
+
+    def set_abilities(self, abilities: List[Dict]):
+        """切换/重新加载能力项列表"""
+        self.beginResetModel()
+        self.abilities = abilities
+        self.pending = {}
+        self._reindex()
+        self.endResetModel()
+
+    def _reindex(self):
+        self._rows = {ability["id"]: row for row, ability in enumerate(self.abilities)}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.abilities)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.abilities):
+            return None
+        ability = self.abilities[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return ability["name"]
+        if role in (self.ValueRole, Qt.ItemDataRole.EditRole):
+            return float(self.pending.get(ability["id"], ability["value"]))
+        if role == self.RankRole:
+            return self.rank_func(self.pending.get(ability["id"], ability["value"]))
+        if role == self.IdRole:
+            return ability["id"]
+        if role == self.PendingRole:
+            return ability["id"] in self.pending
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        # 不直接改数据，交给页面统一处理（取整、保存、刷新图表）
+        if role == Qt.ItemDataRole.EditRole and index.isValid():
+            self.value_edited.emit(self.abilities[index.row()]["id"], float(value))
+            return True
+        return False
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable
+
+    # ==================== 增量更新 ====================
+    def refresh_ability(self, ability_id: str):
+        """某个能力项的数值/段位变化后只重绘该行"""
+        row = self._rows.get(ability_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def refresh_all(self):
+        """段位规则变化后重绘所有行（行数不变，不重建）"""
+        if self.abilities:
+            self.dataChanged.emit(self.index(0), self.index(len(self.abilities) - 1))
+
+    def set_pending(self, ability_id: str, value: float):
+        """批量编辑：暂存一个能力项的新数值（与当前值相同时取消暂存）"""
+        row = self._rows.get(ability_id)
+        if row is None:
+            return
+        if value == self.abilities[row]["value"]:
+            self.pending.pop(ability_id, None)
+        else:
+            self.pending[ability_id] = value
+        self.refresh_ability(ability_id)
+
+    def take_pending(self) -> Dict[str, float]:
+        """取出并清空暂存的数值（调用方负责写回abilities后刷新）"""
+        pending, self.pending = self.pending, {}
+        return pending
+
+    def ability_appended(self):
+        """abilities列表末尾新增了一项后调用"""
+        row = len(self.abilities) - 1
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows[self.abilities[row]["id"]] = row
+        self.endInsertRows()
+
+    def remove_ability(self, ability_id: str):
+        """从abilities列表中删除能力项并移除对应行"""
+        row = self._rows.get(ability_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.abilities[row]
+        self.pending.pop(ability_id, None)
+        self._reindex()
+        self.endRemoveRows()
+
+
+class AbilityItemDelegate(QStyledItemDelegate):
+    """
+    绘制能力项行（名称、数值、段位标签、删除按钮），不为每一行创建控件；
+    只有正在编辑的行才创建QDoubleSpinBox
+    """
+    delete_clicked = pyqtSignal(str, str)  # (能力项id, 能力项名称)
+
+    ROW_HEIGHT = 60
+    MARGIN_H, MARGIN_V, SPACING = 15, 10, 15
+    NAME_WIDTH, VALUE_WIDTH, RANK_WIDTH, RANK_HEIGHT = 100, 90, 112, 36
+    DELETE_SIZE = (70, 30)
+
+    def __init__(self, color_func: Callable[[str], str], border_color_func: Callable[[str], str], parent=None):
+        super().__init__(parent)
+        self.color_func = color_func  # 段位 -> 背景色
+        self.border_color_func = border_color_func  # 段位 -> 边框色
+        self.item_font = QFont("Microsoft YaHei", 10)
+        self.rank_font = QFont("Microsoft YaHei", 11, QFont.Weight.Bold)
+
+    def _rects(self, cell: QRect):
+        """计算行内各区域（与原先的水平布局一致）"""
+        content = cell.adjusted(self.MARGIN_H, self.MARGIN_V, -self.MARGIN_H, -self.MARGIN_V)
+        center_y = content.center().y()
+        x = content.x()
+        name_rect = QRect(x, content.y(), self.NAME_WIDTH, content.height())
+        x += self.NAME_WIDTH + self.SPACING
+        value_rect = QRect(x, center_y - 14, self.VALUE_WIDTH, 28)
+        x += self.VALUE_WIDTH + self.SPACING
+        rank_rect = QRect(x, center_y - self.RANK_HEIGHT // 2, self.RANK_WIDTH, self.RANK_HEIGHT)
+        delete_w, delete_h = self.DELETE_SIZE
+        # 删除按钮靠右；空间不足时紧跟段位标签（超出部分被裁剪，不与段位标签重叠）
+        delete_x = max(rank_rect.right() + 1 + self.SPACING, content.right() - delete_w + 1)
+        delete_rect = QRect(delete_x, center_y - delete_h // 2, delete_w, delete_h)
+        return name_rect, value_rect, rank_rect, delete_rect
+
+    def sizeHint(self, option, index):
+        return QSize(0, self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        # 背景（悬停/选中）交给样式绘制
+        self.initStyleOption(option, index)
+        option.text = ""
+        option.widget.style().drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        name_rect, value_rect, rank_rect, delete_rect = self._rects(option.rect)
+        rank = index.data(AbilityListModel.RankRole)
+
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setFont(self.item_font)
+
+        # 能力名称
+        painter.setPen(QColor("#333"))
+        painter.drawText(name_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         painter.fontMetrics().elidedText(index.data(), Qt.TextElideMode.ElideRight,
+                                                          name_rect.width()))
+
+        # 能力数值（外观与数值输入框一致，点击后才创建真正的输入框；批量编辑中未应用的数值用橙色边框）
+        painter.setPen(QPen(QColor("#FF9800"), 2) if index.data(AbilityListModel.PendingRole)
+                       else QPen(QColor("#bdbdbd")))
+        painter.setBrush(QColor("white"))
+        painter.drawRoundedRect(QRectF(value_rect).adjusted(0.5, 0.5, -0.5, -0.5), 3, 3)
+        painter.setPen(QColor("#333"))
+        painter.drawText(value_rect, Qt.AlignmentFlag.AlignCenter, f"{index.data(AbilityListModel.ValueRole):.2f}")
+
+        # 段位标签
+        painter.setPen(QPen(QColor(self.border_color_func(rank)), 2))
+        painter.setBrush(QColor(self.color_func(rank)))
+        painter.drawRoundedRect(QRectF(rank_rect).adjusted(1, 1, -1, -1), 8, 8)
+        painter.setFont(self.rank_font)
+        painter.setPen(QColor("white"))
+        painter.drawText(rank_rect, Qt.AlignmentFlag.AlignCenter, f"段位:{rank}")
+
+        # 删除按钮
+        painter.setFont(self.item_font)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#F44336"))
+        painter.drawRoundedRect(QRectF(delete_rect), 4, 4)
+        painter.setPen(QColor("white"))
+        painter.drawText(delete_rect, Qt.AlignmentFlag.AlignCenter, "删除")
+        painter.restore()
+
+    # ==================== 编辑器（只为正在编辑的行创建）====================
+    def createEditor(self, parent, option, index):
+        editor = QDoubleSpinBox(parent)
+        editor.setFont(self.item_font)
+        editor.setRange(0.0, 100.0)
+        editor.setSingleStep(1.0)  # 步长改为1，更易操作
+        editor.setAlignment(Qt.AlignmentFlag.AlignCenter)  # 数值居中
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setValue(index.data(AbilityListModel.ValueRole))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.ItemDataRole.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(self._rects(option.rect)[1])
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            _, value_rect, _, delete_rect = self._rects(option.rect)
+            pos = event.position().toPoint()
+            if delete_rect.contains(pos):
+                self.delete_clicked.emit(index.data(AbilityListModel.IdRole), index.data())
+                return True
+            if value_rect.contains(pos) and self.parent() is not None:
+                self.parent().edit(index)
+                return True
+        return super().editorEvent(event, model, option, index)
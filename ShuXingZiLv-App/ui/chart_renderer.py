@@ -0,0 +1,170 @@
+from typing import Callable, Optional
+import numpy as np
+from PyQt6.QtWidgets import QApplication, QWidget, QSizePolicy, QMessageBox
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QRectF, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QPainter
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+RENDER_DPI = 100  # 逻辑像素 -> 英寸的换算（高分屏按设备像素比提高实际dpi）
+RESIZE_RENDER_DELAY = 120  # 缩放停止后重新渲染的延迟（毫秒），拖动窗口时不反复渲染
+
+DrawFunc = Callable[[Figure], None]
+_render_pool: Optional[QThreadPool] = None
+
+
+def get_render_pool() -> QThreadPool:
+    """
+    图表渲染线程池：只有一个线程——Matplotlib不是线程安全的（字体缓存等是全局共享的），
+    所有图表都在这一个线程里按顺序渲染，GUI线程不再调用Matplotlib绘制
+    """
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = QThreadPool()
+        _render_pool.setMaxThreadCount(1)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_shutdown_render_pool)
+    return _render_pool
+
+
+def _shutdown_render_pool():
+    """退出前丢弃排队中的渲染，并等待正在渲染的图表完成（之后画布才会被销毁）"""
+    if _render_pool is not None:
+        _render_pool.clear()
+        _render_pool.waitForDone()
+
+
+def render_figure(draw: DrawFunc, width: int, height: int, ratio: float = 1.0) -> QImage:
+    """用Agg后端把draw画出的图表渲染成QImage（width/height为逻辑像素，可在非GUI线程调用）"""
+    fig = Figure(figsize=(max(width, 1) / RENDER_DPI, max(height, 1) / RENDER_DPI), dpi=RENDER_DPI * ratio,
+                 tight_layout=True)
+    canvas = FigureCanvasAgg(fig)
+    draw(fig)
+    canvas.draw()
+    buffer = np.asarray(canvas.buffer_rgba())
+    rows, cols = buffer.shape[:2]
+    image = QImage(buffer.data, cols, rows, cols * 4, QImage.Format.Format_RGBA8888).copy()  # 拷贝出缓冲区
+    image.setDevicePixelRatio(ratio)
+    return image
+
+
+class _RenderSignals(QObject):
+    finished = pyqtSignal(int, QImage)  # (请求序号, 渲染结果)
+    failed = pyqtSignal(int, str)  # (请求序号, 错误信息)
+
+
+class _RequestState:
+    """画布最新的请求序号（渲染线程据此跳过已过期的请求）"""
+
+    def __init__(self):
+        self.latest = 0
+
+
+class _RenderTask(QRunnable):
+    def __init__(self, request_id: int, draw: DrawFunc, size: tuple, state: _RequestState,
+                 signals: _RenderSignals):
+        super().__init__()
+        self.request_id = request_id
+        self.draw = draw
+        self.size = size  # (宽, 高, 设备像素比)
+        self.state = state
+        self.signals = signals
+        self.setAutoDelete(False)  # 由画布持有引用，便于取消排队中的任务
+
+    def run(self):
+        if self.state.latest != self.request_id:
+            return  # 排队期间已有更新的请求
+        try:
+            image = render_figure(self.draw, *self.size)
+        except Exception as e:
+            self.signals.failed.emit(self.request_id, str(e))
+            return
+        if self.state.latest == self.request_id:
+            self.signals.finished.emit(self.request_id, image)
+
+
+class ChartCanvas(QWidget):
+    """
+    图表画布：数据变化时在GUI线程取一份数据快照（make_draw_job），交给渲染线程用Agg画成图片，
+    画布只负责贴图；新请求到来时取消排队中的旧请求，渲染中的旧请求结果直接丢弃
+    缩放时先把上一张图片拉伸显示，停止缩放后按新尺寸重新渲染
+    """
+    chart_name = "图表"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumSize(200, 150)
+        self.image: Optional[QImage] = None  # 当前显示的渲染结果
+        self._state = _RequestState()
+        self._pending: Optional[_RenderTask] = None
+        self._signals = _RenderSignals()
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._rendered_size = None
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.timeout.connect(self.request_render)
+
+    # ==================== 子类实现 ====================
+    def make_draw_job(self) -> DrawFunc:
+        """在GUI线程调用：返回只依赖数据快照的绘制函数（渲染线程中执行，不能访问控件）"""
+        raise NotImplementedError
+
+    def image_rendered(self, image: QImage):
+        """渲染完成并显示后调用（子类可缓存结果）"""
+
+    # ==================== 渲染请求 ====================
+    def render_size(self) -> tuple:
+        return self.width(), self.height(), self.devicePixelRatioF()
+
+    def request_render(self):
+        """按当前数据和尺寸发起渲染（取代排队中的旧请求）"""
+        self.cancel_pending()
+        size = self.render_size()
+        task = _RenderTask(self._state.latest, self.make_draw_job(), size, self._state, self._signals)
+        self._pending = task
+        self._rendered_size = size
+        get_render_pool().start(task)
+
+    def cancel_pending(self):
+        """让所有未完成的请求过期（排队中的直接移出线程池）"""
+        self._state.latest += 1
+        if self._pending is not None:
+            get_render_pool().tryTake(self._pending)
+            self._pending = None
+
+    def show_image(self, image: QImage):
+        self.image = image
+        self.update()
+
+    def _on_finished(self, request_id: int, image: QImage):
+        if request_id != self._state.latest:
+            return
+        self._pending = None
+        self.show_image(image)
+        self.image_rendered(image)
+
+    def _on_failed(self, request_id: int, message: str):
+        if request_id != self._state.latest:
+            return
+        self._pending = None
+        print(f"{self.chart_name}绘制错误：{message}")
+        QMessageBox.warning(None, "绘制错误", f"图表刷新失败：{message}")
+
+    def save_image(self, path: str) -> bool:
+        return self.image is not None and self.image.save(path)
+
+    # ==================== 绘制/缩放 ====================
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("white"))
+        if self.image is not None:
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            painter.drawImage(QRectF(self.rect()), self.image)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._rendered_size is not None and self.render_size() != self._rendered_size:
+            self._resize_timer.start(RESIZE_RENDER_DELAY)
@@ -0,0 +1,226 @@
+import os
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QListView,
+                             QDialog, QTextEdit, QFileDialog, QMessageBox, QAbstractItemView)
+from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QFont
+from utils.data_handler import save_image_file_async, add_growth_record, delete_growth_record
+from ui.save_worker import get_save_queue
+from ui.growth_record_model import GrowthRecordModel, GrowthRecordDelegate, ThumbnailLoader
+
+IMAGE_FILE_FILTER = "图片 (*.jpg *.jpeg *.png *.bmp *.gif *.webp)"
+
+
+class _FutureBridge(QObject):
+    """
+    把线程池Future的完成回调转到GUI线程（跨线程信号自动排队）
+    不设父对象：完成回调持有它的引用，即使对话框已关闭销毁，回调发信号时它也仍然存在
+    """
+    done = pyqtSignal(object, object)  # (附加数据, 结果)
+
+    def watch(self, future, tag):
+        future.add_done_callback(lambda f: self.done.emit(tag, None if f.exception() else f.result()))
+
+
+class GrowthRecordDialog(QDialog):
+    """添加成长记录的对话框：选中的图片立即在后台保存，确认时只等待尚未完成的图片"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.image_paths = {}  # 选择的文件 -> 保存后的相对路径（保存中为None）
+        self.bridge = _FutureBridge()
+        self.bridge.done.connect(self._on_image_saved)
+        self._accept_pending = False
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle("添加成长记录")
+        self.setFixedSize(420, 300)
+        layout = QVBoxLayout(self)
+
+        self.content_edit = QTextEdit()
+        self.content_edit.setPlaceholderText("记录今天的成长……")
+        layout.addWidget(self.content_edit)
+
+        image_layout = QHBoxLayout()
+        self.image_label = QLabel("未选择图片")
+        self.image_label.setStyleSheet("color: #888;")
+        self.image_btn = QPushButton("选择图片")
+        self.image_btn.clicked.connect(self.choose_images)
+        image_layout.addWidget(self.image_label)
+        image_layout.addStretch()
+        image_layout.addWidget(self.image_btn)
+        layout.addLayout(image_layout)
+
+        btn_layout = QHBoxLayout()
+        self.ok_btn = QPushButton("确认")
+        self.cancel_btn = QPushButton("取消")
+        self.ok_btn.clicked.connect(self._on_confirm)
+        self.cancel_btn.clicked.connect(self.reject)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.ok_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        layout.addLayout(btn_layout)
+
+    def done(self, result):
+        # 对话框关闭（确认/取消）后不再接收图片保存结果
+        try:
+            self.bridge.done.disconnect(self._on_image_saved)
+        except TypeError:
+            pass  # 已经断开过
+        super().done(result)
+
+    def choose_images(self):
+        files, _ = QFileDialog.getOpenFileNames(self, "选择图片", "", IMAGE_FILE_FILTER)
+        for file_path in files:
+            if file_path not in self.image_paths:
+                self.image_paths[file_path] = None
+                self.bridge.watch(save_image_file_async(file_path), file_path)
+        self._update_image_label()
+
+    def _on_image_saved(self, file_path, rel_path):
+        if file_path not in self.image_paths:
+            return
+        if rel_path is None:
+            del self.image_paths[file_path]
+            QMessageBox.warning(self, "图片保存失败", f"无法保存图片：{os.path.basename(file_path)}")
+        else:
+            self.image_paths[file_path] = rel_path
+        self._update_image_label()
+        if self._accept_pending and not self.saving_count():
+            self.accept()
+
+    def saving_count(self):
+        return sum(1 for p in self.image_paths.values() if p is None)
+
+    def _update_image_label(self):
+        if not self.image_paths:
+            self.image_label.setText("未选择图片")
+            return
+        saving = self.saving_count()
+        text = f"已选择 {len(self.image_paths)} 张图片"
+        self.image_label.setText(f"{text}（{saving} 张保存中）" if saving else text)
+
+    def _on_confirm(self):
+        if not self.content_edit.toPlainText().strip() and not self.image_paths:
+            QMessageBox.warning(self, "输入错误", "记录内容和图片不能都为空！")
+            return
+        if self.saving_count():
+            # 图片还在后台保存，全部完成后自动关闭
+            self._accept_pending = True
+            self.ok_btn.setEnabled(False)
+            self.ok_btn.setText("保存图片中…")
+            return
+        self.accept()
+
+    def get_data(self):
+        return {
+            "content": self.content_edit.toPlainText().strip(),
+            "images": [p for p in self.image_paths.values() if p],
+        }
+
+
+class GrowthManager(QWidget):
+    """
+    成长记录页面：记录按页从数据层读取（最新的在前），行由委托绘制、视图只绘制可见行，
+    缩略图在后台线程解码，记录数量多少都能立即打开
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.save_queue = get_save_queue()  # 后台保存队列（不阻塞界面）
+        self.init_ui()
+        self.load_records()
+
+    def init_ui(self):
+        main_layout = QVBoxLayout(self)
+        self.setLayout(main_layout)
+
+        # 1. 顶部区域：标题+按钮
+        top_layout = QHBoxLayout()
+        self.title = QLabel("成长记录")
+        self.title.setFont(QFont("Microsoft YaHei", 14, QFont.Weight.Bold))
+        self.add_btn = QPushButton("添加记录")
+        self.refresh_btn = QPushButton("刷新列表")
+        top_layout.addWidget(self.title)
+        top_layout.addStretch()
+        top_layout.addWidget(self.add_btn)
+        top_layout.addWidget(self.refresh_btn)
+        main_layout.addLayout(top_layout)
+
+        # 2. 中间区域：记录列表（滚动到底部时自动加载下一页）
+        self.thumbnail_loader = ThumbnailLoader(parent=self)
+        self.thumbnail_loader.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.record_model = GrowthRecordModel(self.thumbnail_loader, self)
+        self.list_view = QListView()
+        self.list_view.setModel(self.record_model)
+        self.list_view.setItemDelegate(GrowthRecordDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)  # 行高一致，滚动时无需逐行计算
+        self.list_view.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.list_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.list_view.selectionModel().selectionChanged.connect(self.on_item_selected)
+        main_layout.addWidget(self.list_view)
+
+        # 3. 底部区域：删除按钮
+        bottom_layout = QHBoxLayout()
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet("color: #888;")
+        self.delete_btn = QPushButton("删除")
+        self.delete_btn.setEnabled(False)
+        bottom_layout.addWidget(self.count_label)
+        bottom_layout.addStretch()
+        bottom_layout.addWidget(self.delete_btn)
+        main_layout.addLayout(bottom_layout)
+
+        self.add_btn.clicked.connect(self.show_add_dialog)
+        self.refresh_btn.clicked.connect(self.load_records)
+        self.delete_btn.clicked.connect(self.delete_record)
+        self.setMinimumSize(800, 600)
+
+    def load_records(self):
+        try:
+            self.thumbnail_loader.clear_pending()
+            self.record_model.reload()
+            self._update_count()
+        except Exception as e:
+            QMessageBox.critical(self, "加载失败", f"加载成长记录失败：{str(e)}")
+
+    def _update_count(self):
+        self.count_label.setText(f"共 {self.record_model.total} 条记录")
+
+    def on_thumbnail_ready(self, _image_path):
+        # 只重绘可见区域（不在可见区域的行下次绘制时直接命中缓存）
+        self.list_view.viewport().update()
+
+    def on_item_selected(self):
+        self.delete_btn.setEnabled(bool(self.list_view.selectionModel().selectedIndexes()))
+
+    def show_add_dialog(self):
+        dialog = GrowthRecordDialog(self)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        data = dialog.get_data()
+        try:
+            record = add_growth_record(data["content"], data["images"])
+            self.record_model.prepend_record(record)
+            self.list_view.scrollToTop()
+            self._update_count()
+            self.save_queue.request_save()
+        except Exception as e:
+            QMessageBox.critical(self, "添加失败", f"添加成长记录失败：{str(e)}")
+
+    def delete_record(self):
+        indexes = self.list_view.selectionModel().selectedIndexes()
+        if not indexes:
+            return
+        index = indexes[0]
+        reply = QMessageBox.question(self, "确认删除", "确定要删除这条成长记录吗？",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            delete_growth_record(index.data(GrowthRecordModel.IdRole))
+            self.record_model.remove_row(index.row())
+            self._update_count()
+            self.save_queue.request_save()
+        except Exception as e:
+            QMessageBox.critical(self, "删除失败", f"删除成长记录失败：{str(e)}")
@@ -0,0 +1,237 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import (Qt, QAbstractListModel, QModelIndex, QObject, QRunnable, QThreadPool, QRect,
+                          QRectF, QSize, pyqtSignal)
+from PyQt6.QtGui import QColor, QFont, QIcon, QImage, QImageReader, QPixmap
+from utils.data_handler import count_growth_records, get_growth_records_page, get_image_for_width, get_image_store
+
+PAGE_SIZE = 50  # 每次从数据层读取的记录条数
+THUMBNAIL_SIZE = 80  # 列表中缩略图的边长（逻辑像素）
+THUMBNAIL_CACHE_SIZE = 300  # 内存中保留的缩略图数量（LRU）
+MAX_PENDING_LOADS = 24  # 排队中的解码任务上限，超出时丢弃最早的（通常已滚出可见区域）
+
+
+class _ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)  # (图片相对路径, 解码后的图片)
+
+
+class _ThumbnailTask(QRunnable):
+    """在线程池中选取合适尺寸的缩略图文件并按目标尺寸解码（QImage可以在非GUI线程创建）"""
+
+    def __init__(self, image_path: str, size: int, signals: _ThumbnailSignals):
+        super().__init__()
+        self.image_path = image_path
+        self.size = size
+        self.signals = signals
+        self.setAutoDelete(False)  # 由加载器持有引用，便于取消排队中的任务
+
+    def run(self):
+        image = QImage()
+        try:
+            rel_path = get_image_for_width(self.image_path, self.size)
+            reader = QImageReader(get_image_store().absolute(rel_path))
+            reader.setAutoTransform(True)
+            source = reader.size()
+            if source.isValid():
+                # 按短边缩放到目标尺寸（裁剪成正方形时不留白），JPEG解码时直接缩小
+                scaled = source.scaled(self.size, self.size, Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+                if scaled.width() < source.width():
+                    reader.setScaledSize(scaled)
+            image = reader.read()
+        except Exception as e:
+            print(f"⚠️  加载缩略图失败：{str(e)}")
+        self.signals.loaded.emit(self.image_path, image)
+
+
+class ThumbnailLoader(QObject):
+    """
+    缩略图加载器：只为正在绘制的行请求缩略图，解码在线程池中进行，
+    结果以LRU缓存保存；快速滚动时排队过多的旧请求会被取消
+    """
+    thumbnail_ready = pyqtSignal(str)  # 图片相对路径
+
+    def __init__(self, size: int = THUMBNAIL_SIZE, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self._signals = _ThumbnailSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._cache: "OrderedDict[str, QPixmap]" = OrderedDict()
+        self._pending: "OrderedDict[str, _ThumbnailTask]" = OrderedDict()
+        self._failed = set()  # 无法解码的图片（不再重复请求）
+
+    def pixmap(self, image_path: str) -> Optional[QPixmap]:
+        """返回已缓存的缩略图；没有时发起后台加载并返回None"""
+        pixmap = self._cache.get(image_path)
+        if pixmap is not None:
+            self._cache.move_to_end(image_path)
+            return pixmap
+        if image_path not in self._pending and image_path not in self._failed:
+            self._request(image_path)
+        return None
+
+    def _request(self, image_path: str):
+        while len(self._pending) >= MAX_PENDING_LOADS:
+            _, stale = self._pending.popitem(last=False)
+            self.pool.tryTake(stale)  # 已开始执行的任务无法取消，结果照常缓存
+        task = _ThumbnailTask(image_path, self.size, self._signals)
+        self._pending[image_path] = task
+        self.pool.start(task)
+
+    def _on_loaded(self, image_path: str, image: QImage):
+        self._pending.pop(image_path, None)
+        if image.isNull():
+            self._failed.add(image_path)
+            return
+        self._cache[image_path] = QPixmap.fromImage(image)  # QPixmap只能在GUI线程创建
+        while len(self._cache) > THUMBNAIL_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        self.thumbnail_ready.emit(image_path)
+
+    def clear_pending(self):
+        for task in self._pending.values():
+            self.pool.tryTake(task)
+        self._pending.clear()
+
+
+class GrowthRecordModel(QAbstractListModel):
+    """成长记录列表模型：最新的在前，滚动到底部时通过canFetchMore/fetchMore按页读取"""
+    RecordRole = Qt.ItemDataRole.UserRole
+    IdRole = Qt.ItemDataRole.UserRole + 1
+    TimeRole = Qt.ItemDataRole.UserRole + 2
+    ImageRole = Qt.ItemDataRole.UserRole + 3  # 第一张图片的相对路径（没有图片时为None）
+
+    def __init__(self, loader: ThumbnailLoader, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self.records: List[Dict] = []  # 已加载的记录（最新的在前）
+        self._total = 0  # 数据层中的记录总数
+
+    def reload(self):
+        self.beginResetModel()
+        self.records = []
+        self._total = count_growth_records()
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.records) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        page = get_growth_records_page(len(self.records), PAGE_SIZE)
+        if not page:
+            self._total = len(self.records)
+            return
+        start = len(self.records)
+        self.beginInsertRows(QModelIndex(), start, start + len(page) - 1)
+        self.records.extend(page)
+        self.endInsertRows()
+
+    @staticmethod
+    def first_image(record: Dict) -> Optional[str]:
+        images = record.get("images") or ([record["image"]] if record.get("image") else [])
+        return images[0] if images else None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.records):
+            return None
+        record = self.records[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return record.get("content", "")
+        if role == self.TimeRole:
+            return record.get("time", "")
+        if role == self.IdRole:
+            return record.get("id")
+        if role == self.ImageRole:
+            return self.first_image(record)
+        if role == Qt.ItemDataRole.DecorationRole:
+            image_path = self.first_image(record)
+            return self.loader.pixmap(image_path) if image_path else None
+        if role == self.RecordRole:
+            return record
+        return None
+
+    # ==================== 增量更新 ====================
+    def prepend_record(self, record: Dict):
+        """新增的记录显示在最前面"""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.records.insert(0, record)
+        self._total += 1
+        self.endInsertRows()
+
+    def remove_row(self, row: int):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.records[row]
+        self._total -= 1
+        self.endRemoveRows()
+
+
+class GrowthRecordDelegate(QStyledItemDelegate):
+    """绘制成长记录行（缩略图、时间、内容），不为每一行创建控件，视图只绘制可见的行"""
+    ROW_HEIGHT = THUMBNAIL_SIZE + 20
+    MARGIN, SPACING = 10, 12
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.time_font = QFont("Microsoft YaHei", 9)
+        self.content_font = QFont("Microsoft YaHei", 10)
+
+    def sizeHint(self, option, index):
+        return QSize(0, self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        self.initStyleOption(option, index)
+        option.text = ""
+        option.icon = QIcon()  # 缩略图自己画
+        option.widget.style().drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        content = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        text_left = content.x()
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+
+        if index.data(GrowthRecordModel.ImageRole):
+            thumb_rect = QRect(content.x(), content.y(), THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+            pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+            if pixmap is not None:
+                # 居中裁剪成正方形
+                source = QRect(0, 0, pixmap.width(), pixmap.height())
+                side = min(source.width(), source.height())
+                source = QRect((source.width() - side) // 2, (source.height() - side) // 2, side, side)
+                painter.drawPixmap(thumb_rect, pixmap, source)
+            else:
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(QColor("#eeeeee"))  # 加载中的占位
+                painter.drawRoundedRect(QRectF(thumb_rect), 4, 4)
+            text_left = thumb_rect.right() + 1 + self.SPACING
+
+        time_rect = QRect(text_left, content.y(), content.right() - text_left + 1, 20)
+        painter.setFont(self.time_font)
+        painter.setPen(QColor("#888"))
+        painter.drawText(time_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                         index.data(GrowthRecordModel.TimeRole))
+
+        text_rect = QRect(text_left, time_rect.bottom() + 4, time_rect.width(), content.bottom() - time_rect.bottom() - 4)
+        painter.setFont(self.content_font)
+        painter.setPen(QColor("#333"))
+        text = index.data() or ""
+        metrics = painter.fontMetrics()
+        # 最多显示能放下的行数，超出部分省略
+        max_lines = max(1, text_rect.height() // metrics.lineSpacing())
+        lines = text.splitlines() or [""]
+        shown = [metrics.elidedText(line, Qt.TextElideMode.ElideRight, text_rect.width()) for line in lines[:max_lines]]
+        if len(lines) > max_lines:
+            shown[-1] = metrics.elidedText(lines[max_lines - 1] + " …", Qt.TextElideMode.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, "\n".join(shown))
+        painter.restore()
@@ -1,97 +1,170 @@
 import sys
 import numpy as np
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                             QListWidget, QListWidgetItem, QDialog, QDialogButtonBox,
-                             QLineEdit, QSpinBox, QDoubleSpinBox, QFormLayout,
-                             QInputDialog, QMessageBox, QSizePolicy, QApplication)
+                             QListView, QDialog, QDialogButtonBox, QSpinBox, QFormLayout,
+                             QInputDialog, QMessageBox, QApplication, QComboBox, QFileDialog)
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont, QColor
-from PyQt6 import QtCore
-from utils.data_handler import read_data, write_data
+from PyQt6.QtGui import QFont
+from collections import OrderedDict
+from utils.data_handler import get_rating_index, get_ability_history
+from ui.save_worker import get_save_queue
+from ui.ability_list_model import AbilityListModel, AbilityItemDelegate
+from utils.rank_classifier import RankClassifier
+from utils.ability_import import parse_ability_file, IMPORT_FILE_FILTER
 import uuid
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qtagg import NavigationToolbar2QT as NavigationToolbar
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+import matplotlib
+import matplotlib.dates as mdates
+from functools import partial
+from ui.chart_renderer import ChartCanvas
+
+# 设置Matplotlib中文显示（图表在渲染线程中用Agg后端画成图片，不需要Qt后端）
+matplotlib.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'SimHei', 'Arial Unicode MS']
+matplotlib.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+
+CHART_CACHE_SIZE = 16  # 缓存渲染结果的评分系统数量（每个约为一张画布大小的图片）
+SECONDARY_BUTTON_STYLE = """
+    QPushButton {
+        background-color: #f0f0f0;
+        color: #333;
+        border: none;
+        padding: 8px 16px;
+        border-radius: 4px;
+        font-size: 14px;
+    }
+    QPushButton:hover {
+        background-color: #e0e0e0;
+    }
+    QPushButton:checked {
+        background-color: #FF9800;
+        color: white;
+    }
+"""
+
+
+def draw_radar(fig, names: list, values: list):
+    """绘制雷达图（渲染线程中执行）"""
+    ax = fig.add_subplot(111, polar=True)
+    ax.set_theta_zero_location('N')  # 角度0度在北方（上方）
+    ax.set_theta_direction(-1)  # 角度顺时针增加
+    ax.set_ylim(0, 100)  # 能力值范围固定0-100
+    ax.set_yticks(range(0, 101, 20))  # Y轴刻度：0,20,...100
+    ax.grid(True, alpha=0.3)  # 网格透明度
+    n = len(names)
+    if n == 0:
+        ax.text(0.5, 0.5, '暂无能力项数据\n请添加能力项',
+                horizontalalignment='center', verticalalignment='center',
+                transform=ax.transAxes, fontsize=14)
+        return
+    # 计算角度（避免n=0的除零错误），首尾相连闭合多边形
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False).tolist()
+    angles_closed, values_closed = angles + [angles[0]], values + [values[0]]
+    ax.plot(angles_closed, values_closed, 'o-', linewidth=2, color='#2196F3')
+    ax.fill(angles_closed, values_closed, alpha=0.25, color='#2196F3')
+    ax.set_xticks(angles)
+    ax.set_xticklabels(names, fontsize=11)
+
+
+def draw_trend(fig, history, ability_id, ability_name: str, width: int):
+    """绘制能力值趋势（渲染线程中执行）：按像素宽度取降采样后的历史序列（LTTB）"""
+    ax = fig.add_subplot(111)
+    ax.set_ylim(0, 100)
+    ax.grid(True, alpha=0.3)
+    if ability_id is None:
+        message = "请选择能力项查看趋势"
+    else:
+        times, values = history.downsampled(ability_id, width)
+        message = None if len(times) else "暂无历史记录（修改能力值后开始记录）"
+    if message:
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.text(0.5, 0.5, message, horizontalalignment='center', verticalalignment='center',
+                transform=ax.transAxes, fontsize=12, color='#999')
+        return
+    dates = times.astype("datetime64[s]")
+    ax.plot(dates, values, '-', linewidth=1.5, color='#2196F3', marker='o' if len(dates) < 50 else None,
+            markersize=3)
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    ax.set_title(f"{ability_name} 趋势（共{history.count(ability_id)}条记录）", fontsize=11)
+
+
+class RadarChartCanvas(ChartCanvas):
+    """
+    雷达图画布：在渲染线程中画好后贴图；按评分系统id缓存渲染结果，
+    切换回数据和尺寸都没变的评分系统时直接显示缓存的图片，不再渲染
+    """
+    chart_name = "雷达图"
 
-# 设置Matplotlib中文显示
-plt.rcParams['font.sans-serif'] = ['Microsoft YaHei', 'SimHei', 'Arial Unicode MS']
-plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.abilities = []
+        self.values = []
+        self.cache_key = None  # 当前显示的评分系统id
+        # 评分系统id -> (数据和尺寸签名, 渲染结果)
+        self._image_cache = OrderedDict()
+        self._pending_cache = None  # 正在渲染的请求对应的(评分系统id, 签名)
+
+    def _signature(self) -> tuple:
+        return tuple(self.abilities), tuple(self.values), self.render_size()
+
+    def update_chart(self, abilities: list, cache_key=None, force: bool = False):
+        """更新雷达图数据：与缓存一致时直接贴图，否则提交后台渲染（取代未完成的旧请求）"""
+        # 提取能力名称和数值（限制数值在0-100之间，避免异常值）
+        self.abilities = [item['name'] for item in abilities if 'name' in item]
+        self.values = [max(0.0, min(100.0, float(item.get('value', 0.0)))) for item in abilities]
+        self.cache_key = cache_key
+        cached = self._image_cache.get(cache_key) if cache_key is not None and not force else None
+        if cached is not None and cached[0] == self._signature():
+            self.cancel_pending()
+            self._image_cache.move_to_end(cache_key)
+            self.show_image(cached[1])
+            return
+        self.request_render()
+
+    def request_render(self):
+        self._pending_cache = (self.cache_key, self._signature())
+        super().request_render()
 
+    def make_draw_job(self):
+        return partial(draw_radar, names=list(self.abilities), values=list(self.values))
+
+    def image_rendered(self, image):
+        cache_key, signature = self._pending_cache
+        if cache_key is None:
+            return
+        self._image_cache[cache_key] = (signature, image)
+        self._image_cache.move_to_end(cache_key)
+        while len(self._image_cache) > CHART_CACHE_SIZE:
+            self._image_cache.popitem(last=False)
+
+    def discard_cache(self, cache_key):
+        """评分系统被删除时丢弃其渲染缓存"""
+        self._image_cache.pop(cache_key, None)
 
-class RadarChartCanvas(FigureCanvas):
-    """Matplotlib雷达图画布（嵌入PyQt6）"""
+
+class TrendChartCanvas(ChartCanvas):
+    """能力值趋势图：按画布像素宽度降采样（在渲染线程中取数据），几年的记录也只画约一屏宽度的点"""
+    chart_name = "趋势图"
 
     def __init__(self, parent=None):
-        # 创建图形和子图
-        self.fig = Figure(figsize=(8, 6), dpi=100, tight_layout=True)
-        super().__init__(self.fig)
-        self.setParent(parent)
-        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-
-        # 初始化雷达图
-        self.ax = self.fig.add_subplot(111, polar=True)
-        self.ax.set_theta_zero_location('N')  # 角度0度在北方（上方）
-        self.ax.set_theta_direction(-1)  # 角度顺时针增加
-        self.ax.set_ylim(0, 100)  # 能力值范围固定0-100
-        self.ax.set_yticks(range(0, 101, 20))  # Y轴刻度：0,20,...100
-        self.ax.grid(True, alpha=0.3)  # 网格透明度
-
-        # 存储当前数据
-        self.abilities = []
-        self.values = []
+        super().__init__(parent)
+        self.ability_id = None
+        self.ability_name = ""
 
-    def update_chart(self, abilities: list):
-        """更新雷达图数据（添加线程安全处理）"""
-        try:
-            # 清空子图
-            self.ax.clear()
-            self.ax.set_theta_zero_location('N')
-            self.ax.set_theta_direction(-1)
-            self.ax.set_ylim(0, 100)
-            self.ax.set_yticks(range(0, 101, 20))
-            self.ax.grid(True, alpha=0.3)
-
-            if not abilities:
-                self.ax.text(0.5, 0.5, '暂无能力项数据\n请添加能力项',
-                             horizontalalignment='center', verticalalignment='center',
-                             transform=self.ax.transAxes, fontsize=14)
-                self.draw()
-                return
-
-            # 提取能力名称和数值（过滤无效数据）
-            self.abilities = [item['name'] for item in abilities if 'name' in item]
-            self.values = []
-            for item in abilities:
-                val = item.get('value', 0.0)
-                # 限制数值在0-100之间，避免异常值
-                self.values.append(max(0.0, min(100.0, float(val))))
-
-            n = len(self.abilities)
-            if n == 0:
-                self.draw()
-                return
-
-            # 计算角度（避免n=0的除零错误）
-            angles = np.linspace(0, 2 * np.pi, n, endpoint=False).tolist()
-            values_closed = self.values + [self.values[0]]
-            angles_closed = angles + [angles[0]]
-
-            # 绘制雷达图（添加异常捕获）
-            self.ax.plot(angles_closed, values_closed, 'o-', linewidth=2, color='#2196F3')
-            self.ax.fill(angles_closed, values_closed, alpha=0.25, color='#2196F3')
-            self.ax.set_xticks(angles)
-            self.ax.set_xticklabels(self.abilities, fontsize=11)
-
-            # 刷新前处理所有UI事件（关键：避免线程阻塞）
-            from PyQt6.QtWidgets import QApplication
-            QApplication.processEvents()
-            self.draw()
+    def show_ability(self, ability_id, ability_name: str = ""):
+        """切换显示的能力项（None表示清空）"""
+        self.ability_id = ability_id
+        self.ability_name = ability_name
+        self.refresh()
 
-        except Exception as e:
-            # 捕获所有异常，避免程序崩溃
-            print(f"雷达图绘制错误：{str(e)}")
-            QMessageBox.warning(None, "绘制错误", f"图表刷新失败：{str(e)}")
+    def refresh(self):
+        """重新取数据并渲染（能力值修改后调用）"""
+        self.request_render()
+
+    def make_draw_job(self):
+        return partial(draw_trend, history=get_ability_history(), ability_id=self.ability_id,
+                       ability_name=self.ability_name, width=max(self.width(), 100))
 
 
 class RatingManager(QWidget):
@@ -100,7 +173,9 @@ class RatingManager(QWidget):
 
     def __init__(self):
         super().__init__()
-        self.current_rating_system = None  # 当前评分系统（阶段一默认第一个）
+        self.current_rating_system = None  # 当前评分系统（文档中的字典，由切换器选择）
+        self._rank_classifiers = {}  # 评分系统id -> (段位规则列表, 预编译的段位判定器)
+        self.save_queue = get_save_queue()  # 后台保存队列（不阻塞界面）
         self.init_ui()
         self.load_rating_data()  # 加载数据
         self.data_updated.connect(self.refresh_radar_chart)  # 绑定数据更新→图表刷新
@@ -123,10 +198,22 @@ class RatingManager(QWidget):
         title_label.setFont(title_font)
         top_layout.addWidget(title_label)
 
+        # 评分系统切换器（只列出名称，选中后才加载该系统的能力项）
+        self.system_combo = QComboBox()
+        self.system_combo.setMinimumWidth(160)
+        self.system_combo.currentIndexChanged.connect(self.on_system_selected)
+        top_layout.addWidget(self.system_combo)
+
         # 功能按钮（居右）
         btn_layout = QHBoxLayout()
         btn_layout.setSpacing(10)
 
+        # 新建评分系统按钮
+        self.add_system_btn = QPushButton("新建评分系统")
+        self.add_system_btn.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        self.add_system_btn.clicked.connect(self.add_rating_system)
+        btn_layout.addWidget(self.add_system_btn)
+
         # 添加能力项按钮
         self.add_ability_btn = QPushButton("添加能力项")
         self.add_ability_btn.setStyleSheet("""
@@ -163,22 +250,35 @@ class RatingManager(QWidget):
         self.edit_rank_btn.clicked.connect(self.edit_rank_rules)
         btn_layout.addWidget(self.edit_rank_btn)
 
+        # 批量编辑：修改的数值先暂存，应用时一次保存、一次重绘雷达图
+        self.batch_edit_btn = QPushButton("批量编辑")
+        self.batch_edit_btn.setCheckable(True)
+        self.batch_edit_btn.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        self.batch_edit_btn.toggled.connect(self.toggle_batch_mode)
+        btn_layout.addWidget(self.batch_edit_btn)
+
+        self.apply_batch_btn = QPushButton("应用修改")
+        self.apply_batch_btn.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        self.apply_batch_btn.clicked.connect(self.apply_pending_changes)
+        btn_layout.addWidget(self.apply_batch_btn)
+
+        self.discard_batch_btn = QPushButton("放弃修改")
+        self.discard_batch_btn.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        self.discard_batch_btn.clicked.connect(self.discard_pending_changes)
+        btn_layout.addWidget(self.discard_batch_btn)
+        self.apply_batch_btn.hide()
+        self.discard_batch_btn.hide()
+
+        # 从CSV/JSON批量导入能力值
+        self.import_btn = QPushButton("导入能力值")
+        self.import_btn.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        self.import_btn.clicked.connect(self.import_abilities)
+        btn_layout.addWidget(self.import_btn)
+
         # 刷新图表按钮
         self.refresh_chart_btn = QPushButton("刷新图表")
-        self.refresh_chart_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f0f0f0;
-                color: #333;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-        """)
-        self.refresh_chart_btn.clicked.connect(self.refresh_radar_chart)
+        self.refresh_chart_btn.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        self.refresh_chart_btn.clicked.connect(lambda: self.refresh_radar_chart(force=True))
         btn_layout.addWidget(self.refresh_chart_btn)
 
         top_layout.addStretch()
@@ -191,18 +291,30 @@ class RatingManager(QWidget):
         middle_layout.setContentsMargins(0, 0, 0, 0)
 
         # 左侧：能力项列表（优化宽度和样式）
-        self.ability_list = QListWidget()
+        # 模型+委托绘制每一行，只为正在编辑的数值创建输入框
+        self.ability_list = QListView()
+        self.ability_model = AbilityListModel(self.get_ability_rank, self)
+        self.ability_model.value_edited.connect(self.update_ability_value)
+        self.ability_delegate = AbilityItemDelegate(self.get_rank_color, self.get_rank_border_color,
+                                                    self.ability_list)
+        self.ability_delegate.delete_clicked.connect(self.delete_ability)
+        self.ability_list.setModel(self.ability_model)
+        self.ability_list.selectionModel().currentChanged.connect(self.on_current_ability_changed)
+        self.ability_list.setItemDelegate(self.ability_delegate)
+        self.ability_list.setUniformItemSizes(True)
+        self.ability_list.setEditTriggers(QListView.EditTrigger.DoubleClicked)
+        self.ability_list.setMouseTracking(True)
         self.ability_list.setStyleSheet("""
-                QListWidget {
+                QListView {
                     border: 1px solid #e0e0e0;
                     border-radius: 6px;
                     background-color: white;
                     padding: 5px;
                 }
-                QListWidget::item {
+                QListView::item {
                     border-bottom: 1px solid #f0f0f0;
                 }
-                QListWidget::item:hover {
+                QListView::item:hover {
                     background-color: #f5f9ff;
                     border-radius: 4px;
                 }
@@ -215,31 +327,79 @@ class RatingManager(QWidget):
         chart_layout = QVBoxLayout(chart_container)
         chart_layout.setContentsMargins(0, 0, 0, 0)
 
+        # 保存图片（图表是渲染好的图片，直接保存当前显示的内容）
+        chart_btn_layout = QHBoxLayout()
+        chart_btn_layout.addStretch()
+        self.save_chart_btn = QPushButton("保存雷达图")
+        self.save_chart_btn.setStyleSheet(SECONDARY_BUTTON_STYLE)
+        self.save_chart_btn.clicked.connect(self.save_radar_image)
+        chart_btn_layout.addWidget(self.save_chart_btn)
+        chart_layout.addLayout(chart_btn_layout)
+
         self.radar_canvas = RadarChartCanvas()
-        self.toolbar = NavigationToolbar(self.radar_canvas, chart_container)
-        chart_layout.addWidget(self.toolbar)
-        chart_layout.addWidget(self.radar_canvas)
+        chart_layout.addWidget(self.radar_canvas, stretch=3)
+
+        # 雷达图下方：当前选中能力项的历史趋势
+        self.trend_canvas = TrendChartCanvas()
+        chart_layout.addWidget(self.trend_canvas, stretch=1)
 
         middle_layout.addWidget(chart_container, stretch=2)  # 右侧权重2（左侧1:右侧2）
 
         main_layout.addLayout(middle_layout, stretch=1)
 
     def load_rating_data(self):
-        """加载评分系统数据（核心数据交互）"""
-        # 读取JSON数据
-        data = read_data()
-        rating_systems = data.get("rating_systems", [])
-
-        # 阶段一默认使用第一个评分系统
-        if rating_systems:
-            self.current_rating_system = rating_systems[0]
-            # 更新能力项列表
-            self.update_ability_list()
-            # 初始化雷达图
-            self.refresh_radar_chart()
-        else:
+        """加载评分系统列表（核心数据交互）：切换器只填名称，保持之前选中的评分系统"""
+        index = get_rating_index()
+        if not len(index):
             # 无评分系统时创建默认（理论上不会触发，data_handler已初始化）
             self.create_default_rating_system()
+            return
+        current_id = self.current_rating_system["id"] if self.current_rating_system else None
+        self.populate_system_combo(current_id if current_id in index else index.first()["id"])
+
+    def populate_system_combo(self, select_id: str):
+        """重新填充切换器并选中select_id（触发一次加载）"""
+        self.system_combo.blockSignals(True)
+        self.system_combo.clear()
+        for system_id, name in get_rating_index().summaries():
+            self.system_combo.addItem(name, system_id)
+        self.system_combo.setCurrentIndex(max(0, self.system_combo.findData(select_id)))
+        self.system_combo.blockSignals(False)
+        self.switch_rating_system(self.system_combo.currentData())
+
+    def on_system_selected(self, _row):
+        self.switch_rating_system(self.system_combo.currentData())
+
+    def switch_rating_system(self, system_id: str):
+        """切换评分系统：按id取出，加载其能力项列表和雷达图（已渲染过的直接用缓存）"""
+        rating_system = get_rating_index().get(system_id)
+        if rating_system is None:
+            return
+        self.current_rating_system = rating_system
+        self.update_ability_list()
+        self.refresh_radar_chart()
+
+    def current_system(self) -> dict:
+        """修改前调用：数据被外部修改重新加载后，按id重新定位当前评分系统并刷新页面"""
+        if get_rating_index().get(self.current_rating_system["id"]) is not self.current_rating_system:
+            self.load_rating_data()
+        return self.current_rating_system
+
+    def add_rating_system(self):
+        """新建评分系统（沿用当前评分系统的段位规则，能力项为空）"""
+        name, ok = QInputDialog.getText(self, "新建评分系统", "请输入评分系统名称：")
+        if not ok or not name.strip():
+            return
+        rank_rules = self.current_rating_system.get("rank_rules", []) if self.current_rating_system else []
+        new_rating_system = {
+            "id": f"rating_{uuid.uuid4().hex[:8]}",
+            "name": name.strip(),
+            "abilities": [],
+            "rank_rules": [dict(rule) for rule in rank_rules] or self.default_rank_rules(),
+        }
+        get_rating_index().add(new_rating_system)
+        self.save_queue.request_save()
+        self.populate_system_combo(new_rating_system["id"])
 
     def delete_ability(self, ability_id: str, ability_name: str):
         """删除能力项"""
@@ -252,127 +412,43 @@ class RatingManager(QWidget):
         if reply != QMessageBox.StandardButton.Yes:
             return
 
-        # 1. 更新内存数据
-        abilities = self.current_rating_system["abilities"]
-        self.current_rating_system["abilities"] = [a for a in abilities if a["id"] != ability_id]
+        # 1. 更新内存数据（模型直接从abilities列表中删除并移除对应行）
+        self.current_system()
+        self.ability_model.remove_ability(ability_id)
+        self.update_batch_buttons()
 
-        # 2. 写入JSON
-        data = read_data()
-        for rs in data["rating_systems"]:
-            if rs["id"] == self.current_rating_system["id"]:
-                rs["abilities"] = self.current_rating_system["abilities"]
-                break
-        write_result = write_data(data)
+        # 2. 写入JSON（current_rating_system即内存文档中的对象，后台保存）
+        self.save_queue.request_save()
 
-        if write_result:
-            QMessageBox.information(self, "成功", f"能力项「{ability_name}」已删除！")
-            # 3. 刷新UI
-            self.update_ability_list()
-            self.data_updated.emit()
-        else:
-            QMessageBox.warning(self, "失败", "删除失败，请重试！")
+        QMessageBox.information(self, "成功", f"能力项「{ability_name}」已删除！")
+        # 3. 刷新UI
+        self.data_updated.emit()
 
     def update_ability_list(self):
-        """更新能力项列表（优化UI显示，突出段位标签）"""
-        self.ability_list.clear()
-        abilities = self.current_rating_system.get("abilities", [])
-        rank_rules = self.current_rating_system.get("rank_rules", [])
-
-        # 统一设置字体（确保中文显示清晰）
-        default_font = QFont("Microsoft YaHei", 10)  # 微软雅黑，10号字
+        """重新加载能力项列表（切换评分系统/首次加载时使用；单项变化走增量刷新）"""
+        self.ability_model.set_abilities(self.current_rating_system.get("abilities", []))
+        # 默认显示第一个能力项的趋势
+        if self.ability_model.rowCount():
+            self.ability_list.setCurrentIndex(self.ability_model.index(0))
+        else:
+            self.trend_canvas.show_ability(None)
 
-        for ability in abilities:
-            # 1. 创建列表项（固定足够高度，避免内容挤压）
-            item = QListWidgetItem()
-            item.setData(Qt.ItemDataRole.UserRole, ability["id"])
-            item.setSizeHint(QtCore.QSize(0, 60))  # 高度60px，宽度自适应
-
-            # 2. 列表项内容布局
-            item_widget = QWidget()
-            item_widget.setFont(default_font)  # 统一字体
-            item_layout = QHBoxLayout(item_widget)
-            item_layout.setContentsMargins(15, 10, 15, 10)  # 内边距：上下10，左右15
-            item_layout.setSpacing(15)  # 控件间距15px
-
-            # 能力名称（加宽标签，避免文字截断）
-            name_label = QLabel(ability["name"])
-            name_label.setFont(default_font)
-            name_label.setFixedWidth(100)  # 加宽到100px，容纳更长名称
-            name_label.setAlignment(Qt.AlignmentFlag.AlignVCenter)  # 垂直居中
-            item_layout.addWidget(name_label)
-
-            # 能力数值输入框（优化尺寸和字体）
-            value_spin = QDoubleSpinBox()
-            value_spin.setFont(default_font)
-            value_spin.setRange(0.0, 100.0)
-            value_spin.setSingleStep(1.0)  # 步长改为1，更易操作
-            value_spin.setValue(ability["value"])
-            value_spin.setFixedWidth(90)  # 加宽输入框
-            value_spin.setAlignment(Qt.AlignmentFlag.AlignCenter)  # 数值居中
-            value_spin.setReadOnly(False)
-            # 绑定修改事件
-            value_spin.editingFinished.connect(
-                lambda aid=ability["id"], spin=value_spin: self.update_ability_value(aid, spin.value())
-            )
-            item_layout.addWidget(value_spin)
-
-            # 段位标签（优化文字显示）
-
-            rank = self.get_ability_rank(ability["value"])
-            rank_label = QLabel(f"段位:{rank}")
-            # 关键修复：调整字体和对齐方式
-
-            rank_label.setFont(QFont("Microsoft YaHei", 11, QFont.Weight.Bold))  # 确保字体支持中文
-            rank_label.setAlignment(Qt.AlignmentFlag.AlignCenter)  # 强制居中对齐
-            rank_label.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {self.get_rank_color(rank)};
-                    color: white;
-                    padding: 6px 16px;
-                    border-radius: 8px;
-                    min-width: 80px;
-                    text-align: center;  # 确保文字水平居中
-                    vertical-align: middle;  # 确保文字垂直居中
-                    border: 2px solid {self.get_rank_border_color(rank)};
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-                    letter-spacing: 2px;  # 增加字间距，避免拥挤
-                }}
-            """)
-            rank_label.setFixedHeight(36)
-            # 新增：强制文本不换行
-            rank_label.setWordWrap(False)
-            item_layout.addWidget(rank_label)
-
-            # 填充空白，将删除按钮推到最右侧
-            item_layout.addStretch()
-
-            # 删除按钮（保持原有样式，避免抢镜）
-            delete_btn = QPushButton("删除")
-            delete_btn.setFont(default_font)
-            delete_btn.setFixedSize(70, 30)  # 加大按钮
-            delete_btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #F44336;
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                }
-                QPushButton:hover {
-                    background-color: #D32F2F;
-                    border: 1px solid #b71c1c;  # hover时加边框
-                }
-                QPushButton:pressed {
-                    background-color: #c62828;
-                }
-            """)
-            delete_btn.clicked.connect(
-                lambda checked, aid=ability["id"], name=ability["name"]: self.delete_ability(aid, name)
-            )
-            item_layout.addWidget(delete_btn)
+    def on_current_ability_changed(self, current, _previous):
+        """选中的能力项变化：趋势图切换到该能力项"""
+        if current.isValid():
+            self.trend_canvas.show_ability(current.data(AbilityListModel.IdRole), current.data())
+        else:
+            self.trend_canvas.show_ability(None)
 
-            # 3. 设置列表项
-            self.ability_list.addItem(item)
-            self.ability_list.setItemWidget(item, item_widget)
+    def record_ability_values(self, changes: list):
+        """把能力值修改追加到历史记录（[(能力项id, 数值)]），失败不影响保存"""
+        try:
+            get_ability_history().append_many(changes)
+        except Exception as e:
+            print(f"⚠️  能力值历史记录失败：{str(e)}")
+            return
+        if self.trend_canvas.ability_id in {ability_id for ability_id, _ in changes}:
+            self.trend_canvas.refresh()
 
     # 新增：为段位标签添加边框颜色（与背景色协调，增强层次感）
     def get_rank_border_color(self, rank: str) -> str:
@@ -388,16 +464,23 @@ class RatingManager(QWidget):
         }
         return border_colors.get(rank, "#616161")
 
+    def get_rank_classifier(self, rating_system: dict = None) -> RankClassifier:
+        """返回评分系统的段位判定器（段位规则列表被替换后才重新构建）"""
+        rating_system = rating_system or self.current_rating_system
+        rank_rules = rating_system.get("rank_rules", [])
+        cached = self._rank_classifiers.get(rating_system["id"])
+        if cached is None or cached[0] is not rank_rules:
+            cached = (rank_rules, RankClassifier(rank_rules))
+            self._rank_classifiers[rating_system["id"]] = cached
+        return cached[1]
+
     def get_ability_rank(self, value: float) -> str:
         """根据能力值匹配段位（核心逻辑）"""
-        rank_rules = self.current_rating_system.get("rank_rules", [])
-        # 按最小值降序排序（确保高段位优先匹配）
-        sorted_rules = sorted(rank_rules, key=lambda x: x["min"], reverse=True)
+        return self.get_rank_classifier().classify(value)
 
-        for rule in sorted_rules:
-            if rule["min"] <= value <= rule["max"]:
-                return rule["rank"]
-        return "F"  # 默认返回最低段位
+    def get_ability_ranks(self, values):
+        """批量匹配段位（NumPy向量化），返回段位字符串数组"""
+        return self.get_rank_classifier().classify_array(values)
 
     def get_rank_color(self, rank: str) -> str:
         """根据段位返回颜色（美化UI）"""
@@ -412,13 +495,22 @@ class RatingManager(QWidget):
         }
         return rank_colors.get(rank, "#9E9E9E")
 
+    @staticmethod
+    def normalize_value(value: float) -> float:
+        """限制数值范围并保留1位小数"""
+        return round(max(0.0, min(100.0, float(value))), 1)
+
     def update_ability_value(self, ability_id: str, new_value: float):
-        """更新能力值（避免重复刷新）"""
+        """更新能力值（避免重复刷新）；批量编辑模式下只暂存"""
         # 1. 限制数值范围并保留1位小数
-        new_value = round(max(0.0, min(100.0, new_value)), 1)
+        new_value = self.normalize_value(new_value)
+        if self.batch_edit_btn.isChecked():
+            self.ability_model.set_pending(ability_id, new_value)
+            self.update_batch_buttons()
+            return
 
         # 2. 查找并更新对应能力项
-        abilities = self.current_rating_system["abilities"]
+        abilities = self.current_system()["abilities"]
         target_ability = None
         for ab in abilities:
             if ab["id"] == ability_id:
@@ -431,24 +523,132 @@ class RatingManager(QWidget):
         if target_ability["value"] == new_value:
             return
 
-        # 4. 更新数值并保存
+        # 4. 更新数值并保存（后台保存，失败时由保存队列提示）
         target_ability["value"] = new_value
+        self.save_queue.request_save()
+        self.record_ability_values([(ability_id, new_value)])
+
+        # 5. 刷新UI（只重绘该行，不重建列表）；图表在后台渲染，连续修改时旧的渲染请求会被取消
+        self.ability_model.refresh_ability(ability_id)
+        self.refresh_radar_chart()
+
+    # ==================== 批量编辑/导入 ====================
+    def toggle_batch_mode(self, checked: bool):
+        """进入/退出批量编辑模式；退出时还有未应用的修改则询问是否应用"""
+        if not checked and self.ability_model.pending:
+            reply = QMessageBox.question(
+                self, "批量编辑", f"还有{len(self.ability_model.pending)}项修改未应用，是否应用？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.Yes
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                self.apply_pending_changes()
+            else:
+                self.discard_pending_changes()
+        # 批量编辑期间不能切换评分系统（暂存的修改属于当前评分系统）
+        self.system_combo.setEnabled(not checked)
+        self.add_system_btn.setEnabled(not checked)
+        self.apply_batch_btn.setVisible(checked)
+        self.discard_batch_btn.setVisible(checked)
+        self.update_batch_buttons()
+
+    def update_batch_buttons(self):
+        count = len(self.ability_model.pending)
+        self.apply_batch_btn.setText(f"应用修改（{count}）" if count else "应用修改")
+        self.apply_batch_btn.setEnabled(bool(count))
+        self.discard_batch_btn.setEnabled(bool(count))
+
+    def apply_pending_changes(self):
+        """应用批量编辑中暂存的全部修改"""
+        pending = self.ability_model.take_pending()
+        self.update_batch_buttons()
+        if pending:
+            changed, rank_changed = self.apply_ability_changes(pending)
+            QMessageBox.information(self, "成功", f"已更新{changed}项能力值，其中{rank_changed}项段位变化！")
+
+    def discard_pending_changes(self):
+        self.ability_model.take_pending()
+        self.ability_model.refresh_all()
+        self.update_batch_buttons()
+
+    def apply_ability_changes(self, changes: dict, new_abilities: list = ()):
+        """
+        把一组修改（能力项id -> 新数值）和新增能力项一次性写入当前评分系统：
+        段位一次批量判定、只保存一次、只重绘一次雷达图，返回(更新的能力项数, 段位变化数)
+        """
+        abilities = self.current_system()["abilities"]
+        by_id = {ability["id"]: ability for ability in abilities}
+        updates = []
+        for ability_id, value in changes.items():
+            ability = by_id.get(ability_id)
+            value = self.normalize_value(value)
+            if ability is not None and ability["value"] != value:
+                updates.append((ability, value))
+        if not updates and not new_abilities:
+            return 0, 0
+
+        # 1. 段位批量判定（NumPy向量化），统计段位变化
+        old_ranks = self.get_ability_ranks([ability["value"] for ability, _ in updates])
+        new_ranks = self.get_ability_ranks([value for _, value in updates])
+        rank_changed = int(np.count_nonzero(old_ranks != new_ranks))
+
+        # 2. 更新内存数据（新增能力项逐个追加到列表末尾，不重建列表，保留批量编辑中暂存的修改）
+        for ability, value in updates:
+            ability["value"] = value
+        for ability in new_abilities:
+            abilities.append(ability)
+            self.ability_model.ability_appended()
+
+        # 3. 保存一次，历史记录一次写入
+        self.save_queue.request_save()
+        self.record_ability_values([(ability["id"], value) for ability, value in updates]
+                                   + [(ability["id"], ability["value"]) for ability in new_abilities])
+
+        # 4. 刷新UI：列表重绘一次、雷达图重绘一次
+        self.ability_model.refresh_all()
+        self.refresh_radar_chart()
+        return len(updates) + len(new_abilities), rank_changed
+
+    def import_abilities(self):
+        """从CSV/JSON文件批量导入能力值：按id或名称匹配已有能力项，名称不存在的作为新能力项添加"""
+        path, _ = QFileDialog.getOpenFileName(self, "导入能力值", "", IMPORT_FILE_FILTER)
+        if not path:
+            return
         try:
-            data = read_data()
-            for rs in data["rating_systems"]:
-                if rs["id"] == self.current_rating_system["id"]:
-                    rs["abilities"] = abilities
-                    break
-            write_data(data)
-        except Exception as e:
-            QMessageBox.warning(self, "保存失败", f"数据写入错误：{str(e)}")
+            entries = parse_ability_file(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "导入失败", str(e))
             return
 
-        # 5. 刷新UI（分步刷新，减少压力）
-        self.update_ability_list()  # 先更新列表
-        # 延迟刷新图表，避免UI阻塞
-        from PyQt6.QtCore import QTimer
-        QTimer.singleShot(100, self.refresh_radar_chart)  # 100ms后刷新图表
+        abilities = self.current_system()["abilities"]
+        by_id = {ability["id"]: ability for ability in abilities}
+        by_name = {}
+        for ability in abilities:
+            by_name.setdefault(ability["name"], ability)
+        changes, new_abilities, skipped = {}, [], 0
+        for entry in entries:
+            ability = by_id.get(entry["id"]) or by_name.get(entry["name"])
+            if ability is not None and ability["id"] not in by_id:
+                ability["value"] = self.normalize_value(entry["value"])  # 文件中重复的新能力项取最后一个
+            elif ability is not None:
+                changes[ability["id"]] = entry["value"]
+            elif not entry["name"]:
+                skipped += 1  # 只有id且匹配不到的条目
+            else:
+                ability = {"id": f"ability_{uuid.uuid4().hex[:8]}", "name": entry["name"],
+                           "value": self.normalize_value(entry["value"])}
+                by_name[entry["name"]] = ability
+                new_abilities.append(ability)
+        # 导入覆盖批量编辑中暂存的同一能力项
+        for ability_id in changes:
+            self.ability_model.pending.pop(ability_id, None)
+        self.update_batch_buttons()
+
+        changed, rank_changed = self.apply_ability_changes(changes, new_abilities)
+        message = f"导入完成：更新/新增{changed}项（新增{len(new_abilities)}项），{rank_changed}项段位变化"
+        if skipped:
+            message += f"，{skipped}项未匹配到能力项"
+        QMessageBox.information(self, "导入完成", message + "！")
 
     def add_ability(self):
         """添加能力项（弹窗交互）"""
@@ -464,28 +664,21 @@ class RatingManager(QWidget):
         }
 
         # 2. 更新内存数据
-        self.current_rating_system["abilities"].append(new_ability)
+        self.current_system()["abilities"].append(new_ability)
 
-        # 3. 写入JSON
-        data = read_data()
-        for rs in data["rating_systems"]:
-            if rs["id"] == self.current_rating_system["id"]:
-                rs["abilities"].append(new_ability)
-                break
-        write_result = write_data(data)
+        # 3. 写入JSON（current_rating_system即内存文档中的对象，后台保存），初始值记入历史
+        self.save_queue.request_save()
+        self.record_ability_values([(new_ability["id"], new_ability["value"])])
 
-        if write_result:
-            QMessageBox.information(self, "成功", f"能力项「{name}」添加成功！")
-            # 4. 刷新UI
-            self.update_ability_list()
-            self.data_updated.emit()
-        else:
-            QMessageBox.warning(self, "失败", "能力项添加失败，请重试！")
+        QMessageBox.information(self, "成功", f"能力项「{name}」添加成功！")
+        # 4. 刷新UI（列表末尾插入一行）
+        self.ability_model.ability_appended()
+        self.data_updated.emit()
 
     def edit_rank_rules(self):
         """编辑段位规则（弹窗交互）"""
         # 修复：将 rank_rules 作为第一个参数传递
-        dialog = RankRuleDialog(self.current_rating_system["rank_rules"], self)
+        dialog = RankRuleDialog(self.current_system()["rank_rules"], self)
         if dialog.exec():
             # 1. 获取修改后的段位规则
             updated_rules = dialog.get_updated_rules()
@@ -493,16 +686,12 @@ class RatingManager(QWidget):
             if self.validate_rank_rules(updated_rules):
                 # 3. 更新数据
                 self.current_rating_system["rank_rules"] = updated_rules
-                data = read_data()
-                for rs in data["rating_systems"]:
-                    if rs["id"] == self.current_rating_system["id"]:
-                        rs["rank_rules"] = updated_rules
-                        break
-                write_data(data)
+                self.get_rank_classifier()  # 规则已替换，重新编译段位判定器
+                self.save_queue.request_save()
 
                 QMessageBox.information(self, "成功", "段位规则修改成功！")
-                # 4. 刷新UI（段位标签会重新匹配）
-                self.update_ability_list()
+                # 4. 刷新UI（段位标签会重新匹配，行数不变只需重绘）
+                self.ability_model.refresh_all()
             else:
                 QMessageBox.warning(self, "错误", "段位规则不合法（区间重叠或未覆盖0-100）！")
 
@@ -522,19 +711,30 @@ class RatingManager(QWidget):
                 return False
         return True
 
-    def refresh_radar_chart(self):
-        """刷新雷达图（添加异常捕获）"""
+    def refresh_radar_chart(self, force: bool = False):
+        """刷新雷达图（添加异常捕获）；force为True时忽略渲染缓存"""
         try:
             if self.current_rating_system:
                 abilities = self.current_rating_system.get("abilities", [])
-                self.radar_canvas.update_chart(abilities)
+                self.radar_canvas.update_chart(abilities, self.current_rating_system["id"], force)
         except Exception as e:
             QMessageBox.critical(self, "图表刷新失败", f"错误详情：{str(e)}")
             print(f"雷达图刷新错误：{e}")  # 控制台输出详细错误，便于调试
 
-    def create_default_rating_system(self):
-        """创建默认评分系统（容错处理）"""
-        default_rank_rules = [
+    def save_radar_image(self):
+        """把当前雷达图保存为图片"""
+        name = self.current_rating_system["name"] if self.current_rating_system else "雷达图"
+        path, _ = QFileDialog.getSaveFileName(self, "保存雷达图", f"{name}.png", "PNG 图片 (*.png);;JPEG 图片 (*.jpg)")
+        if not path:
+            return
+        if self.radar_canvas.save_image(path):
+            QMessageBox.information(self, "成功", "雷达图已保存！")
+        else:
+            QMessageBox.warning(self, "错误", "雷达图保存失败（图表尚未渲染完成或路径不可写）！")
+
+    @staticmethod
+    def default_rank_rules() -> list:
+        return [
             {"rank": "S", "min": 90, "max": 100},
             {"rank": "A", "min": 80, "max": 89},
             {"rank": "B", "min": 70, "max": 79},
@@ -543,6 +743,9 @@ class RatingManager(QWidget):
             {"rank": "E", "min": 40, "max": 49},
             {"rank": "F", "min": 0, "max": 39}
         ]
+
+    def create_default_rating_system(self):
+        """创建默认评分系统（容错处理）"""
         default_abilities = [
             {"id": f"ability_{uuid.uuid4().hex[:8]}", "name": "学习能力", "value": 60},
             {"id": f"ability_{uuid.uuid4().hex[:8]}", "name": "执行能力", "value": 55},
@@ -553,18 +756,16 @@ class RatingManager(QWidget):
             "id": f"rating_{uuid.uuid4().hex[:8]}",
             "name": "综合能力",
             "abilities": default_abilities,
-            "rank_rules": default_rank_rules
+            "rank_rules": self.default_rank_rules()
         }
 
         # 写入JSON
-        data = read_data()
-        data["rating_systems"].append(new_rating_system)
-        write_data(data)
+        get_rating_index().add(new_rating_system)
+        self.save_queue.request_save()
+        self.record_ability_values([(ability["id"], ability["value"]) for ability in default_abilities])
 
         # 更新当前评分系统
-        self.current_rating_system = new_rating_system
-        self.update_ability_list()
-        self.refresh_radar_chart()
+        self.populate_system_combo(new_rating_system["id"])
 
 
 class RankRuleDialog(QDialog):
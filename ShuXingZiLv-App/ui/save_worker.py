@@ -0,0 +1,103 @@
+from PyQt6.QtCore import QObject, QThread, QTimer, QElapsedTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtWidgets import QApplication
+from utils.data_handler import data_store
+
+SAVE_DEBOUNCE_MS = 300  # 连续修改停止多久后才真正保存（毫秒）
+SAVE_MAX_DELAY_MS = 2500  # 一直有修改时，距第一个未保存的请求最多等待多久就强制保存（毫秒）
+
+
+class _SaveWorker(QObject):
+    """运行在后台线程中，负责把快照写盘"""
+    finished = pyqtSignal(bool, str)  # (是否成功, 错误信息)
+
+    @pyqtSlot(int, object)
+    def save(self, generation, snapshot):
+        try:
+            ok = data_store.write_snapshot(generation, snapshot)
+            self.finished.emit(ok, "" if ok else "写入数据失败")
+        except Exception as e:
+            print(f"❌ 写入数据失败：{str(e)}")
+            self.finished.emit(False, str(e))
+
+
+class SaveQueue(QObject):
+    """
+    后台保存队列：页面修改内存文档后调用request_save()，
+    防抖合并连续的保存请求（最多推迟max_delay_ms），在GUI线程取快照、后台线程写盘，结果通过信号通知
+    """
+    save_succeeded = pyqtSignal()
+    save_failed = pyqtSignal(str)  # 错误信息
+    _submit = pyqtSignal(int, object)  # 跨线程投递(修改代数, 快照)
+
+    def __init__(self, debounce_ms: int = SAVE_DEBOUNCE_MS, max_delay_ms: int = SAVE_MAX_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self._busy = False  # 后台线程是否正在写盘
+        self._pending = False  # 写盘期间是否又收到了保存请求
+        self._debounce_ms = debounce_ms
+        self._max_delay_ms = max_delay_ms
+        self._first_request = QElapsedTimer()  # 第一个尚未保存的请求到来后经过的时间
+
+        self._thread = QThread()
+        self._worker = _SaveWorker()
+        self._worker.moveToThread(self._thread)
+        self._submit.connect(self._worker.save)
+        self._worker.finished.connect(self._on_finished)
+        self._thread.start()
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.timeout.connect(self._dispatch)
+
+    def request_save(self):
+        """标记内存文档已修改并（防抖后）异步保存"""
+        data_store.mark_dirty()
+        if not self._first_request.isValid():
+            self._first_request.start()
+        # 重新计时合并连续的修改，但不超过最长等待时间（连续编辑时也会定期保存）
+        remaining = self._max_delay_ms - self._first_request.elapsed()
+        self._debounce_timer.start(max(0, min(self._debounce_ms, remaining)))
+
+    def _dispatch(self):
+        self._first_request.invalidate()
+        if self._busy:
+            self._pending = True
+            return
+        if not data_store.dirty:
+            return
+        generation, snapshot = data_store.snapshot()
+        self._busy = True
+        self._submit.emit(generation, snapshot)
+
+    def _on_finished(self, ok: bool, error: str):
+        self._busy = False
+        if ok:
+            self.save_succeeded.emit()
+        else:
+            self.save_failed.emit(error)
+        if self._pending:
+            self._pending = False
+            self._dispatch()
+
+    def shutdown(self):
+        """退出前调用：停止后台线程，并同步写掉尚未保存的修改"""
+        self._debounce_timer.stop()
+        self._thread.quit()
+        self._thread.wait()
+        try:
+            data_store.flush()
+        except Exception as e:
+            print(f"❌ 写入数据失败：{str(e)}")
+
+
+_save_queue = None
+
+
+def get_save_queue() -> SaveQueue:
+    """获取全局保存队列（首次调用时创建，应用退出时自动落盘）"""
+    global _save_queue
+    if _save_queue is None:
+        _save_queue = SaveQueue()
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_save_queue.shutdown)
+    return _save_queue
@@ -1,13 +1,26 @@
 import sys
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                             QTreeWidget, QTreeWidgetItem, QDialog, QFormLayout,
-                             QLineEdit, QDateEdit, QSpinBox, QMessageBox, QHeaderView)
+                             QTreeView, QDialog, QFormLayout, QAbstractItemView,
+                             QLineEdit, QDateEdit, QSpinBox, QMessageBox, QHeaderView, QComboBox)
 from PyQt6.QtCore import Qt, QDate
-from PyQt6.QtGui import QFont, QColor
-from utils.data_handler import read_data, write_data
-from datetime import datetime
+from PyQt6.QtGui import QFont
+from utils.data_handler import (read_data, get_target_index, add_points_record, search_targets,
+                                update_target_indexes, remove_from_target_indexes, get_deadline_index,
+                                update_target_statuses)
+from ui.save_worker import get_save_queue
+from ui.target_tree_model import TargetTreeModel, StatusButtonDelegate, STATUS_COLUMN
 import uuid
 
+SEARCH_EXPAND_LIMIT = 100  # 搜索时最多自动展开定位的命中数（其余命中仍高亮，回车逐个定位）
+DUE_SOON_DAYS = 7  # "即将到期"筛选的天数
+# 显示模式：(下拉框文字, 模式)；None为树形显示，其余为按截止时间索引查询后平铺显示
+VIEW_MODES = [
+    ("全部目标", None),
+    ("已逾期", "overdue"),
+    (f"{DUE_SOON_DAYS}天内到期", "due_soon"),
+    ("按截止时间排序", "by_deadline"),
+]
+
 class TargetDialog(QDialog):
     """添加/编辑目标的对话框"""
     def __init__(self, initial_data=None, parent_data=None, is_sub=False):
@@ -82,10 +95,7 @@ class TargetDialog(QDialog):
         """获取父任务的子任务数量"""
         if not self.parent_data or "id" not in self.parent_data:
             return 0
-        parent_id = self.parent_data["id"]
-        data = read_data()
-        targets = data.get("targets", [])
-        return len([t for t in targets if t.get("parent_id") == parent_id])
+        return len(get_target_index().children_of(self.parent_data["id"]))
 
     def _on_confirm(self):
         """确认按钮验证"""
@@ -108,6 +118,7 @@ class TargetDialog(QDialog):
 class TargetManager(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.save_queue = get_save_queue()  # 后台保存队列（不阻塞界面）
         self.init_ui()
         self.load_targets()  # 加载数据
 
@@ -124,41 +135,73 @@ class TargetManager(QWidget):
         self.add_sub_btn = QPushButton("添加子任务")
         self.refresh_btn = QPushButton("刷新列表")
         self.add_sub_btn.setEnabled(False)  # 初始置灰
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("搜索目标（回车定位下一个）")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setFixedWidth(220)
+        self.search_label = QLabel()
+        self.search_label.setStyleSheet("color: #888;")
+        self.search_results = []  # 当前搜索命中的目标id（按添加顺序）
+        self.search_pos = 0  # 回车定位到的命中序号
 
         top_layout.addWidget(self.title)
         top_layout.addStretch()
+        top_layout.addWidget(self.search_label)
+        top_layout.addWidget(self.search_edit)
         top_layout.addWidget(self.add_btn)
         top_layout.addWidget(self.add_sub_btn)
         top_layout.addWidget(self.refresh_btn)
         main_layout.addLayout(top_layout)
 
-        # 2. 中间区域：树形控件（核心修复：列宽和布局）
-        self.tree_widget = QTreeWidget()
-        self.tree_widget.setHeaderLabels(["目标名称", "截止时间", "完成状态", "奖励积分"])
+        # 2. 中间区域：树形视图（模型懒加载子节点，状态按钮由委托绘制）
+        self.tree_model = TargetTreeModel(self)
+        self.tree_view = QTreeView()
+        self.tree_view.setModel(self.tree_model)
+        self.tree_view.setUniformRowHeights(True)  # 行高一致，滚动时无需逐行计算
+        self.tree_view.setMouseTracking(True)  # 委托绘制按钮的悬停效果
+        self.status_delegate = StatusButtonDelegate(self.tree_view)
+        self.status_delegate.status_clicked.connect(self.on_button_status_toggle)
+        self.tree_view.setItemDelegateForColumn(STATUS_COLUMN, self.status_delegate)
         # 修复列宽设置：确保"完成状态"列（索引2）不被拉伸挤压
-        self.tree_widget.setColumnWidth(0, 250)    # 目标名称
-        self.tree_widget.setColumnWidth(1, 120)    # 截止时间
-        self.tree_widget.setColumnWidth(2, 100)    # 完成状态（按钮宽度）
-        self.tree_widget.setColumnWidth(3, 100)    # 奖励积分
+        self.tree_view.setColumnWidth(0, 250)    # 目标名称
+        self.tree_view.setColumnWidth(1, 120)    # 截止时间
+        self.tree_view.setColumnWidth(2, 100)    # 完成状态（按钮宽度）
+        self.tree_view.setColumnWidth(3, 100)    # 奖励积分
+        self.tree_view.setColumnWidth(4, 100)    # 子树积分
+        self.tree_view.setColumnWidth(5, 120)    # 完成度
+        self.tree_view.setColumnWidth(6, 80)     # 逾期数
         # 禁止列宽自动拉伸导致按钮不可见
-        self.tree_widget.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
-        self.tree_widget.header().setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
-        self.tree_widget.header().setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)  # 固定完成状态列宽
-        self.tree_widget.header().setSectionResizeMode(3, QHeaderView.ResizeMode.Fixed)
+        self.tree_view.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+        self.tree_view.header().setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
+        self.tree_view.header().setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)  # 固定完成状态列宽
+        self.tree_view.header().setSectionResizeMode(3, QHeaderView.ResizeMode.Fixed)
+        self.tree_view.header().setSectionResizeMode(4, QHeaderView.ResizeMode.Fixed)
+        self.tree_view.header().setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)
+        self.tree_view.header().setSectionResizeMode(6, QHeaderView.ResizeMode.Fixed)
         # 其他属性
-        self.tree_widget.setSelectionMode(QTreeWidget.SelectionMode.SingleSelection)
-        self.tree_widget.setDragEnabled(True)
-        self.tree_widget.setAcceptDrops(True)
-        self.tree_widget.setDropIndicatorShown(True)
-        self.tree_widget.itemSelectionChanged.connect(self.on_item_selected)
-        main_layout.addWidget(self.tree_widget)  # 添加到主布局
-
-        # 3. 底部区域：编辑/删除按钮
+        self.tree_view.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.tree_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tree_view.selectionModel().selectionChanged.connect(self.on_item_selected)
+        # 拖动目标到其他目标上改变父节点（数据由move_target修改并保存）
+        self.tree_view.setDragEnabled(True)
+        self.tree_view.setAcceptDrops(True)
+        self.tree_view.setDropIndicatorShown(True)
+        self.tree_view.setDragDropMode(QAbstractItemView.DragDropMode.InternalMove)
+        # 排队执行：拖放事件处理完之后再修改数据、重建模型
+        self.tree_model.move_requested.connect(self.move_target, Qt.ConnectionType.QueuedConnection)
+        main_layout.addWidget(self.tree_view)  # 添加到主布局
+
+        # 3. 底部区域：显示模式（筛选/排序）+编辑/删除按钮
         bottom_layout = QHBoxLayout()
+        self.view_combo = QComboBox()
+        for text, _ in VIEW_MODES:
+            self.view_combo.addItem(text)
         self.edit_btn = QPushButton("编辑")
         self.delete_btn = QPushButton("删除")
         self.edit_btn.setEnabled(False)
         self.delete_btn.setEnabled(False)
+        bottom_layout.addWidget(QLabel("显示："))
+        bottom_layout.addWidget(self.view_combo)
         bottom_layout.addStretch()
         bottom_layout.addWidget(self.edit_btn)
         bottom_layout.addWidget(self.delete_btn)
@@ -170,119 +213,117 @@ class TargetManager(QWidget):
         self.refresh_btn.clicked.connect(self.load_targets)
         self.edit_btn.clicked.connect(self.edit_target)
         self.delete_btn.clicked.connect(self.delete_target)
+        self.view_combo.currentIndexChanged.connect(lambda _: self.apply_view_mode())
+        self.search_edit.textChanged.connect(self.on_search)
+        self.search_edit.returnPressed.connect(self.next_search_result)
 
         # 设置窗口最小尺寸，避免控件挤压
         self.setMinimumSize(800, 600)
 
     def load_targets(self):
-        """加载目标数据（增强兼容性处理）"""
-        self.tree_widget.clear()
+        """全量加载目标数据（仅首次加载/刷新列表时使用，保留展开和选中状态）"""
+        expanded_ids = self.tree_model.expanded_ids(self.tree_view)
+        selected_id = self.selected_target_id()
         try:
-            data = read_data()
-            # 确保targets字段存在
-            if "targets" not in data:
-                data["targets"] = []
-            # 为旧数据补充必要字段（防止缺失字段导致崩溃）
-            for target in data["targets"]:
-                # 补充parent_id（默认为root）
-                if "parent_id" not in target:
-                    target["parent_id"] = "root"
-                # 补充status（默认为未开始）
-                if "status" not in target:
-                    target["status"] = "未开始"
-                # 补充id（防止无id导致后续操作崩溃）
-                if "id" not in target:
-                    target["id"] = str(uuid.uuid4())
-            write_data(data)  # 保存修复后的数据
-
-            # 构建树形结构
-            targets = data["targets"]
-            root_items = [t for t in targets if t["parent_id"] == "root"]
-            for root in root_items:
-                root_item = self.create_tree_item(root)
-                self.tree_widget.addTopLevelItem(root_item)
-                self.add_children(root_item, root["id"], targets)
+            # 旧数据的缺失字段已在读取时由数据迁移一次性补全（见data_handler.migrate_data）
+            # 重建模型（只创建顶层节点，子节点在展开时懒加载；平铺模式下重新查询）
+            self.tree_model.flat_targets = self.view_mode_targets()
+            self.tree_model.reload()
+
+            # 恢复展开和选中状态（父节点在前，逐层触发懒加载）
+            for tid in expanded_ids:
+                index = self.tree_model.index_for_id(tid)
+                if index.isValid():
+                    if self.tree_model.canFetchMore(index):
+                        self.tree_model.fetchMore(index)
+                    self.tree_view.expand(index)
+            if selected_id:
+                index = self.tree_model.index_for_id(selected_id)
+                if index.isValid():
+                    self.tree_view.setCurrentIndex(index)
+            if self.search_edit.text().strip():
+                self.on_search(self.search_edit.text())
         except Exception as e:
             QMessageBox.critical(self, "加载失败", f"数据加载出错：{str(e)}")
 
-    def create_tree_item(self, target):
-        """创建树形节点（确保按钮显示及事件绑定正确）"""
-        item = QTreeWidgetItem([
-            target["name"],
-            target["deadline"],
-            "",  # 完成状态由按钮控制
-            str(target["points"])
-        ])
-        item.setData(0, Qt.ItemDataRole.UserRole, target["id"])  # 存储任务ID
-
-        # 创建完成/已完成按钮
-        status_btn = QPushButton(self.tree_widget)  # 显式设置父控件
-        if target["status"] == "已完成":
-            status_btn.setText("已完成")
-            status_btn.setStyleSheet("""
-                QPushButton { 
-                    background-color: #f0f0f0; 
-                    color: #666; 
-                    border: 1px solid #ccc; 
-                    border-radius: 3px;
-                    padding: 2px 8px;
-                    min-width: 60px;
-                }
-            """)
-        else:
-            status_btn.setText("完成")
-            status_btn.setStyleSheet("""
-                QPushButton { 
-                    background-color: #e6f7ff; 
-                    color: #1890ff; 
-                    border: 1px solid #91d5ff; 
-                    border-radius: 3px;
-                    padding: 2px 8px;
-                    min-width: 60px;
-                }
-                QPushButton:hover {
-                    background-color: #bae7ff;
-                }
-            """)
-
-        # 关键修复：显式获取并处理目标ID，避免引用错误
-        target_id = target.get("id", "")  # 安全获取ID，不存在则返回空字符串
-        if not target_id:  # 若ID缺失，自动生成新ID（兜底处理）
-            target_id = str(uuid.uuid4())
-            # 同步更新target的id（确保数据一致性）
-            target["id"] = target_id
-
-        # 绑定按钮点击事件（使用处理后的target_id）
-        status_btn.clicked.connect(
-            lambda checked, tid=target_id: self.on_button_status_toggle(tid)
-        )
-
-        # 将按钮添加到第3列
-        self.tree_widget.setItemWidget(item, 2, status_btn)
-
-        # 已完成任务文字变灰
-        if target["status"] == "已完成":
-            for col in range(4):
-                item.setForeground(col, QColor(128, 128, 128))
-
-        return item
-
-    def add_children(self, parent_item, parent_id, targets):
-        """递归添加子节点（增加异常捕获）"""
+    def view_mode_targets(self):
+        """按当前显示模式从截止时间索引查询目标（树形模式返回None）"""
+        mode = VIEW_MODES[self.view_combo.currentIndex()][1]
+        if mode is None:
+            return None
+        deadlines = get_deadline_index()
+        if mode == "overdue":
+            return deadlines.overdue()
+        if mode == "due_soon":
+            return deadlines.due_within(DUE_SOON_DAYS)
+        return deadlines.sorted_targets()
+
+    def apply_view_mode(self):
+        """切换显示模式或平铺列表中的目标被增删改后调用，保留选中项"""
         try:
-            children = [t for t in targets if t["parent_id"] == parent_id]
-            for child in children:
-                child_item = self.create_tree_item(child)
-                parent_item.addChild(child_item)
-                self.add_children(child_item, child["id"], targets)
+            selected_id = self.selected_target_id()
+            self.tree_model.sync_index()
+            self.tree_model.set_flat_targets(self.view_mode_targets())
+            self.tree_view.setRootIsDecorated(self.tree_model.flat_targets is None)  # 平铺时不留展开箭头的缩进
+            if selected_id:
+                index = self.tree_model.index_for_id(selected_id)
+                if index.isValid():
+                    self.tree_view.setCurrentIndex(index)
+            if self.search_edit.text().strip():
+                self.on_search(self.search_edit.text())
+        except Exception as e:
+            QMessageBox.warning(self, "筛选失败", f"错误：{str(e)}")
+
+    def on_search(self, text):
+        """输入即搜索：高亮全部命中，并逐层展开前SEARCH_EXPAND_LIMIT个命中所在的分支"""
+        try:
+            query = text.strip()
+            self.search_results = search_targets(query) if query else []
+            self.search_pos = 0
+            self.tree_model.sync_index()
+            self.tree_model.set_highlight(self.search_results)
+            if not query:
+                self.search_label.setText("")
+                return
+            self.search_label.setText(f"找到 {len(self.search_results)} 项")
+            index = get_target_index()
+            for target_id in self.search_results[:SEARCH_EXPAND_LIMIT]:
+                self.tree_model.load_path(target_id)
+                for ancestor_id in index.ancestors(target_id):
+                    self.tree_view.expand(self.tree_model.index_for_id(ancestor_id))
+            if self.search_results:
+                self.locate_target(self.search_results[0])
         except Exception as e:
-            QMessageBox.warning(self, "添加子节点失败", f"错误：{str(e)}")
+            QMessageBox.warning(self, "搜索失败", f"错误：{str(e)}")
+
+    def next_search_result(self):
+        """回车：依次定位到下一个命中（超出自动展开范围的命中此时才展开）"""
+        if not self.search_results:
+            return
+        self.search_pos = (self.search_pos + 1) % len(self.search_results)
+        self.locate_target(self.search_results[self.search_pos])
+
+    def locate_target(self, target_id):
+        """展开目标所在分支，选中并滚动到该行"""
+        model_index = self.tree_model.load_path(target_id)
+        if not model_index.isValid():
+            return
+        for ancestor_id in get_target_index().ancestors(target_id):
+            self.tree_view.expand(self.tree_model.index_for_id(ancestor_id))
+        self.tree_view.setCurrentIndex(model_index)
+        self.tree_view.scrollTo(model_index)
+
+    def selected_target_id(self):
+        """返回当前选中目标的id（未选中返回None）"""
+        indexes = self.tree_view.selectionModel().selectedRows(0)
+        if not indexes:
+            return None
+        return indexes[0].data(Qt.ItemDataRole.UserRole)
 
     def on_item_selected(self):
         """选中节点时启用按钮（增加空值判断）"""
         try:
-            selected_items = self.tree_widget.selectedItems()
-            if selected_items and len(selected_items) > 0:
+            if self.selected_target_id():
                 self.add_sub_btn.setEnabled(True)
                 self.edit_btn.setEnabled(True)
                 self.delete_btn.setEnabled(True)
@@ -307,26 +348,29 @@ class TargetManager(QWidget):
                 target_data["id"] = str(uuid.uuid4())
                 target_data["parent_id"] = parent_id
                 target_data["status"] = "未开始"
-                # 保存数据
-                data = read_data()
-                if "targets" not in data:
-                    data["targets"] = []
-                data["targets"].append(target_data)
-                write_data(data)
-                self.load_targets()
+                # 保存数据（通过索引添加，同时追加到targets列表）
+                self.tree_model.sync_index()
+                get_target_index().add(target_data)
+                update_target_indexes(target_data)
+                self.save_queue.request_save()
+                if self.tree_model.flat_targets is not None:
+                    self.apply_view_mode()
+                index = self.tree_model.insert_target(target_data)
+                self.tree_model.refresh_with_ancestors([target_data["id"]])  # 祖先的子树汇总变了
+                if parent_id != "root":
+                    self.tree_view.expand(self.tree_model.index_for_id(parent_id))
+                if index.isValid():
+                    self.tree_view.setCurrentIndex(index)
         except Exception as e:
             QMessageBox.critical(self, "添加失败", f"错误：{str(e)}")
 
     def show_add_sub_dialog(self):
         """添加子任务（增加选中项验证）"""
         try:
-            selected_items = self.tree_widget.selectedItems()
-            if not selected_items:
+            parent_id = self.selected_target_id()
+            if not parent_id:
                 return
-            selected_item = selected_items[0]
-            parent_id = selected_item.data(0, Qt.ItemDataRole.UserRole)
-            data = read_data()
-            parent_data = next((t for t in data["targets"] if t["id"] == parent_id), None)
+            parent_data = get_target_index().get(parent_id)
             if parent_data:
                 self.show_add_dialog(parent_id=parent_id, parent_data=parent_data)
         except Exception as e:
@@ -335,34 +379,28 @@ class TargetManager(QWidget):
     def on_button_status_toggle(self, target_id):
         """处理完成按钮点击（增强数据验证）"""
         try:
+            self.tree_model.sync_index()
             data = read_data()
-            target = next((t for t in data["targets"] if t["id"] == target_id), None)
+            index = get_target_index()
+            target = index.get(target_id)
             if not target:
                 QMessageBox.warning(self, "错误", "未找到该任务数据")
                 return
+            # 状态切换只会影响自身、祖先（自动完成）和子孙（重置），记录旧状态用于增量刷新
+            affected = [target_id] + index.ancestors(target_id) + \
+                       [t["id"] for t in index.iter_subtree(target_id, include_self=False)]
+            old_statuses = {tid: index.get(tid)["status"] for tid in affected}
 
             # 切换状态（其余逻辑与原代码一致）
             new_status = "未开始" if target["status"] == "已完成" else "已完成"
             old_status = target["status"]
             target["status"] = new_status
 
-            # 积分处理
-            if "points_account" not in data:
-                data["points_account"] = {"total": 0, "records": []}
+            # 积分处理（总额和流水一起更新，流水同步到积分账本）
             if old_status != "已完成" and new_status == "已完成":
-                data["points_account"]["total"] += target["points"]
-                data["points_account"]["records"].append({
-                    "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "reason": f"完成任务：{target['name']}",
-                    "points": target["points"]
-                })
+                add_points_record(data, target["points"], f"完成任务：{target['name']}", target_id)
             elif old_status == "已完成" and new_status != "已完成":
-                data["points_account"]["total"] -= target["points"]
-                data["points_account"]["records"].append({
-                    "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "reason": f"取消完成任务：{target['name']}",
-                    "points": -target["points"]
-                })
+                add_points_record(data, -target["points"], f"取消完成任务：{target['name']}", target_id)
 
             # 父子任务联动
             parent_id = target["parent_id"]
@@ -371,18 +409,22 @@ class TargetManager(QWidget):
             if new_status == "未开始":
                 self.reset_children_status(target_id, data)
 
-            write_data(data)
-            self.load_targets()
+            # 同步子树汇总；状态变化的目标及其祖先的汇总列都要重绘
+            changed = [tid for tid in affected if index.get(tid)["status"] != old_statuses[tid]]
+            update_target_statuses([index.get(tid) for tid in changed])
+            self.save_queue.request_save()
+            self.tree_model.refresh_with_ancestors(changed)
         except Exception as e:
             QMessageBox.critical(self, "状态更新失败", f"错误：{str(e)}")
 
     def check_parent_complete(self, parent_id, data):
         """检查父任务是否自动完成"""
         try:
-            parent = next((t for t in data["targets"] if t["id"] == parent_id), None)
+            index = get_target_index()
+            parent = index.get(parent_id)
             if not parent:
                 return
-            children = [t for t in data["targets"] if t["parent_id"] == parent_id]
+            children = index.children_of(parent_id)
             if all(child["status"] == "已完成" for child in children):
                 parent["status"] = "已完成"
                 grandparent_id = parent["parent_id"]
@@ -396,27 +438,22 @@ class TargetManager(QWidget):
     def reset_children_status(self, parent_id, data):
         """重置子任务状态"""
         try:
-            children = [t for t in data["targets"] if t["parent_id"] == parent_id]
-            for child in children:
+            for child in get_target_index().iter_subtree(parent_id, include_self=False):
                 child["status"] = "未开始"
-                self.reset_children_status(child["id"], data)
         except Exception as e:
             QMessageBox.warning(self, "联动失败", f"子任务状态重置错误：{str(e)}")
 
     def edit_target(self):
         """编辑目标（修复闪退问题：增加完整异常处理）"""
         try:
-            selected_items = self.tree_widget.selectedItems()
-            if not selected_items:
+            if not self.tree_view.selectionModel().hasSelection():
                 return
-            selected_item = selected_items[0]
-            target_id = selected_item.data(0, Qt.ItemDataRole.UserRole)
+            target_id = self.selected_target_id()
             if not target_id:
                 QMessageBox.warning(self, "错误", "未找到任务ID")
                 return
 
-            data = read_data()
-            target = next((t for t in data["targets"] if t["id"] == target_id), None)
+            target = get_target_index().get(target_id)
             if not target:
                 QMessageBox.warning(self, "错误", "未找到该任务数据")
                 return
@@ -433,20 +470,44 @@ class TargetManager(QWidget):
                 target["name"] = new_data["name"]
                 target["deadline"] = new_data["deadline"]
                 target["points"] = new_data["points"]
-                write_data(data)
-                self.load_targets()
+                update_target_indexes(target)
+                self.save_queue.request_save()
+                if self.tree_model.flat_targets is not None:
+                    self.apply_view_mode()  # 截止时间可能变了，重新查询排序
+                else:
+                    self.tree_model.refresh_with_ancestors([target_id])
         except Exception as e:
             # 捕获所有异常，避免闪退并显示错误信息
             QMessageBox.critical(self, "编辑失败", f"错误：{str(e)}")
 
+    def move_target(self, target_id, new_parent_id):
+        """拖放改变目标的父节点（整棵子树随之移动）"""
+        try:
+            self.tree_model.sync_index()
+            index = get_target_index()
+            target = index.get(target_id)
+            if not target or (new_parent_id != "root" and index.get(new_parent_id) is None):
+                QMessageBox.warning(self, "错误", "未找到该任务数据")
+                return
+            if new_parent_id == target_id or target_id in index.ancestors(new_parent_id):
+                QMessageBox.warning(self, "移动失败", "不能把目标移动到它自己或子目标下")
+                return
+            if target["parent_id"] == new_parent_id:
+                return
+            index.move(target_id, new_parent_id)
+            update_target_indexes(target)  # 父节点变了，子树汇总整体重算
+            self.save_queue.request_save()
+            self.load_targets()
+            self.locate_target(target_id)
+        except Exception as e:
+            QMessageBox.critical(self, "移动失败", f"错误：{str(e)}")
+
     def delete_target(self):
         """删除目标（增加异常处理）"""
         try:
-            selected_items = self.tree_widget.selectedItems()
-            if not selected_items:
+            if not self.tree_view.selectionModel().hasSelection():
                 return
-            selected_item = selected_items[0]
-            target_id = selected_item.data(0, Qt.ItemDataRole.UserRole)
+            target_id = self.selected_target_id()
             if not target_id:
                 QMessageBox.warning(self, "错误", "未找到任务ID")
                 return
@@ -456,21 +517,16 @@ class TargetManager(QWidget):
                                     "确定要删除该目标及所有子任务吗？") != QMessageBox.StandardButton.Yes:
                 return
 
-            data = read_data()
-
-            # 递归删除子任务
-            def delete_children(parent_id):
-                children = [t for t in data["targets"] if t["parent_id"] == parent_id]
-                for child in children:
-                    delete_children(child["id"])
-                    data["targets"].remove(child)
-
-            delete_children(target_id)
-            # 删除自身
-            target = next((t for t in data["targets"] if t["id"] == target_id), None)
-            if target:
-                data["targets"].remove(target)
-            write_data(data)
-            self.load_targets()
+            # 删除自身及所有子任务（索引一次性收集子树并过滤targets列表）
+            self.tree_model.sync_index()
+            ancestor_ids = get_target_index().ancestors(target_id)
+            removed_ids = get_target_index().remove_subtree(target_id)
+            remove_from_target_indexes(removed_ids)
+            self.save_queue.request_save()
+            if self.tree_model.flat_targets is not None:
+                self.apply_view_mode()
+            else:
+                self.tree_model.remove_target(target_id, removed_ids)
+                self.tree_model.refresh_targets(ancestor_ids)  # 祖先的子树汇总变了
         except Exception as e:
             QMessageBox.critical(self, "删除失败", f"错误：{str(e)}")
\ No newline at end of file
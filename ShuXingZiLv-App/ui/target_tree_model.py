@@ -0,0 +1,431 @@
+from datetime import date
+from typing import Dict, List, Optional
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt6.QtCore import (Qt, QAbstractItemModel, QModelIndex, QRect, QRectF, QEvent, QObject, QRunnable,
+                          QThreadPool, QMimeData, pyqtSignal)
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QColor, QPen
+from utils.data_handler import get_target_index, get_target_aggregates, build_target_aggregates
+from utils.target_index import ROOT_ID
+from utils.deadline_index import is_overdue
+
+FETCH_BATCH_SIZE = 200  # 每次懒加载的子节点数量（超大平铺列表分批加载）
+STATUS_COLUMN = 2  # "完成状态"列
+AGGREGATE_COLUMN = 4  # 第一个子树汇总列（子树积分、完成度、逾期数）
+TARGET_MIME_TYPE = "application/x-shuxing-target-id"  # 拖动目标时携带的目标id
+HIGHLIGHT_COLOR = QColor(255, 243, 176)  # 搜索命中行的背景色
+OVERDUE_COLOR = QColor(220, 53, 69)  # 已逾期未完成目标的截止时间文字颜色
+
+
+class _AggregateSignals(QObject):
+    finished = pyqtSignal(object)  # 构建好的TargetAggregates（构建期间数据被修改时为None）
+
+
+class _AggregateTask(QRunnable):
+    """在线程池中构建子树汇总（导入NumPy和整体计算都不占用GUI线程）"""
+
+    def __init__(self):
+        super().__init__()
+        self.signals = _AggregateSignals()  # 由任务持有，不随模型销毁
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            aggregates = build_target_aggregates()
+        except Exception as e:
+            print(f"⚠️  子树汇总构建失败：{str(e)}")
+            aggregates = False
+        self.signals.finished.emit(aggregates)
+
+
+_aggregate_pool = None
+
+
+def _get_aggregate_pool() -> QThreadPool:
+    """子树汇总构建线程池（退出前等待构建完成，避免向已销毁的对象发信号）"""
+    global _aggregate_pool
+    if _aggregate_pool is None:
+        _aggregate_pool = QThreadPool()
+        _aggregate_pool.setMaxThreadCount(1)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_aggregate_pool.waitForDone)
+    return _aggregate_pool
+
+
+class _Node:
+    """模型内部节点：只保存目标id和已加载的子节点，目标数据始终从索引中读取"""
+    __slots__ = ("target_id", "parent", "row", "children")
+
+    def __init__(self, target_id: str, parent: Optional["_Node"], row: int = 0):
+        self.target_id = target_id
+        self.parent = parent
+        self.row = row  # 在父节点children中的位置（缓存，避免list.index）
+        self.children: List["_Node"] = []  # 已加载的子节点（按索引中的顺序）
+
+
+class TargetTreeModel(QAbstractItemModel):
+    """
+    目标树模型：数据来自TargetIndex，子节点在展开时才通过canFetchMore/fetchMore分批创建，
+    内存和渲染开销只与已展开/可见的行数相关，而与目标总数无关
+    """
+    HEADERS = ["目标名称", "截止时间", "完成状态", "奖励积分", "子树积分", "完成度", "逾期数"]
+
+    move_requested = pyqtSignal(str, str)  # 拖放改变父节点：(目标id, 新父节点id)，由页面修改数据
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.highlight_ids = set()  # 搜索命中的目标id（背景高亮）
+        self.flat_targets: Optional[List[Dict]] = None  # 平铺模式（筛选/排序结果）下的目标列表
+        self._aggregate_task: Optional[_AggregateTask] = None  # 构建中的子树汇总任务
+        self._reset_nodes()
+
+    def _reset_nodes(self):
+        self.index_data = get_target_index()
+        self.today = date.today()  # 判断逾期的日期（模型重建时更新）
+        self._root = _Node(ROOT_ID, None)
+        self._nodes: Dict[str, _Node] = {}  # 已加载节点：目标id -> 节点
+        self.aggregates = None  # 子树汇总（汇总列首次绘制时才取得，没有构建过时在后台线程构建，不拖慢启动）
+
+    def request_aggregates(self):
+        """汇总列需要数据时调用：已构建的直接使用，否则交给后台线程构建，完成后重绘汇总列"""
+        if self._aggregate_task is not None:
+            return
+        aggregates = get_target_aggregates(build=False)
+        if aggregates is not None:
+            self._set_aggregates(aggregates)
+            return
+        self._aggregate_task = _AggregateTask()
+        self._aggregate_task.signals.finished.connect(self._on_aggregates_built)
+        _get_aggregate_pool().start(self._aggregate_task)
+
+    def _on_aggregates_built(self, aggregates):
+        self._aggregate_task = None
+        if aggregates is None:
+            self.request_aggregates()  # 构建期间数据被修改，按最新数据重新构建
+        elif aggregates is not False:
+            self._set_aggregates(aggregates)
+
+    def _set_aggregates(self, aggregates):
+        """通知已加载的行重绘汇总列"""
+        self.aggregates = aggregates
+        last = len(self.HEADERS) - 1
+        for node in [self._root, *self._nodes.values()]:
+            if node.children:
+                parent = QModelIndex() if node is self._root else self.createIndex(node.row, 0, node)
+                self.dataChanged.emit(self.index(0, AGGREGATE_COLUMN, parent),
+                                      self.index(len(node.children) - 1, last, parent))
+
+    def reload(self):
+        """数据被整体替换（如刷新列表）后重建模型"""
+        self.beginResetModel()
+        self._reset_nodes()
+        self.endResetModel()
+        self.fetchMore(QModelIndex())  # 立即加载第一批顶层节点，便于恢复展开/选中状态
+
+    def set_flat_targets(self, targets: Optional[List[Dict]]):
+        """平铺显示给定的目标列表（不显示子节点）；传None恢复树形显示"""
+        self.flat_targets = targets
+        self.reload()
+
+    def _children(self, target_id: str) -> List[Dict]:
+        """节点的子目标：树形模式来自索引，平铺模式下只有根节点有子节点"""
+        if self.flat_targets is None:
+            return self.index_data.children_of(target_id)
+        return self.flat_targets if target_id == ROOT_ID else []
+
+    def sync_index(self):
+        """数据文件被外部修改导致索引重建时，重建模型"""
+        if get_target_index() is not self.index_data:
+            self.reload()
+
+    # ==================== 基础结构 ====================
+    def _node(self, index: QModelIndex) -> _Node:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def target_of(self, index: QModelIndex) -> Optional[Dict]:
+        if not index.isValid():
+            return None
+        return self.index_data.get(self._node(index).target_id)
+
+    def index(self, row, column, parent=QModelIndex()):
+        parent_node = self._node(parent)
+        if 0 <= row < len(parent_node.children) and 0 <= column < len(self.HEADERS):
+            return self.createIndex(row, column, parent_node.children[row])
+        return QModelIndex()
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        parent_node = index.internalPointer().parent
+        if parent_node is None or parent_node is self._root:
+            return QModelIndex()
+        return self.createIndex(parent_node.row, 0, parent_node)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() and parent.column() != 0:
+            return 0
+        return len(self._node(parent).children)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        # 未加载的子节点也要显示展开箭头
+        if parent.isValid() and parent.column() != 0:
+            return False
+        return bool(self._children(self._node(parent).target_id))
+
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return len(node.children) < len(self._children(node.target_id))
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        children = self._children(node.target_id)
+        start = len(node.children)
+        end = min(start + FETCH_BATCH_SIZE, len(children))
+        if start >= end:
+            return
+        self.beginInsertRows(parent, start, end - 1)
+        for row in range(start, end):
+            child = _Node(children[row]["id"], node, row)
+            node.children.append(child)
+            self._nodes[child.target_id] = child
+        self.endInsertRows()
+
+    # ==================== 数据 ====================
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        target = self.target_of(index)
+        if target is None:
+            return None
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return target["name"]
+            if column == 1:
+                return target["deadline"]
+            if column == STATUS_COLUMN:
+                return target["status"]
+            if column == 3:
+                return str(target["points"])
+            if column >= AGGREGATE_COLUMN:
+                summary = self.aggregate_of(target["id"])
+                if summary is None:
+                    return None
+                if column == AGGREGATE_COLUMN:
+                    return str(summary["points"])
+                if column == AGGREGATE_COLUMN + 1:
+                    return f"{summary['completion']:.0%} ({summary['done']}/{summary['total']})"
+                return str(summary["overdue"])
+        elif role == Qt.ItemDataRole.UserRole:
+            return target["id"]
+        elif role == Qt.ItemDataRole.ForegroundRole:
+            # 已完成任务文字变灰，逾期未完成的截止时间和子树中有逾期任务的逾期数标红
+            if target["status"] == "已完成":
+                return QColor(128, 128, 128)
+            if column == 1 and is_overdue(target, self.today):
+                return OVERDUE_COLOR
+            if column == AGGREGATE_COLUMN + 2:
+                summary = self.aggregate_of(target["id"])
+                if summary is not None and summary["overdue"]:
+                    return OVERDUE_COLOR
+        elif role == Qt.ItemDataRole.BackgroundRole:
+            if target["id"] in self.highlight_ids:
+                return HIGHLIGHT_COLOR
+        return None
+
+    def aggregate_of(self, target_id: str) -> Optional[Dict]:
+        if self.aggregates is None:
+            self.request_aggregates()
+            return None
+        return self.aggregates.get(target_id)
+
+    def flags(self, index):
+        # 树形模式下可以把目标拖到其他目标上（或空白处成为顶层目标）改变父节点；平铺模式下不能拖动
+        tree_mode = self.flat_targets is None
+        if not index.isValid():
+            return Qt.ItemFlag.ItemIsDropEnabled if tree_mode else Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if tree_mode:
+            flags |= Qt.ItemFlag.ItemIsDragEnabled | Qt.ItemFlag.ItemIsDropEnabled
+        return flags
+
+    # ==================== 拖放 ====================
+    def supportedDragActions(self):
+        return Qt.DropAction.MoveAction
+
+    def supportedDropActions(self):
+        return Qt.DropAction.MoveAction
+
+    def mimeTypes(self):
+        return [TARGET_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        target_ids = {self._node(index).target_id for index in indexes if index.isValid()}
+        if len(target_ids) != 1:
+            return None
+        mime = QMimeData()
+        mime.setData(TARGET_MIME_TYPE, target_ids.pop().encode("utf-8"))
+        return mime
+
+    def _drop_move(self, data, parent):
+        """拖放数据 -> (目标id, 新父节点id)；不能移动（如拖到自身或子孙下、父节点未变）时返回None"""
+        if self.flat_targets is not None or not data.hasFormat(TARGET_MIME_TYPE):
+            return None
+        target_id = bytes(data.data(TARGET_MIME_TYPE)).decode("utf-8")
+        target = self.index_data.get(target_id)
+        new_parent_id = self._node(parent).target_id
+        if target is None or new_parent_id == target_id or target_id in self.index_data.ancestors(new_parent_id) \
+                or target.get("parent_id", ROOT_ID) == new_parent_id:
+            return None
+        return target_id, new_parent_id
+
+    def canDropMimeData(self, data, action, row, column, parent):
+        return action == Qt.DropAction.MoveAction and self._drop_move(data, parent) is not None
+
+    def dropMimeData(self, data, action, row, column, parent):
+        move = self._drop_move(data, parent) if action == Qt.DropAction.MoveAction else None
+        if move is None:
+            return False
+        self.move_requested.emit(*move)
+        return True  # 行由页面保存后重建模型时移动（removeRows未实现，视图不会删除源行）
+
+    # ==================== 增量更新 ====================
+    def index_for_id(self, target_id: str, column: int = 0) -> QModelIndex:
+        """返回已加载节点的索引（未加载时返回无效索引）"""
+        node = self._nodes.get(target_id)
+        if node is None:
+            return QModelIndex()
+        return self.createIndex(node.row, column, node)
+
+    def refresh_targets(self, target_ids):
+        """目标字段变化后只通知对应的行重绘"""
+        for target_id in target_ids:
+            first = self.index_for_id(target_id)
+            if first.isValid():
+                self.dataChanged.emit(first, self.index_for_id(target_id, len(self.HEADERS) - 1))
+
+    def refresh_with_ancestors(self, target_ids):
+        """目标变化会影响所有祖先的子树汇总：重绘这些目标和它们的祖先"""
+        ids = set(target_ids)
+        for target_id in list(ids):
+            ids.update(self.index_data.ancestors(target_id))
+        self.refresh_targets(ids)
+
+    def insert_target(self, target: Dict) -> QModelIndex:
+        """目标已加入索引后调用：父节点已加载完的子列表末尾追加一行；否则留给懒加载"""
+        if self.flat_targets is not None:
+            return QModelIndex()  # 平铺模式下由页面重新查询
+        parent_id = target["parent_id"]
+        if parent_id == ROOT_ID:
+            parent_node, parent_index = self._root, QModelIndex()
+        else:
+            parent_node = self._nodes.get(parent_id)
+            if parent_node is None:
+                return QModelIndex()
+            parent_index = self.index_for_id(parent_id)
+        siblings = self._children(parent_id)
+        if len(parent_node.children) == len(siblings) - 1:
+            row = len(parent_node.children)
+            self.beginInsertRows(parent_index, row, row)
+            node = _Node(target["id"], parent_node, row)
+            parent_node.children.append(node)
+            self._nodes[target["id"]] = node
+            self.endInsertRows()
+        elif not parent_node.children:
+            # 子节点尚未加载（如原来是叶子节点）：加载第一批，让视图出现展开箭头
+            self.fetchMore(parent_index)
+        return self.index_for_id(target["id"])
+
+    def remove_target(self, target_id: str, removed_ids: List[str]):
+        """目标子树已从索引删除后调用：移除对应行并清理节点映射"""
+        node = self._nodes.get(target_id)
+        if node is not None:
+            parent_node = node.parent
+            parent_index = QModelIndex() if parent_node is self._root else self.index_for_id(parent_node.target_id)
+            row = node.row
+            self.beginRemoveRows(parent_index, row, row)
+            del parent_node.children[row]
+            for sibling in parent_node.children[row:]:
+                sibling.row -= 1
+            self.endRemoveRows()
+        for removed_id in removed_ids:
+            self._nodes.pop(removed_id, None)
+
+    def load_path(self, target_id: str) -> QModelIndex:
+        """从根节点逐层加载到目标所在的节点（定位未展开的搜索结果），返回其索引"""
+        parent = QModelIndex()
+        path = [target_id] if self.flat_targets is not None else \
+            list(reversed(self.index_data.ancestors(target_id))) + [target_id]
+        for node_id in path:
+            while node_id not in self._nodes and self.canFetchMore(parent):
+                self.fetchMore(parent)
+            parent = self.index_for_id(node_id)
+            if not parent.isValid():
+                return QModelIndex()
+        return parent
+
+    def set_highlight(self, target_ids):
+        """设置搜索命中的目标，只重绘高亮状态变化的行"""
+        target_ids = set(target_ids)
+        changed = self.highlight_ids ^ target_ids
+        self.highlight_ids = target_ids
+        self.refresh_targets(changed)
+
+    def expanded_ids(self, view) -> List[str]:
+        """收集视图中已展开节点的id（按加载顺序，父节点在前）"""
+        return [tid for tid in self._nodes if view.isExpanded(self.index_for_id(tid))]
+
+
+class StatusButtonDelegate(QStyledItemDelegate):
+    """在"完成状态"列直接绘制"完成/已完成"按钮并处理点击，不为每一行创建QPushButton"""
+    status_clicked = pyqtSignal(str)  # 目标id
+
+    BUTTON_WIDTH = 76
+    BUTTON_MARGIN = 3
+
+    # (背景色, 文字色, 边框色, 悬停背景色)，与原按钮样式表一致
+    DONE_STYLE = ("#f0f0f0", "#666", "#ccc", "#f0f0f0")
+    TODO_STYLE = ("#e6f7ff", "#1890ff", "#91d5ff", "#bae7ff")
+
+    def _button_rect(self, option) -> QRect:
+        cell = option.rect
+        width = min(self.BUTTON_WIDTH, cell.width() - 2 * self.BUTTON_MARGIN)
+        height = cell.height() - 2 * self.BUTTON_MARGIN
+        return QRect(cell.x() + (cell.width() - width) // 2, cell.y() + self.BUTTON_MARGIN, width, height)
+
+    def paint(self, painter, option, index):
+        # 先绘制选中/悬停背景，再在上面画按钮
+        self.initStyleOption(option, index)
+        option.text = ""
+        option.widget.style().drawControl(QStyle.ControlElement.CE_ItemViewItem, option, painter, option.widget)
+
+        done = index.data(Qt.ItemDataRole.DisplayRole) == "已完成"
+        background, text_color, border, hover = self.DONE_STYLE if done else self.TODO_STYLE
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            background = hover
+
+        rect = self._button_rect(option)
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setPen(QPen(QColor(border)))
+        painter.setBrush(QColor(background))
+        painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 3, 3)
+        painter.setPen(QColor(text_color))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "已完成" if done else "完成")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            if self._button_rect(option).contains(event.position().toPoint()):
+                target_id = index.data(Qt.ItemDataRole.UserRole)
+                if target_id:
+                    self.status_clicked.emit(target_id)
+                return True
+        return super().editorEvent(event, model, option, index)
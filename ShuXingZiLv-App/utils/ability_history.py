@@ -0,0 +1,271 @@
+import json
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+# ==================== 文件格式 ====================
+# 头部：魔数、版本号、保留字段
+HEADER = struct.Struct("<4sII")
+MAGIC = b"SFAH"
+VERSION = 1
+# 每条记录：时间戳(秒)、能力项序号（对应names文件中的能力项id）、能力值
+RECORD_DTYPE = np.dtype([("time", "<i8"), ("ability", "<u4"), ("value", "<f4")])
+
+# ==================== 降采样方式 ====================
+DOWNSAMPLE_LTTB = "lttb"  # 最大三角形三桶算法：每像素一个点，保留折线的形状
+DOWNSAMPLE_MINMAX = "minmax"  # 每像素保留最小值和最大值：不漏掉任何尖峰
+
+Series = Tuple[np.ndarray, np.ndarray]  # (时间戳int64数组, 能力值float32数组)
+
+
+def _empty_series() -> Series:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+
+def _bucket_edges(n: int, buckets: int) -> np.ndarray:
+    return np.linspace(0, n, buckets + 1).astype(np.intp)
+
+
+def minmax_downsample(times: np.ndarray, values: np.ndarray, buckets: int) -> Series:
+    """
+    按点数均分为buckets个桶，每个桶保留最小值和最大值两个点（按时间先后），
+    首尾两点始终保留；结果最多2*buckets+2个点
+    """
+    n = len(times)
+    if buckets <= 0 or n <= 2 * buckets:
+        return times, values
+    edges = _bucket_edges(n, buckets)
+    sizes = np.diff(edges)
+    starts = edges[:-1]
+    # 每个桶的最小/最大值，再找出桶内第一个等于最小值、最后一个等于最大值的位置（全部是O(n)的向量运算）
+    low = np.flatnonzero(values == np.repeat(np.minimum.reduceat(values, starts), sizes))
+    high = np.flatnonzero(values == np.repeat(np.maximum.reduceat(values, starts), sizes))
+    picks = np.concatenate(([0], low[np.searchsorted(low, starts)],
+                            high[np.searchsorted(high, edges[1:]) - 1], [n - 1]))
+    picks = np.unique(picks)  # 排序（按时间先后）并去掉最小值、最大值为同一点的重复
+    return times[picks], values[picks]
+
+
+def lttb_downsample(times: np.ndarray, values: np.ndarray, threshold: int) -> Series:
+    """
+    最大三角形三桶（Largest-Triangle-Three-Buckets）降采样到threshold个点：
+    首尾两点保留，中间每个桶选出与"上一个选中点"和"下一个桶平均点"组成的三角形面积最大的点
+    每个桶依赖上一个桶选中的点，只能按桶顺序循环（threshold次），桶内的面积计算是向量化的
+    """
+    n = len(times)
+    if threshold >= n or threshold < 3:
+        return times, values
+    x = (times - times[0]).astype(np.float64)  # 以首个时间为原点，避免大时间戳相乘损失精度
+    y = values.astype(np.float64)
+    edges = _bucket_edges(n - 2, threshold - 2) + 1  # 中间n-2个点分成threshold-2个桶
+    picks = np.empty(threshold, dtype=np.intp)
+    picks[0], picks[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # 三角形面积的2倍（省略常数因子不影响比较）
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        picks[i + 1] = a
+    return times[picks], values[picks]
+
+
+def to_timestamp(value: Union[str, datetime, int, float, None]) -> int:
+    """时间 -> 时间戳（秒）；None表示当前时间"""
+    if value is None:
+        return int(time.time())
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, str):
+        return int(datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp())
+    return int(value)
+
+
+class _SeriesBuffer:
+    """单个能力项的时间序列（按容量倍增的列式数组，追加均摊O(1)）"""
+
+    def __init__(self, times: np.ndarray = None, values: np.ndarray = None):
+        if times is None:
+            times, values = _empty_series()
+        self.size = len(times)
+        capacity = max(16, self.size)
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.values = np.empty(capacity, dtype=np.float32)
+        self.times[:self.size] = times
+        self.values[:self.size] = values
+
+    def append(self, timestamp: int, value: float):
+        if self.size == len(self.times):
+            self.times = np.resize(self.times, self.size * 2)
+            self.values = np.resize(self.values, self.size * 2)
+        self.times[self.size] = timestamp
+        self.values[self.size] = value
+        self.size += 1
+
+    @property
+    def last_time(self) -> int:
+        return int(self.times[self.size - 1]) if self.size else 0
+
+    def view(self) -> Series:
+        return self.times[:self.size], self.values[:self.size]
+
+
+class AbilityHistory:
+    """
+    能力值历史：每次修改能力值追加一条定长记录到二进制文件（不进主数据文件），
+    加载时按能力项分组为列式数组（int64时间戳 + float32能力值），按像素宽度返回降采样后的序列
+    同一能力项的记录时间早于上一条时（如系统时间被调整）按上一条的时间记录，保证序列有序、可二分
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.names_path = os.path.splitext(path)[0] + ".names.jsonl"  # 能力项id字符串表（追加式）
+        self.fsync = False
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        self._series: Dict[str, _SeriesBuffer] = {}
+
+    # ==================== 加载 ====================
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            records = self._read_records()
+            self._load_names()
+        except (OSError, ValueError, struct.error) as e:
+            print(f"⚠️  能力值历史文件损坏，已另存为备份并重新开始记录：{str(e)}")
+            self._backup_corrupt()
+            return
+        if not len(records):
+            return
+        if int(records["ability"].max()) >= len(self._names):
+            # 字符串表比记录少（写入中途崩溃）：丢弃引用不到能力项的记录
+            records = records[records["ability"] < len(self._names)]
+        order = np.lexsort((records["time"], records["ability"]))
+        records = records[order]
+        abilities = records["ability"]
+        starts = np.flatnonzero(np.diff(abilities, prepend=-1))
+        ends = np.append(starts[1:], len(records))
+        for start, end in zip(starts, ends):
+            name = self._names[int(abilities[start])]
+            self._series[name] = _SeriesBuffer(records["time"][start:end], records["value"][start:end])
+
+    def _read_records(self) -> np.ndarray:
+        if not os.path.exists(self.path):
+            return np.empty(0, dtype=RECORD_DTYPE)
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            magic, version, _ = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("文件头不匹配")
+            count = (size - HEADER.size) // RECORD_DTYPE.itemsize
+            records = np.fromfile(f, dtype=RECORD_DTYPE, count=count)
+        if HEADER.size + count * RECORD_DTYPE.itemsize != size:
+            os.truncate(self.path, HEADER.size + count * RECORD_DTYPE.itemsize)  # 截掉末尾崩溃留下的半条记录
+        return records
+
+    def _load_names(self):
+        if not os.path.exists(self.names_path):
+            return
+        with open(self.names_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # 末尾不完整的一行（写入中途崩溃），对应的记录加载时丢弃
+                name = json.loads(line)
+                self._name_ids[name] = len(self._names)
+                self._names.append(name)
+
+    def _backup_corrupt(self):
+        suffix = datetime.now().strftime("%Y%m%d%H%M%S")
+        for path in (self.path, self.names_path):
+            if os.path.exists(path):
+                os.replace(path, f"{path}.corrupt-{suffix}")
+        self._names, self._name_ids, self._series = [], {}, {}
+
+    # ==================== 写入 ====================
+    def append(self, ability_id: str, value: float, when=None):
+        """记录一次能力值修改（when默认当前时间）"""
+        self.append_many([(ability_id, value)], when)
+
+    def append_many(self, changes: Iterable[Tuple[str, float]], when=None):
+        """批量记录能力值修改（同一时刻，一次写入）"""
+        timestamp = to_timestamp(when)
+        with self._lock:
+            self._ensure_loaded()
+            new_names = []
+            records = []
+            for ability_id, value in changes:
+                if ability_id not in self._name_ids:
+                    self._name_ids[ability_id] = len(self._names)
+                    self._names.append(ability_id)
+                    new_names.append(ability_id)
+                series = self._series.get(ability_id)
+                if series is None:
+                    series = self._series[ability_id] = _SeriesBuffer()
+                record_time = max(timestamp, series.last_time)
+                series.append(record_time, value)
+                records.append((record_time, self._name_ids[ability_id], value))
+            if records:
+                self._write(new_names, np.array(records, dtype=RECORD_DTYPE))
+
+    def _write(self, new_names: List[str], records: np.ndarray):
+        # 先写字符串表，再写记录：崩溃时最多多出没有被引用的能力项id
+        if new_names:
+            with open(self.names_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(name, ensure_ascii=False) + "\n" for name in new_names))
+                self._flush(f)
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size
+        with open(self.path, "wb" if new_file else "ab") as f:
+            if new_file:
+                f.write(HEADER.pack(MAGIC, VERSION, 0))
+            f.write(records.tobytes())
+            self._flush(f)
+
+    def _flush(self, f):
+        if self.fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ==================== 查询 ====================
+    def count(self, ability_id: str) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            series = self._series.get(ability_id)
+            return series.size if series is not None else 0
+
+    def series(self, ability_id: str, start=None, end=None) -> Series:
+        """能力项在[start, end]之间的完整历史（时间戳数组, 能力值数组），返回副本"""
+        with self._lock:
+            self._ensure_loaded()
+            series = self._series.get(ability_id)
+            if series is None:
+                return _empty_series()
+            times, values = series.view()
+            lo = 0 if start is None else int(np.searchsorted(times, to_timestamp(start), side="left"))
+            hi = len(times) if end is None else int(np.searchsorted(times, to_timestamp(end), side="right"))
+            return times[lo:hi].copy(), values[lo:hi].copy()
+
+    def downsampled(self, ability_id: str, width: int, method: str = DOWNSAMPLE_LTTB,
+                    start=None, end=None) -> Series:
+        """
+        按图表的像素宽度返回降采样后的序列：点数不超过宽度时原样返回，
+        LTTB每像素一个点，minmax每像素最多两个点（最小值和最大值）
+        """
+        times, values = self.series(ability_id, start, end)
+        width = max(int(width), 3)
+        if method == DOWNSAMPLE_MINMAX:
+            return minmax_downsample(times, values, width)
+        if method == DOWNSAMPLE_LTTB:
+            return lttb_downsample(times, values, width)
+        raise ValueError(f"未知的降采样方式：{method}")
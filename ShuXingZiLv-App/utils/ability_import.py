@@ -0,0 +1,64 @@
+import csv
+import json
+import math
+import os
+from typing import Dict, List
+
+# ==================== 导入格式 ====================
+# CSV表头/JSON字段的可选写法（不区分大小写）
+ID_FIELDS = ("id", "能力项id")
+NAME_FIELDS = ("name", "名称", "能力项", "能力项名称")
+VALUE_FIELDS = ("value", "数值", "能力值")
+IMPORT_FILE_FILTER = "能力值文件 (*.csv *.json);;CSV 文件 (*.csv);;JSON 文件 (*.json)"
+
+
+def _pick(row: Dict, fields) -> str:
+    for key, value in row.items():
+        if key is not None and key.strip().lower() in fields:
+            return value
+    return None
+
+
+def _entry(row: Dict, line: int) -> Dict:
+    """一行/一项 -> {"id", "name", "value"}，缺少数值或名称时抛出ValueError"""
+    ability_id = _pick(row, ID_FIELDS)
+    name = _pick(row, NAME_FIELDS)
+    value = _pick(row, VALUE_FIELDS)
+    if (ability_id in (None, "") and name in (None, "")) or value in (None, ""):
+        raise ValueError(f"第{line}项缺少能力项名称或数值")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if not math.isfinite(number):  # float()也接受"nan""inf"，不能当作数值导入
+        raise ValueError(f"第{line}项的数值「{value}」不是数字")
+    value = number
+    return {"id": str(ability_id).strip() if ability_id not in (None, "") else None,
+            "name": str(name).strip() if name not in (None, "") else None,
+            "value": value}
+
+
+def parse_ability_file(path: str) -> List[Dict]:
+    """
+    读取批量导入文件，返回[{"id", "name", "value"}]（id/name至少有一个）
+    - CSV：第一行为表头，包含名称（或id）列和数值列
+    - JSON：[{"name": ..., "value": ...}, ...] 或 {"能力项名称": 数值, ...}
+    格式不对时抛出ValueError（消息可直接展示给用户）
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            return [_entry(row, i) for i, row in enumerate(csv.DictReader(f), start=2)
+                    if any((v or "").strip() for v in row.values() if isinstance(v, str))]
+    if ext == ".json":
+        with open(path, "r", encoding="utf-8-sig") as f:
+            try:
+                content = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON格式错误：{str(e)}")
+        if isinstance(content, dict):
+            content = [{"name": name, "value": value} for name, value in content.items()]
+        if not isinstance(content, list) or not all(isinstance(item, dict) for item in content):
+            raise ValueError("JSON内容应为能力项列表或「名称: 数值」对象")
+        return [_entry(item, i) for i, item in enumerate(content, start=1)]
+    raise ValueError("只支持CSV或JSON文件")
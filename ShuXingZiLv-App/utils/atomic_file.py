@@ -0,0 +1,65 @@
+import json
+import os
+import stat
+import tempfile
+from typing import Any
+
+# ==================== fsync策略 ====================
+FSYNC_ALWAYS = "always"  # 每次写入都fsync文件和目录（最安全）
+FSYNC_NEVER = "never"  # 交给操作系统回写（最快，断电可能丢最近的修改，但不会写坏文件）
+DEFAULT_FILE_MODE = 0o644  # 新建文件的权限
+
+
+def fsync_dir(dir_path: str):
+    """fsync目录，确保rename本身落盘（Windows不支持打开目录，直接跳过）"""
+    if os.name == "nt":
+        return
+    fd = os.open(dir_path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _atomic_write(path: str, content, mode: str, fsync: bool):
+    """
+    先写同目录下的临时文件，再rename覆盖目标文件；任意时刻崩溃，目标文件要么是旧内容，要么是完整的新内容
+    临时文件名每次唯一（mkstemp），并发写同一个文件时不会互相覆盖对方写了一半的临时文件
+    """
+    dir_path = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        # mkstemp创建的文件权限是0600，沿用原文件的权限
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except OSError:
+            os.chmod(tmp_path, DEFAULT_FILE_MODE)
+        with open(fd, mode, **({"encoding": "utf-8"} if "b" not in mode else {})) as f:
+            f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        fsync_dir(dir_path)
+
+
+def atomic_write_text(path: str, text: str, fsync: bool = True):
+    """原子写文本文件（UTF-8）"""
+    _atomic_write(path, text, "w", fsync)
+
+
+def atomic_write_bytes(path: str, content: bytes, fsync: bool = True):
+    """原子写二进制文件（与atomic_write_text相同的临时文件+rename流程）"""
+    _atomic_write(path, content, "wb", fsync)
+
+
+def atomic_write_json(path: str, obj: Any, fsync: bool = True, indent: int = 2):
+    """原子写JSON（格式与原write_data一致：ensure_ascii=False, indent=2）"""
+    atomic_write_text(path, json.dumps(obj, ensure_ascii=False, indent=indent), fsync=fsync)
@@ -1,31 +1,73 @@
 import json
 import os
+import sqlite3
 import uuid
-import random
+import threading
+import atexit
+import copy
 from datetime import datetime
-from typing import Dict, List, Optional, Union
-from PIL import Image
+from typing import Dict, List, Optional, Set, Tuple, Union
 import io
+from concurrent.futures import Future
+from utils.history_journal import get_history_list, set_history_list
+from utils.atomic_file import FSYNC_ALWAYS, FSYNC_NEVER
+from utils.storage_backend import StorageBackend, JsonBackend
+from utils.points_ledger import PointsLedger
+from utils.image_pipeline import ImagePipeline
+from utils.image_store import ImageStore, GC_BUCKETS_PER_RUN
+from utils.target_index import TargetIndex
+from utils.rating_index import RatingSystemIndex
+from utils.search_index import SearchIndex
+from utils.deadline_index import DeadlineIndex
 
 # ==================== 路径配置（固定，后续无需修改）====================
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # 项目根目录
-DATA_DIR = os.path.join(BASE_DIR, "data")  # 数据根目录
+# 数据根目录（可用环境变量SHUXING_DATA_DIR指定其他目录，如基准测试使用临时目录，不碰真实数据）
+DATA_DIR = os.environ.get("SHUXING_DATA_DIR") or os.path.join(BASE_DIR, "data")
 USER_DATA_PATH = os.path.join(DATA_DIR, "user_data.json")  # JSON数据文件路径
+HISTORY_JOURNAL_PATH = os.path.join(DATA_DIR, "user_data.history.jsonl")  # 积分流水/成长记录追加日志
+SQLITE_DATA_PATH = os.path.join(DATA_DIR, "user_data.db")  # SQLite数据文件路径
+POINTS_LEDGER_PATH = os.path.join(DATA_DIR, "points_ledger.bin")  # 二进制积分账本（由积分流水派生）
 RECORD_IMAGE_DIR = os.path.join(DATA_DIR, "records")  # 成长记录图片目录
+ABILITY_HISTORY_PATH = os.path.join(DATA_DIR, "ability_history.bin")  # 能力值历史（时间序列，不进主数据文件）
+
+# ==================== 存储后端配置 ====================
+STORAGE_BACKEND = "json"  # "json"（user_data.json + history journal）/ "sqlite"（首次使用时自动从JSON迁移）
+
+# ==================== 搜索配置 ====================
+SEARCH_TARGETS = "targets"  # 目标名称
+SEARCH_GROWTH = "growth"  # 成长记录内容
+SEARCH_FIELDS = {SEARCH_TARGETS: "name", SEARCH_GROWTH: "content"}  # 各索引建索引的字段
+DEADLINE_INDEX = "deadlines"  # 截止时间索引
+AGGREGATE_INDEX = "aggregates"  # 目标子树汇总（积分合计、完成率、逾期数）
+# 派生索引 -> 文档中的源列表
+INDEX_SOURCES = {SEARCH_TARGETS: "targets", SEARCH_GROWTH: "growth_records", DEADLINE_INDEX: "targets",
+                 AGGREGATE_INDEX: "targets"}
+TARGET_INDEXES = (SEARCH_TARGETS, DEADLINE_INDEX, AGGREGATE_INDEX)  # 随目标增/改/删同步的派生索引
+
+# ==================== 写入配置 ====================
+WRITE_FSYNC_POLICY = FSYNC_ALWAYS  # fsync策略：FSYNC_ALWAYS（每次落盘）/ FSYNC_NEVER（交给系统回写）
+WRITE_COALESCE_WINDOW = 0.0  # 合并写入窗口（秒）：>0时窗口内的多次写入合并为一次落盘，0表示立即写入
 
 
 # ==================== 初始化配置（首次运行自动创建目录和默认数据）====================
 def init_data_env():
-    """初始化数据环境：创建目录 + 生成默认JSON数据（优化日志输出）"""
+    """初始化数据环境：创建目录（默认数据由存储后端在首次加载时生成）"""
     # 创建data目录和records子目录（exist_ok=True 已处理重复创建）
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(RECORD_IMAGE_DIR, exist_ok=True)
 
-    # 只在文件不存在时打印日志
-    if not os.path.exists(USER_DATA_PATH):
-        default_data = generate_default_data()
-        write_data(default_data)
-        print(f"✅ 初始化数据成功：创建 {USER_DATA_PATH}")
+
+def create_storage_backend(kind: str = None) -> StorageBackend:
+    """按配置创建存储后端"""
+    kind = kind or STORAGE_BACKEND
+    if kind == "sqlite":
+        from utils.sqlite_backend import SqliteBackend
+        return SqliteBackend(SQLITE_DATA_PATH, USER_DATA_PATH, HISTORY_JOURNAL_PATH,
+                             generate_default_data, migrate_data)
+    if kind != "json":
+        print(f"⚠️  未知的存储后端「{kind}」，使用JSON")
+    return JsonBackend(USER_DATA_PATH, HISTORY_JOURNAL_PATH, generate_default_data, migrate_data)
 
 
 def generate_default_data() -> Dict:
@@ -50,6 +92,7 @@ def generate_default_data() -> Dict:
     ]
 
     return {
+        "schema_version": CURRENT_SCHEMA_VERSION,
         "targets": [
             # 默认示例目标（新增parent_id="root"，支持多级任务树）
             {
@@ -57,7 +100,7 @@ def generate_default_data() -> Dict:
                 "name": "完成Python基础学习",
                 "deadline": "2025-12-31",
                 "status": "未开始",
-                "reward_points": 50,
+                "points": 50,
                 "parent_id": "root"  # 根节点标识
             }
         ],
@@ -77,21 +120,337 @@ def generate_default_data() -> Dict:
     }
 
 
+def snapshot_data(data: Dict) -> Dict:
+    """
+    复制文档供后台线程写盘：目标只复制一层（字段都是标量），
+    成长记录和积分流水条目写入后不再修改，只复制列表本身，比deepcopy整个文档快得多
+    """
+    snapshot = {}
+    for key, value in data.items():
+        if key == "targets":
+            snapshot[key] = [dict(t) for t in value]
+        elif key == "growth_records":
+            snapshot[key] = list(value)
+        elif key == "points_account" and isinstance(value, dict):
+            snapshot[key] = {k: (list(v) if k == "records" else copy.deepcopy(v)) for k, v in value.items()}
+        else:
+            snapshot[key] = copy.deepcopy(value)
+    return snapshot
+
+
+# ==================== 进程内数据仓库（只解析一次JSON）====================
+class DataStore:
+    """
+    进程级数据仓库：首次访问时从存储后端加载，之后直接返回内存中的文档。
+    只有当存储被外部修改、且内存中没有未保存修改时才会重新加载。
+    磁盘格式由存储后端决定（见STORAGE_BACKEND）。
+    """
+
+    def __init__(self, backend: StorageBackend = None):
+        self._backend = backend  # 未指定时首次使用才按配置创建
+        self._data: Optional[Dict] = None  # 内存中的文档（调用方拿到的是同一个对象）
+        self._disk_stat = None  # 最近一次读/写时文件的(mtime_ns, size)
+        self._dirty = False  # 内存文档是否有尚未写盘的修改
+        self._generation = 0  # 每次修改递增，用于判断落盘的快照是否已是最新
+        self._persisted_generation = 0  # 已落盘的最新修改代数
+        self._rewrites: Dict[str, List[int]] = {}  # 已有条目被修改/删除的历史列表 -> 尚未落盘的标记代数
+        self._lock = threading.RLock()  # 保护内存状态（持有时间很短）
+        self._write_lock = threading.Lock()  # 串行化磁盘写入（加锁顺序：先_write_lock再_lock）
+        self.fsync_policy = WRITE_FSYNC_POLICY
+        self.coalesce_window = WRITE_COALESCE_WINDOW
+        self._flush_timer: Optional[threading.Timer] = None  # 合并写入模式下等待中的落盘任务
+        self._target_index: Optional[TargetIndex] = None  # 目标索引（随文档加载构建）
+        self._rating_index: Optional[RatingSystemIndex] = None  # 评分系统索引（随文档加载构建）
+        self._derived_indexes: Dict[str, object] = {}  # 搜索/截止时间索引（首次查询时构建）
+        self._ledger = PointsLedger(POINTS_LEDGER_PATH)  # 积分账本（随每次落盘追加）
+        self._ledger_opened = False
+
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            self._backend = create_storage_backend()
+        return self._backend
+
+    def _current_stat(self):
+        return self.backend.stat()
+
+    def _load(self) -> Dict:
+        """从存储后端读取文档（只在首次访问或被外部修改时调用）"""
+        init_data_env()
+        self._data = self.backend.load()
+        self._disk_stat = self._current_stat()
+        self._dirty = False
+        self._rewrites.clear()
+        if self.backend.needs_write_back:
+            # 旧版本数据升级后写回一次（之后的读取不再需要迁移）；调用方可能持有_lock，
+            # 按加锁顺序不能在这里取_write_lock，交给落盘任务经write_snapshot写入
+            self.mark_dirty()
+            self._schedule_flush()
+        return self._data
+
+    def get(self) -> Dict:
+        """返回内存中的文档，必要时（首次/外部修改）从磁盘加载"""
+        with self._lock:
+            if self._data is None:
+                return self._load()
+            if not self._dirty and self._current_stat() != self._disk_stat:
+                return self._load()
+            return self._data
+
+    def target_index(self) -> TargetIndex:
+        """返回当前文档的目标索引；文档重新加载或targets被整体替换时重建"""
+        with self._lock:
+            targets = self.get()["targets"]
+            index = self._target_index
+            if index is None or index.targets is not targets or len(index) != len(targets):
+                self._target_index = TargetIndex(targets)
+            return self._target_index
+
+    def rating_index(self) -> RatingSystemIndex:
+        """返回当前文档的评分系统索引；文档重新加载或rating_systems被整体替换时重建"""
+        with self._lock:
+            rating_systems = self.get().setdefault("rating_systems", [])
+            index = self._rating_index
+            if index is None or index.rating_systems is not rating_systems or len(index) != len(rating_systems):
+                self._rating_index = RatingSystemIndex(rating_systems)
+            return self._rating_index
+
+    def _derived_index(self, name: str, build: bool = True):
+        """
+        按需构建的派生索引（见INDEX_SOURCES）；文档重新加载或源列表被外部整体修改时重建
+        build=False时只返回已构建且对应当前文档的索引，否则返回None（增量更新不必为此构建索引）
+        """
+        with self._lock:
+            index = self._derived_indexes.get(name)
+            if not build:
+                if index is None or self._data is None:
+                    return None
+                return index if index.source is self._data.get(INDEX_SOURCES[name]) else None
+            items = self.get().setdefault(INDEX_SOURCES[name], [])
+            if index is None or index.source is not items or index.source_size != len(items):
+                if name == DEADLINE_INDEX:
+                    index = DeadlineIndex(items)
+                elif name == AGGREGATE_INDEX:
+                    from utils.target_aggregates import TargetAggregates  # 用到时才导入NumPy，不拖慢启动
+                    index = TargetAggregates(items)
+                else:
+                    index = SearchIndex(items, field=SEARCH_FIELDS[name])
+                index.source = items
+                self._derived_indexes[name] = index
+            return index
+
+    def search_index(self, kind: str) -> SearchIndex:
+        """目标名称（SEARCH_TARGETS）/成长记录内容（SEARCH_GROWTH）的搜索索引"""
+        return self._derived_index(kind)
+
+    def deadline_index(self) -> DeadlineIndex:
+        return self._derived_index(DEADLINE_INDEX)
+
+    def target_aggregates(self, build: bool = True) -> Optional["TargetAggregates"]:
+        """子树汇总；build=False时只返回已构建的（没有时返回None）"""
+        with self._lock:
+            aggregates = self._derived_index(AGGREGATE_INDEX, build=build)
+            if aggregates is not None:
+                aggregates.refresh_today()
+            return aggregates
+
+    def build_target_aggregates(self) -> Optional["TargetAggregates"]:
+        """
+        在后台线程构建子树汇总（构建期间不持有锁，GUI线程照常读写）；
+        构建期间文档有修改时（增量更新不会作用到尚未登记的汇总上）丢弃结果返回None，由调用方重试
+        """
+        with self._lock:
+            aggregates = self.target_aggregates(build=False)
+            if aggregates is not None:
+                return aggregates
+            targets = self.get().setdefault(INDEX_SOURCES[AGGREGATE_INDEX], [])
+            generation = self._generation
+        from utils.target_aggregates import TargetAggregates
+        aggregates = TargetAggregates(targets)
+        with self._lock:
+            if (self._generation != generation or self._data is None
+                    or self._data.get(INDEX_SOURCES[AGGREGATE_INDEX]) is not targets
+                    or aggregates.source_size != len(targets)):
+                return None
+            installed = self.target_aggregates(build=False)  # 构建期间GUI线程可能已同步构建过
+            if installed is not None:
+                return installed
+            aggregates.source = targets
+            self._derived_indexes[AGGREGATE_INDEX] = aggregates
+            return aggregates
+
+    def cached_index(self, name: str):
+        return self._derived_index(name, build=False)
+
+    def mark_dirty(self):
+        """调用方直接修改了内存文档但暂未保存时调用，避免被磁盘内容覆盖"""
+        with self._lock:
+            self._dirty = True
+            self._generation += 1
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def save(self, data: Dict) -> bool:
+        """写入文档；传入的新文档会替换内存中的文档（合并写入模式下延迟到窗口结束再落盘）"""
+        with self._lock:
+            self._data = data
+            self.mark_dirty()
+            if self.coalesce_window > 0:
+                self._schedule_flush()
+                return True
+        return self.flush()
+
+    def _schedule_flush(self):
+        """合并写入：窗口内只挂一个落盘任务，之后的写入直接并入"""
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.coalesce_window, self._on_flush_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _on_flush_timer(self):
+        with self._lock:
+            self._flush_timer = None
+            if self._data is None or not self._dirty:
+                return
+            generation, snapshot = self._generation, snapshot_data(self._data)
+        try:
+            self.write_snapshot(generation, snapshot)
+        except Exception as e:
+            print(f"❌ 写入数据失败：{str(e)}")
+
+    def flush(self) -> bool:
+        """在当前线程把内存文档写盘（无修改时直接返回）"""
+        with self._write_lock, self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._data is None or not self._dirty:
+                return True
+            return self._write(self._data, self._generation)
+
+    def snapshot(self) -> Tuple[int, Dict]:
+        """返回(修改代数, 文档快照)，快照可交给后台线程写盘，之后对内存文档的修改不影响它"""
+        with self._lock:
+            return self._generation, snapshot_data(self.get())
+
+    def write_snapshot(self, generation: int, snapshot: Dict) -> bool:
+        """写入snapshot()得到的快照（可在后台线程调用）；已有更新的快照落盘时直接跳过"""
+        with self._write_lock:
+            if generation <= self._persisted_generation:
+                return True
+            return self._write(snapshot, generation)
+
+    def _rewrite_keys(self, generation: int) -> Set[str]:
+        """修改代数为generation的文档中，有已有条目被修改/删除的历史列表（调用方需持有_lock）"""
+        return {key for key, marks in self._rewrites.items() if marks[0] <= generation}
+
+    def _write(self, data: Dict, generation: int) -> bool:
+        """落盘（调用方需持有_write_lock）"""
+        # 重写标记属于包含该修改的快照：更早的快照不消耗标记，写入失败时标记保留
+        with self._lock:
+            rewrite = self._rewrite_keys(generation)
+        self.backend.write(data, fsync=self.fsync_policy != FSYNC_NEVER, rewrite=rewrite)
+        self._sync_ledger(data, generation, "points" in rewrite)
+        self._sync_image_refs(data, generation, "growth" in rewrite)
+        with self._lock:
+            for key in rewrite:
+                marks = [g for g in self._rewrites[key] if g > generation]
+                if marks:
+                    self._rewrites[key] = marks
+                else:
+                    del self._rewrites[key]
+            self._disk_stat = self._current_stat()
+            self._persisted_generation = max(self._persisted_generation, generation)
+            # 写盘期间如果又有新修改，保持dirty，等待下一次保存
+            if self._generation == generation:
+                self._dirty = False
+        return True
+
+    def mark_history_rewrite(self, key: str):
+        """历史列表中已有条目被修改或删除时调用（key见HISTORY_LISTS）"""
+        with self._lock:
+            self.mark_dirty()
+            self._rewrites.setdefault(key, []).append(self._generation)
+
+    def _sync_ledger(self, data: Dict, generation: int, rewrite: bool):
+        """把积分流水同步到二进制账本（调用方需持有_write_lock）；账本只是派生数据，失败不影响保存"""
+        entries = get_history_list(data, "points")
+        try:
+            self._ledger.fsync = self.fsync_policy != FSYNC_NEVER
+            if rewrite:
+                self._ledger.mark_rewrite()
+            if not self._ledger_opened:
+                if not self._ledger.open() or not self._ledger.matches(entries):
+                    self._ledger.mark_rewrite()
+                self._ledger_opened = True
+            self._ledger.sync(entries, generation)
+        except Exception as e:
+            print(f"⚠️  积分账本同步失败，下次保存时重建：{str(e)}")
+            self._ledger.mark_rewrite()
+
+    def _sync_image_refs(self, data: Dict, generation: int, rewrite: bool):
+        """按成长记录更新图片引用计数（调用方需持有_write_lock），失败不影响保存"""
+        try:
+            if rewrite:
+                get_image_store().mark_rewrite()
+            get_image_store().sync_refs(get_history_list(data, "growth"), generation)
+        except Exception as e:
+            print(f"⚠️  图片引用计数更新失败：{str(e)}")
+
+    def collect_image_garbage(self, max_buckets: int) -> Dict:
+        """按内存文档中的成长记录回收无引用的图片"""
+        with self._write_lock, self._lock:
+            store = get_image_store()
+            if "growth" in self._rewrite_keys(self._generation):
+                store.mark_rewrite()
+            store.sync_refs(get_history_list(self.get(), "growth"), self._generation)
+            return store.collect_garbage(max_buckets)
+
+    def points_ledger(self) -> PointsLedger:
+        """返回与内存文档同步的积分账本"""
+        with self._write_lock, self._lock:
+            data = self.get()
+            self._sync_ledger(data, self._generation, "points" in self._rewrite_keys(self._generation))
+            return self._ledger
+
+    def invalidate(self):
+        """丢弃内存文档，下次访问时重新从磁盘加载"""
+        with self._lock:
+            self._data = None
+            self._disk_stat = None
+            self._dirty = False
+
+
+data_store = DataStore()
+_image_store: Optional[ImageStore] = None
+_image_pipeline: Optional[ImagePipeline] = None
+_ability_history = None  # AbilityHistory（依赖NumPy，首次使用时才导入）
+
+
+@atexit.register
+def _flush_on_exit():
+    """退出前把合并写入窗口中尚未落盘的修改写掉"""
+    try:
+        data_store.flush()
+    except Exception as e:
+        print(f"❌ 写入数据失败：{str(e)}")
+
+
 # ==================== 核心工具函数（后续模块调用入口）====================
 def read_data() -> Dict:
-    """读取user_data.json数据，返回字典格式（兼容多级任务树）"""
-    # 确保数据环境已初始化
-    init_data_env()
-
+    """读取数据，返回内存中的文档（首次调用时才解析JSON，兼容多级任务树）"""
     try:
-        with open(USER_DATA_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        # 兼容处理：补充缺失字段（含parent_id）
-        data = complement_data_structure(data)
-        return data
-    except json.JSONDecodeError:
-        print("⚠️  JSON数据格式错误，使用默认数据覆盖")
+        return data_store.get()
+    except (json.JSONDecodeError, sqlite3.DatabaseError):
+        # 损坏的文件改名保留，避免用户数据被默认数据静默覆盖
+        backup_path = data_store.backend.backup_corrupt()
+        print(f"⚠️  数据文件格式错误，原文件已备份为 {backup_path}，使用默认数据")
         default_data = generate_default_data()
+        # 积分流水/成长记录不在主文件中时（JSON后端），仍可从history journal恢复
+        for key, entries in data_store.backend.recover_history().items():
+            set_history_list(default_data, key, entries)
         write_data(default_data)
         return default_data
     except Exception as e:
@@ -99,60 +458,231 @@ def read_data() -> Dict:
         return generate_default_data()
 
 
+def get_target_index() -> TargetIndex:
+    """获取目标索引（id→目标、parent_id→子目标列表），增删目标时请通过索引操作"""
+    return data_store.target_index()
+
+
+def get_rating_index() -> RatingSystemIndex:
+    """获取评分系统索引（id→评分系统），增删评分系统时请通过索引操作"""
+    return data_store.rating_index()
+
+
+def get_search_index(kind: str = SEARCH_TARGETS) -> SearchIndex:
+    """获取搜索索引（SEARCH_TARGETS / SEARCH_GROWTH），首次调用时构建"""
+    return data_store.search_index(kind)
+
+
+def update_search_index(kind: str, item: Dict):
+    """派生索引（见INDEX_SOURCES）中的条目添加或修改后调用（索引尚未构建时什么也不做）"""
+    index = data_store.cached_index(kind)
+    if index is not None:
+        index.add_item(item)
+
+
+def remove_from_search_index(kind: str, doc_ids: List[str]):
+    """派生索引（见INDEX_SOURCES）中的条目删除后调用（索引尚未构建时什么也不做）"""
+    index = data_store.cached_index(kind)
+    if index is not None:
+        index.remove_many(doc_ids)
+
+
+def update_target_indexes(target: Dict):
+    """目标添加或修改（名称、截止时间、积分）后调用，同步搜索索引、截止时间索引和子树汇总"""
+    for name in TARGET_INDEXES:
+        update_search_index(name, target)
+
+
+def remove_from_target_indexes(target_ids: List[str]):
+    """目标删除后调用，同步搜索索引、截止时间索引和子树汇总"""
+    for name in TARGET_INDEXES:
+        remove_from_search_index(name, target_ids)
+
+
+def update_target_statuses(targets: List[Dict]):
+    """目标完成状态变化（含父子联动）后调用，同步子树汇总（其他索引与状态无关）"""
+    aggregates = data_store.cached_index(AGGREGATE_INDEX)
+    if aggregates is not None:
+        aggregates.add_many(targets)
+
+
+def get_target_aggregates(build: bool = True) -> Optional["TargetAggregates"]:
+    """获取目标子树汇总（积分合计、已完成数/目标数、逾期数）；build=False时只返回已构建的"""
+    return data_store.target_aggregates(build=build)
+
+
+def build_target_aggregates() -> Optional["TargetAggregates"]:
+    """在后台线程构建目标子树汇总；构建期间数据被修改时返回None（需重试）"""
+    return data_store.build_target_aggregates()
+
+
+def search_targets(query: str, limit: int = None) -> List[str]:
+    """按名称搜索目标，返回目标id列表（按添加顺序）"""
+    return get_search_index(SEARCH_TARGETS).search(query, limit)
+
+
+def search_growth_records(query: str, limit: int = None) -> List[str]:
+    """按内容搜索成长记录，返回记录id列表（按添加顺序）"""
+    return get_search_index(SEARCH_GROWTH).search(query, limit)
+
+
+def get_deadline_index() -> DeadlineIndex:
+    """获取截止时间索引（已逾期、N天内到期、按截止时间排序），首次调用时构建"""
+    return data_store.deadline_index()
+
+
+def get_overdue_targets(include_done: bool = False) -> List[Dict]:
+    """已逾期的目标（默认不含已完成），最早到期的在前"""
+    return get_deadline_index().overdue(include_done=include_done)
+
+
+def get_targets_due_within(days: int, include_done: bool = False) -> List[Dict]:
+    """今天起days天内（含今天）到期的目标（默认不含已完成），按截止时间排序"""
+    return get_deadline_index().due_within(days, include_done=include_done)
+
+
+def get_points_ledger() -> PointsLedger:
+    """获取积分账本（分页查看流水、查询某时刻余额、核对积分总额）"""
+    return data_store.points_ledger()
+
+
+def add_points_record(data: Dict, points: int, reason: str, target_id: str = None) -> Dict:
+    """记一笔积分：更新积分总额并追加流水，返回新增的流水条目"""
+    account = data.setdefault("points_account", {"total": 0, "records": []})
+    account["total"] = account.get("total", 0) + points
+    record = {
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "reason": reason,
+        "points": points,
+    }
+    if target_id:
+        record["target_id"] = target_id
+    account.setdefault("records", []).append(record)
+    return record
+
+
 def write_data(data: Dict) -> bool:
-    """将字典数据写入user_data.json，返回写入结果（成功True/失败False）"""
+    """写入数据（由存储后端落盘），返回写入结果（成功True/失败False）"""
     try:
-        with open(USER_DATA_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
+        return data_store.save(data)
     except Exception as e:
         print(f"❌ 写入数据失败：{str(e)}")
         return False
 
 
+def get_image_store() -> ImageStore:
+    """获取全局图片存储（内容寻址的文件布局、引用计数、垃圾回收）"""
+    global _image_store
+    if _image_store is None:
+        _image_store = ImageStore(RECORD_IMAGE_DIR, BASE_DIR)
+    return _image_store
+
+
+def get_ability_history():
+    """获取能力值历史（每次修改能力值追加记录，按图表宽度返回降采样后的趋势序列）"""
+    global _ability_history
+    if _ability_history is None:
+        from utils.ability_history import AbilityHistory
+        _ability_history = AbilityHistory(ABILITY_HISTORY_PATH)
+    _ability_history.fsync = data_store.fsync_policy != FSYNC_NEVER
+    return _ability_history
+
+
+def get_image_pipeline() -> ImagePipeline:
+    """获取全局图片流水线（首次调用时创建）"""
+    global _image_pipeline
+    if _image_pipeline is None:
+        _image_pipeline = ImagePipeline(get_image_store())
+    return _image_pipeline
+
+
 def save_image(image_data: Union[bytes, io.BytesIO]) -> Optional[str]:
     """
-    保存图片到data/records目录，返回图片相对路径（供JSON存储）
+    保存图片到data/records目录（同时生成缩略图），返回图片相对路径（供JSON存储）
+    会阻塞调用线程，界面中请使用save_image_async
     :param image_data: 图片二进制数据 或 BytesIO对象
-    :return: 成功返回相对路径（如"data/records/1740000000_123456.jpg"），失败返回None
+    :return: 成功返回相对路径（如"data/records/ab/ab12....jpg"），失败返回None
     """
-    try:
-        # 生成文件名：时间戳_8位随机数.jpg
-        timestamp = int(datetime.now().timestamp())
-        random_num = random.randint(100000, 999999)
-        filename = f"{timestamp}_{random_num}.jpg"
-        image_abs_path = os.path.join(RECORD_IMAGE_DIR, filename)
-
-        # 处理图片数据并保存（确保格式正确）
-        with Image.open(image_data) as img:
-            # 自动转换为RGB格式（处理透明图片）
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-            img.save(image_abs_path, "JPEG", quality=90)
-
-        # 返回相对路径（项目根目录为基准）
-        relative_path = os.path.relpath(image_abs_path, BASE_DIR)
-        return relative_path
-    except Exception as e:
-        print(f"❌ 保存图片失败：{str(e)}")
-        return None
+    return get_image_pipeline().process(image_data)
 
 
-def complement_data_structure(data: Dict) -> Dict:
-    """兼容旧数据：补充缺失的字段（重点添加parent_id支持多级任务树）"""
-    # 1. 检查并补充targets字段（核心：为旧目标添加parent_id）
-    if "targets" not in data:
-        data["targets"] = []
-    else:
-        # 为所有旧目标（无parent_id）添加parent_id="root"，转为根节点
-        for target in data["targets"]:
-            if "parent_id" not in target:
-                target["parent_id"] = "root"
-            # 兼容旧字段名（如果存在旧版"reward_points"以外的字段）
-            if "points" not in target and "reward_points" in target:
-                target["points"] = target["reward_points"]  # 统一字段名便于后续处理
-
-    # 2. 检查并补充rating_systems字段（保持原有逻辑）
+def save_image_async(image_data: Union[bytes, io.BytesIO]) -> Future:
+    """在后台线程池中保存图片，Future的结果与save_image的返回值相同"""
+    return get_image_pipeline().submit(image_data)
+
+
+def collect_image_garbage(max_buckets: int = GC_BUCKETS_PER_RUN) -> Dict:
+    """
+    增量回收没有被成长记录引用的图片（每次只扫描少量分片）
+    :return: {"deleted": 删除文件数, "freed_bytes": 释放字节数, "scanned_buckets": 扫描分片数}
+    """
+    return data_store.collect_image_garbage(max_buckets)
+
+
+def save_image_file_async(file_path: str) -> Future:
+    """在后台线程池中读取并保存图片文件（读文件也不占用调用线程）"""
+    pipeline = get_image_pipeline()
+
+    def task():
+        try:
+            with open(file_path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            print(f"❌ 读取图片失败：{str(e)}")
+            return None
+        return pipeline.process(raw)
+
+    return pipeline.executor.submit(task)
+
+
+def get_image_for_width(image_path: str, display_width: int, device_pixel_ratio: float = 1.0) -> str:
+    """返回适合显示宽度的图片相对路径（缩略图或原图）"""
+    return get_image_pipeline().image_for_width(image_path, display_width, device_pixel_ratio)
+
+
+# ==================== 成长记录 ====================
+def count_growth_records() -> int:
+    return len(get_history_list(read_data(), "growth"))
+
+
+def get_growth_records_page(offset: int = 0, limit: int = 50) -> List[Dict]:
+    """按时间倒序分页读取成长记录（最新的在前），只取本页的条目"""
+    records = get_history_list(read_data(), "growth")
+    end = max(len(records) - offset, 0)
+    start = max(end - limit, 0)
+    return records[start:end][::-1]
+
+
+def add_growth_record(content: str, images: List[str] = None) -> Dict:
+    """追加一条成长记录（images为save_image返回的相对路径），返回新记录；调用方负责保存"""
+    record = {
+        "id": f"record_{uuid.uuid4().hex[:8]}",
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "content": content,
+        "images": list(images or []),
+    }
+    read_data().setdefault("growth_records", []).append(record)
+    update_search_index(SEARCH_GROWTH, record)
+    return record
+
+
+def delete_growth_record(record_id: str) -> Optional[Dict]:
+    """删除成长记录（从最新的开始查找），返回被删除的记录；调用方负责保存"""
+    records = get_history_list(read_data(), "growth")
+    for i in range(len(records) - 1, -1, -1):
+        if records[i].get("id") == record_id:
+            record = records.pop(i)
+            remove_from_search_index(SEARCH_GROWTH, [record_id])
+            # 已写入的历史被修改：下次保存时重写journal，图片引用重新统计（无引用的图片交给垃圾回收）
+            data_store.mark_history_rewrite("growth")
+            return record
+    return None
+
+
+# ==================== 数据迁移（按版本号一次性执行）====================
+def _migrate_v1(data: Dict):
+    """补全顶层字段和评分系统字段（原complement_data_structure的逻辑）"""
+    data.setdefault("targets", [])
     if "rating_systems" not in data:
         data["rating_systems"] = [generate_default_data()["rating_systems"][0]]
     else:
@@ -161,18 +691,51 @@ def complement_data_structure(data: Dict) -> Dict:
                 rs["rank_rules"] = generate_default_data()["rating_systems"][0]["rank_rules"]
             if "abilities" not in rs:
                 rs["abilities"] = []
+    data.setdefault("growth_records", [])
+    account = data.setdefault("points_account", {"total": 0, "records": []})
+    account.setdefault("total", 0)
+    account.setdefault("records", [])
 
-    # 3. 检查并补充growth_records字段（保持原有逻辑）
-    if "growth_records" not in data:
-        data["growth_records"] = []
 
-    # 4. 检查并补充points_account字段（保持原有逻辑）
-    if "points_account" not in data:
-        data["points_account"] = {"total": 0, "records": []}
-    else:
-        if "total" not in data["points_account"]:
-            data["points_account"]["total"] = 0
-        if "records" not in data["points_account"]:
-            data["points_account"]["records"] = []
+def _migrate_v2(data: Dict):
+    """补全目标字段（id/parent_id/status/points），旧字段reward_points统一为points"""
+    for target in data["targets"]:
+        if "id" not in target:
+            target["id"] = str(uuid.uuid4())
+        # 为所有旧目标（无parent_id）添加parent_id="root"，转为根节点
+        if "parent_id" not in target:
+            target["parent_id"] = "root"
+        if "status" not in target:
+            target["status"] = "未开始"
+        if "reward_points" in target:
+            target.setdefault("points", target["reward_points"])
+            del target["reward_points"]
+        target.setdefault("points", 0)
+
+
+# 迁移步骤（版本号, 迁移函数），按版本号升序排列，新增步骤只能追加在末尾
+MIGRATIONS = [
+    (1, _migrate_v1),
+    (2, _migrate_v2),
+]
+CURRENT_SCHEMA_VERSION = MIGRATIONS[-1][0]
+
 
-    return data
\ No newline at end of file
+def migrate_data(data: Dict) -> bool:
+    """
+    把文档升级到当前版本：只执行比文档schema_version新的迁移步骤
+    :return: 是否执行了迁移（执行了则需要写回一次）
+    """
+    version = data.get("schema_version", 0)
+    if version > CURRENT_SCHEMA_VERSION:
+        print(f"⚠️  数据版本（{version}）高于程序支持的版本（{CURRENT_SCHEMA_VERSION}），请升级程序")
+        return False
+    migrated = False
+    for step_version, step in MIGRATIONS:
+        if step_version > version:
+            step(data)
+            data["schema_version"] = step_version
+            migrated = True
+    if migrated:
+        print(f"✅ 数据已从版本 {version} 升级到 {CURRENT_SCHEMA_VERSION}")
+    return migrated
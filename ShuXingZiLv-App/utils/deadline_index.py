@@ -0,0 +1,128 @@
+import bisect
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+DONE_STATUS = "已完成"
+
+
+def parse_deadline(value) -> Optional[int]:
+    """"yyyy-MM-dd" -> 日期序数（date.toordinal），无法解析时返回None"""
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def is_overdue(target: Dict, today: date = None) -> bool:
+    """截止时间早于今天（与DeadlineIndex.overdue的判定一致：无法解析的截止时间不算逾期，不看完成状态）"""
+    ordinal = parse_deadline(target.get("deadline"))
+    return ordinal is not None and ordinal < (today or date.today()).toordinal()
+
+
+class DeadlineIndex:
+    """
+    截止时间索引：按解析后的日期排序的(日期序数, 添加顺序, 目标id)列表，随增/改/删增量更新
+    "已逾期""N天内到期"等查询只需二分定位区间，不必逐个解析全部目标的deadline字符串
+    截止时间无法解析的目标单独存放，只在完整排序时排在最后
+    """
+
+    def __init__(self, targets: List[Dict]):
+        self._keys: List[tuple] = []  # 有序：(日期序数, 顺序号, 目标id)
+        self._key_of: Dict[str, Optional[tuple]] = {}  # 目标id -> 排序键（无法解析时为None）
+        self._targets: Dict[str, Dict] = {}
+        self._invalid: Dict[str, int] = {}  # 截止时间无法解析的目标id -> 顺序号
+        self._seq = 0
+        self.source = None  # 建立索引时的targets列表（数据仓库据此判断是否需要重建）
+        entries = []
+        for target in targets:
+            key = self._register(target)
+            if key is not None:
+                entries.append(key)
+        self._keys = sorted(entries)
+        self.source_size = len(targets)
+
+    def __len__(self):
+        return len(self._key_of)
+
+    def _register(self, target: Dict) -> Optional[tuple]:
+        """记录目标并返回排序键（不插入有序列表）"""
+        target_id = target.get("id")
+        self._targets[target_id] = target
+        ordinal = parse_deadline(target.get("deadline"))
+        self._seq += 1
+        if ordinal is None:
+            self._key_of[target_id] = None
+            self._invalid[target_id] = self._seq
+            return None
+        key = (ordinal, self._seq, target_id)
+        self._key_of[target_id] = key
+        return key
+
+    # ==================== 增量更新 ====================
+    def add_item(self, target: Dict):
+        """添加目标；已存在时按新的截止时间更新位置"""
+        if target.get("id") in self._key_of:
+            self._unlink(target["id"])
+        else:
+            self.source_size += 1
+        key = self._register(target)
+        if key is not None:
+            bisect.insort(self._keys, key)
+
+    def remove(self, target_id: str) -> bool:
+        if target_id not in self._key_of:
+            return False
+        self._unlink(target_id)
+        self.source_size -= 1
+        return True
+
+    def remove_many(self, target_ids: Iterable[str]):
+        for target_id in target_ids:
+            self.remove(target_id)
+
+    def _unlink(self, target_id: str):
+        key = self._key_of.pop(target_id)
+        self._targets.pop(target_id, None)
+        if key is None:
+            self._invalid.pop(target_id, None)
+            return
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    # ==================== 查询 ====================
+    def _collect(self, start: int, end: int, include_done: bool) -> List[Dict]:
+        targets = (self._targets[key[2]] for key in self._keys[start:end])
+        return [t for t in targets if include_done or t.get("status") != DONE_STATUS]
+
+    def between(self, start: date, end: date, include_done: bool = False) -> List[Dict]:
+        """截止时间在[start, end]之间的目标，按截止时间排序"""
+        lo = bisect.bisect_left(self._keys, (start.toordinal(),))
+        hi = bisect.bisect_left(self._keys, (end.toordinal() + 1,))
+        return self._collect(lo, hi, include_done)
+
+    def overdue(self, today: date = None, include_done: bool = False) -> List[Dict]:
+        """截止时间早于今天的目标（默认不含已完成），最早到期的在前"""
+        today = today or date.today()
+        return self._collect(0, bisect.bisect_left(self._keys, (today.toordinal(),)), include_done)
+
+    def due_within(self, days: int, today: date = None, include_done: bool = False) -> List[Dict]:
+        """今天起days天内（含今天）到期的目标（默认不含已完成）"""
+        today = today or date.today()
+        return self.between(today, today + timedelta(days=days), include_done)
+
+    def sorted_targets(self, include_done: bool = True) -> List[Dict]:
+        """全部目标按截止时间排序（截止时间无法解析的排在最后）"""
+        result = self._collect(0, len(self._keys), include_done)
+        invalid = (self._targets[tid] for tid in sorted(self._invalid, key=self._invalid.get))
+        result.extend(t for t in invalid if include_done or t.get("status") != DONE_STATUS)
+        return result
+
+    def next_deadline(self, today: date = None) -> Optional[Dict]:
+        """今天及以后最早到期的未完成目标（提醒用）"""
+        today = today or date.today()
+        for key in self._keys[bisect.bisect_left(self._keys, (today.toordinal(),)):]:
+            target = self._targets[key[2]]
+            if target.get("status") != DONE_STATUS:
+                return target
+        return None
@@ -0,0 +1,134 @@
+import json
+import os
+from typing import Collection, Dict, List
+from utils.atomic_file import atomic_write_text
+
+# ==================== 历史列表配置 ====================
+# 只增不减的历史列表：journal键 -> 文档中的路径
+HISTORY_LISTS = {
+    "points": ("points_account", "records"),  # 积分流水
+    "growth": ("growth_records",),  # 成长记录
+}
+
+# 失效行（被clear掉的旧记录）超过该数量且超过有效记录数时触发压缩
+COMPACT_MIN_LINES = 1000
+
+
+def get_history_list(data: Dict, key: str) -> List:
+    """按journal键取出文档中的历史列表（不存在时返回空列表）"""
+    node = data
+    for part in HISTORY_LISTS[key]:
+        node = node.get(part, {}) if isinstance(node, dict) else {}
+    return node if isinstance(node, list) else []
+
+
+def set_history_list(data: Dict, key: str, entries: List):
+    """按journal键把历史列表写回文档"""
+    *parents, last = HISTORY_LISTS[key]
+    node = data
+    for part in parents:
+        node = node.setdefault(part, {})
+    node[last] = entries
+
+
+def strip_history(data: Dict) -> Dict:
+    """返回去掉历史列表的浅拷贝（主JSON文件只保存这部分）"""
+    doc = dict(data)
+    doc.pop("growth_records", None)
+    if isinstance(doc.get("points_account"), dict):
+        doc["points_account"] = {k: v for k, v in doc["points_account"].items() if k != "records"}
+    return doc
+
+
+class HistoryJournal:
+    """
+    历史列表的追加式JSON-lines日志（与user_data.json放在同一目录）
+    每行一个操作：{"key": "points", "op": "append", "entry": {...}} 或 {"key": ..., "op": "clear"}
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._persisted = {key: 0 for key in HISTORY_LISTS}  # 各列表已写入日志的条数
+        self._line_count = 0  # 日志总行数（含已失效的行）
+        self._torn_tail = False  # 文件末尾是否有崩溃留下的半行（追加前需先补换行）
+        self.fsync = False  # 追加后是否fsync（由数据仓库按写入策略设置）
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> Dict[str, List]:
+        """回放日志，返回各历史列表（日志不存在时返回空字典）"""
+        self._persisted = {key: 0 for key in HISTORY_LISTS}
+        self._line_count = 0
+        self._torn_tail = False
+        if not self.exists():
+            return {}
+
+        history = {key: [] for key in HISTORY_LISTS}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                self._torn_tail = not line.endswith("\n")
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    # 最后一行可能因崩溃只写了一半，跳过即可
+                    print("⚠️  历史日志存在损坏的行，已跳过")
+                    continue
+                self._line_count += 1
+                key = op.get("key")
+                if key not in history:
+                    continue
+                if op.get("op") == "append":
+                    history[key].append(op.get("entry"))
+                elif op.get("op") == "clear":
+                    history[key] = []
+
+        for key, entries in history.items():
+            self._persisted[key] = len(entries)
+        return history
+
+    def sync(self, data: Dict, rewrite: Collection[str] = ()):
+        """
+        把文档中新增的历史条目追加到日志（只写增量）
+        rewrite：这份文档中有已有条目被修改/删除的列表（由数据仓库随快照给出），整体重写
+        """
+        lines = []
+        live_count = 0
+        for key in HISTORY_LISTS:
+            entries = get_history_list(data, key)
+            live_count += len(entries)
+            start = self._persisted[key]
+            if key in rewrite or len(entries) < start:
+                lines.append(json.dumps({"key": key, "op": "clear"}, ensure_ascii=False))
+                start = 0
+            for entry in entries[start:]:
+                lines.append(json.dumps({"key": key, "op": "append", "entry": entry}, ensure_ascii=False))
+
+        if lines:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(("\n" if self._torn_tail else "") + "\n".join(lines) + "\n")
+                if self.fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._line_count += len(lines)
+            self._torn_tail = False
+        for key in HISTORY_LISTS:
+            self._persisted[key] = len(get_history_list(data, key))
+
+        # 失效行过多时压缩
+        stale = self._line_count - live_count
+        if stale > COMPACT_MIN_LINES and stale > live_count:
+            self.compact(data)
+
+    def compact(self, data: Dict):
+        """用当前历史列表重写日志，丢弃被clear掉的旧行"""
+        lines = [json.dumps({"key": key, "op": "append", "entry": entry}, ensure_ascii=False)
+                 for key in HISTORY_LISTS for entry in get_history_list(data, key)]
+        atomic_write_text(self.path, "".join(line + "\n" for line in lines), fsync=self.fsync)
+        self._line_count = len(lines)
+        self._torn_tail = False
+        for key in HISTORY_LISTS:
+            self._persisted[key] = len(get_history_list(data, key))
@@ -0,0 +1,149 @@
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Union
+from utils.image_store import ImageStore
+
+# ==================== 图片处理配置 ====================
+THUMBNAIL_SIZES = (160, 480, 1080)  # 缩略图最长边（像素），从小到大
+ORIGINAL_QUALITY = 90  # 原图JPEG质量（与原save_image一致）
+THUMBNAIL_QUALITY = 85  # 缩略图JPEG质量
+MAX_WORKERS = min(4, os.cpu_count() or 1)  # 编码线程数（PIL编解码时会释放GIL）
+JPEG_MODES = ("RGB", "L", "CMYK")  # 可以直接保存为JPEG的模式，其余模式先转RGB
+
+
+def _atomic_save(img, path: str, quality: int):
+    """先写临时文件再改名：读取方不会看到写了一半的图片，同一图片并发保存也不会冲突"""
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    img.save(tmp_path, "JPEG", quality=quality)
+    os.replace(tmp_path, path)
+
+
+class ImagePipeline:
+    """
+    成长记录图片流水线：
+    - 按内容哈希保存到ImageStore，同一张图片重复上传只保存一份
+    - 在线程池中解码/编码，同时生成多个尺寸的缩略图
+    - 按显示宽度返回合适尺寸的图片，列表/画廊不需要加载原图
+    """
+
+    def __init__(self, store: ImageStore):
+        self.store = store  # 文件布局（路径、缩略图位置）
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending_thumbs = set()  # 正在后台补生成缩略图的原图
+        self._complete = set()  # 已确认不需要再补生成缩略图的原图（如比最小缩略图还小）
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="image")
+            return self._executor
+
+    # ==================== 保存 ====================
+    def submit(self, image_data: Union[bytes, io.BytesIO]) -> Future:
+        """后台保存图片，Future的结果为相对路径（失败时为None）"""
+        if not isinstance(image_data, bytes):
+            image_data = image_data.getvalue()  # 调用方之后可能复用/关闭BytesIO，先取出内容
+        return self.executor.submit(self.process, image_data)
+
+    def process(self, image_data: Union[bytes, io.BytesIO]) -> Optional[str]:
+        """保存原图和缩略图，返回原图相对路径（在调用线程中执行）"""
+        from PIL import Image  # 只有保存图片时才需要PIL，避免拖慢启动
+        try:
+            raw = image_data if isinstance(image_data, bytes) else image_data.getvalue()
+            digest = hashlib.sha256(raw).hexdigest()
+            abs_path = self.store.content_path(digest)
+            if os.path.exists(abs_path):
+                # 相同内容已保存过：刷新修改时间（避免在记录写入前被垃圾回收），只补齐可能缺失的缩略图
+                os.utime(abs_path)
+                self._ensure_thumbnails(abs_path)
+                return self.store.relative(abs_path)
+
+            os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+            with Image.open(io.BytesIO(raw)) as img:
+                # 自动转换为RGB格式（处理透明图片等JPEG不支持的模式）
+                if img.mode not in JPEG_MODES:
+                    img = img.convert("RGB")
+                else:
+                    img.load()
+                _atomic_save(img, abs_path, ORIGINAL_QUALITY)
+                self._write_thumbnails(img, abs_path, THUMBNAIL_SIZES)
+            return self.store.relative(abs_path)
+        except Exception as e:
+            print(f"❌ 保存图片失败：{str(e)}")
+            return None
+
+    def _write_thumbnails(self, img, abs_path: str, sizes):
+        """从大到小逐级缩小（每级以上一级为输入），原图不够大的尺寸不生成"""
+        from PIL import Image
+        current = img
+        for size in sorted(sizes, reverse=True):
+            if max(img.size) <= size:
+                continue
+            current = current.copy()
+            current.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=2.0)
+            thumb_path = self.store.thumbnail_path(abs_path, size)
+            os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+            _atomic_save(current, thumb_path, THUMBNAIL_QUALITY)
+
+    def _ensure_thumbnails(self, abs_path: str):
+        """为已有原图补生成缩略图：用Image.draft让JPEG解码器直接按1/2~1/8比例解码"""
+        from PIL import Image
+        with Image.open(abs_path) as img:  # 只读取文件头，还没有解码
+            missing = [size for size in THUMBNAIL_SIZES
+                       if size < max(img.size) and not os.path.exists(self.store.thumbnail_path(abs_path, size))]
+            if not missing:
+                with self._lock:
+                    self._complete.add(abs_path)
+                return
+            img.draft("RGB", (max(missing), max(missing)))
+            img = img.convert("RGB") if img.mode not in JPEG_MODES else img
+            img.load()
+            self._write_thumbnails(img, abs_path, missing)
+
+    # ==================== 读取 ====================
+    def image_for_width(self, rel_path: str, display_width: int, device_pixel_ratio: float = 1.0) -> str:
+        """
+        返回适合显示宽度的图片相对路径：最小的不小于所需像素的缩略图，没有则返回原图
+        缩略图缺失（如旧版图片）时在后台补生成，下次调用即可命中
+        """
+        abs_path = self.store.absolute(rel_path)
+        needed = display_width * device_pixel_ratio
+        sizes = sorted(THUMBNAIL_SIZES)
+        for i, size in enumerate(sizes):
+            if size >= needed:
+                thumb = self.store.thumbnail_path(abs_path, size)
+                if os.path.exists(thumb):
+                    return self.store.relative(thumb)
+                # 更小的缩略图存在说明原图本身不到这个尺寸，直接用原图
+                if not (i and os.path.exists(self.store.thumbnail_path(abs_path, sizes[i - 1]))):
+                    self._schedule_thumbnails(abs_path)
+                break
+        return rel_path
+
+    def _schedule_thumbnails(self, abs_path: str):
+        with self._lock:
+            if abs_path in self._pending_thumbs or abs_path in self._complete or not os.path.exists(abs_path):
+                return
+            self._pending_thumbs.add(abs_path)
+
+        def task():
+            try:
+                self._ensure_thumbnails(abs_path)
+            except Exception as e:
+                print(f"⚠️  生成缩略图失败：{str(e)}")
+            finally:
+                with self._lock:
+                    self._pending_thumbs.discard(abs_path)
+
+        self.executor.submit(task)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
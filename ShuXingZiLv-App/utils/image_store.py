@@ -0,0 +1,221 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from utils.atomic_file import atomic_write_json
+
+# ==================== 图片存储配置 ====================
+HASH_NAME_LENGTH = 32  # 文件名使用的内容哈希长度（十六进制字符）
+SHARD_LENGTH = 2  # 分片目录名长度：00 ~ ff，共256个，避免单个目录文件过多
+THUMBNAIL_DIR_NAME = "thumbs"  # 缩略图目录（位于图片目录下，同样分片）
+GC_STATE_FILE = ".gc_state.json"  # 垃圾回收进度（待检查的文件、下一个要扫描的分片）
+GC_BUCKETS_PER_RUN = 16  # 每次垃圾回收扫描的分片数（全部扫完一轮需要约17次）
+GC_GRACE_SECONDS = 24 * 3600  # 最近修改过的文件不回收（可能刚保存、所属成长记录还没写入）
+
+# 成长记录中引用图片的字段：image（单张，相对路径）/ images（多张，相对路径列表）
+RECORD_IMAGE_FIELDS = ("image", "images")
+
+
+def record_image_paths(record: Dict) -> List[str]:
+    """返回一条成长记录引用的所有图片相对路径"""
+    paths = []
+    for field in RECORD_IMAGE_FIELDS:
+        value = record.get(field) if isinstance(record, dict) else None
+        if isinstance(value, str) and value:
+            paths.append(value)
+        elif isinstance(value, list):
+            paths.extend(p for p in value if isinstance(p, str) and p)
+    return paths
+
+
+class ImageStore:
+    """
+    内容寻址的图片存储：原图 data/records/<哈希前2位>/<哈希>.jpg，
+    缩略图 data/records/thumbs/<文件名前2位>/<文件名>_<尺寸>.jpg
+    引用计数来自growth_records；成长记录被删除/修改后引用归零的图片进入待检查列表，
+    垃圾回收优先处理待检查列表，再每次轮流扫描少量分片，不会每次遍历整个目录
+    """
+
+    def __init__(self, image_dir: str, base_dir: str):
+        self.image_dir = image_dir
+        self.thumb_dir = os.path.join(image_dir, THUMBNAIL_DIR_NAME)
+        self.base_dir = base_dir  # 成长记录中的路径以此为基准
+        self.state_path = os.path.join(image_dir, GC_STATE_FILE)
+        self._lock = threading.RLock()
+        self._refs: Optional[Counter] = None  # 相对路径（规范化）-> 引用次数
+        self._synced_count = 0  # 已统计的成长记录条数
+        self._generation = -1  # 已同步的文档修改代数
+        self._rewrite = False  # 已有成长记录被修改/删除，下次同步时重新统计
+
+    # ==================== 路径 ====================
+    def relative(self, abs_path: str) -> str:
+        return os.path.relpath(abs_path, self.base_dir)
+
+    def absolute(self, rel_path: str) -> str:
+        return rel_path if os.path.isabs(rel_path) else os.path.join(self.base_dir, rel_path)
+
+    def _key(self, path: str) -> str:
+        return os.path.normcase(os.path.normpath(self.relative(self.absolute(path))))
+
+    def content_path(self, digest: str) -> str:
+        """内容哈希 -> 原图绝对路径"""
+        name = digest[:HASH_NAME_LENGTH]
+        return os.path.join(self.image_dir, name[:SHARD_LENGTH], f"{name}.jpg")
+
+    def thumbnail_path(self, abs_path: str, size: int) -> str:
+        """原图对应的缩略图路径（旧版时间戳命名的图片同样适用）"""
+        stem = os.path.splitext(os.path.basename(abs_path))[0]
+        return os.path.join(self.thumb_dir, stem[:SHARD_LENGTH], f"{stem}_{size}.jpg")
+
+    def _original_candidates(self, stem: str) -> List[str]:
+        """缩略图文件名 -> 可能的原图路径（分片目录或旧版的平铺目录）"""
+        return [os.path.join(self.image_dir, stem[:SHARD_LENGTH], f"{stem}.jpg"),
+                os.path.join(self.image_dir, f"{stem}.jpg")]
+
+    # ==================== 引用计数 ====================
+    def mark_rewrite(self):
+        """已有成长记录被修改/删除时调用"""
+        self._rewrite = True
+
+    def sync_refs(self, records: List[Dict], generation: int):
+        """按成长记录更新引用计数：只追加时增量统计，否则重新统计并把归零的图片加入待检查列表"""
+        with self._lock:
+            if generation < self._generation:
+                return
+            self._generation = generation
+            if self._refs is not None and not self._rewrite and len(records) >= self._synced_count:
+                for record in records[self._synced_count:]:
+                    self._refs.update(self._key(p) for p in record_image_paths(record))
+            else:
+                refs = Counter(self._key(p) for record in records for p in record_image_paths(record))
+                if self._refs is not None:
+                    self._add_pending(key for key in self._refs if key not in refs)
+                self._refs = refs
+                self._rewrite = False
+            self._synced_count = len(records)
+
+    def refcount(self, path: str) -> int:
+        with self._lock:
+            return self._refs.get(self._key(path), 0) if self._refs is not None else 0
+
+    # ==================== 垃圾回收 ====================
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            return {"cursor": int(state.get("cursor", 0)), "pending": list(state.get("pending", []))}
+        except (OSError, ValueError):
+            return {"cursor": 0, "pending": []}
+
+    def _save_state(self, state: Dict):
+        os.makedirs(self.image_dir, exist_ok=True)
+        atomic_write_json(self.state_path, state, fsync=False)
+
+    def _add_pending(self, keys: Iterable[str]):
+        keys = list(keys)
+        if keys:
+            state = self._load_state()
+            state["pending"] = sorted(set(state["pending"]) | set(keys))
+            self._save_state(state)
+
+    @staticmethod
+    def _buckets() -> List[str]:
+        """扫描单元：""为旧版平铺在图片目录中的文件，其余为各分片"""
+        return [""] + [f"{i:0{SHARD_LENGTH}x}" for i in range(16 ** SHARD_LENGTH)]
+
+    def _remove(self, abs_path: str, stats: Dict):
+        try:
+            size = os.path.getsize(abs_path)
+            os.remove(abs_path)
+        except OSError:
+            return
+        stats["deleted"] += 1
+        stats["freed_bytes"] += size
+
+    def _collectable(self, abs_path: str, now: float) -> bool:
+        """没有成长记录引用、且已过保护期的原图"""
+        if self._refs.get(self._key(abs_path), 0):
+            return False
+        try:
+            return now - os.path.getmtime(abs_path) >= GC_GRACE_SECONDS
+        except OSError:
+            return False
+
+    def _remove_original(self, abs_path: str, stats: Dict):
+        """删除原图及其所有缩略图"""
+        self._remove(abs_path, stats)
+        stem = os.path.splitext(os.path.basename(abs_path))[0]
+        thumb_dir = os.path.join(self.thumb_dir, stem[:SHARD_LENGTH])
+        try:
+            names = os.listdir(thumb_dir)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith(stem + "_"):
+                self._remove(os.path.join(thumb_dir, name), stats)
+
+    def _scan_bucket(self, bucket: str, now: float, stats: Dict):
+        folder = os.path.join(self.image_dir, bucket) if bucket else self.image_dir
+        try:
+            entries = list(os.scandir(folder))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(".jpg") and self._collectable(entry.path, now):
+                self._remove_original(entry.path, stats)
+        if not bucket:
+            # 旧版平铺在thumbs目录下的缩略图（现已分片存放，需要时会重新生成）
+            try:
+                old_thumbs = [e.path for e in os.scandir(self.thumb_dir) if e.is_file()]
+            except OSError:
+                old_thumbs = []
+            for path in old_thumbs:
+                self._remove(path, stats)
+            return
+        # 原图已不存在的缩略图
+        try:
+            thumbs = list(os.scandir(os.path.join(self.thumb_dir, bucket)))
+        except OSError:
+            thumbs = []
+        for entry in thumbs:
+            stem = entry.name.rsplit("_", 1)[0]
+            if entry.is_file() and not any(os.path.exists(p) for p in self._original_candidates(stem)):
+                self._remove(entry.path, stats)
+
+    def collect_garbage(self, max_buckets: int = GC_BUCKETS_PER_RUN) -> Dict:
+        """
+        增量回收没有被成长记录引用的图片（调用前需先sync_refs）
+        :param max_buckets: 本次扫描的分片数（0表示只处理待检查列表，负数表示扫描全部）
+        :return: {"deleted": 删除文件数, "freed_bytes": 释放字节数, "scanned_buckets": 扫描分片数}
+        """
+        with self._lock:
+            if self._refs is None:
+                raise RuntimeError("引用计数尚未统计，请先调用sync_refs")
+            now = time.time()
+            stats = {"deleted": 0, "freed_bytes": 0, "scanned_buckets": 0}
+            state = self._load_state()
+
+            # 1. 待检查列表：保护期内的先保留，下次再检查
+            still_pending = []
+            for key in state["pending"]:
+                abs_path = self.absolute(key)
+                if not os.path.exists(abs_path) or self._refs.get(key, 0):
+                    continue
+                if self._collectable(abs_path, now):
+                    self._remove_original(abs_path, stats)
+                else:
+                    still_pending.append(key)
+            state["pending"] = still_pending
+
+            # 2. 轮流扫描少量分片（兜底：清理崩溃、手动删除记录等未经过待检查列表的文件）
+            buckets = self._buckets()
+            count = len(buckets) if max_buckets < 0 else min(max_buckets, len(buckets))
+            for _ in range(count):
+                self._scan_bucket(buckets[state["cursor"] % len(buckets)], now, stats)
+                state["cursor"] = (state["cursor"] + 1) % len(buckets)
+                stats["scanned_buckets"] += 1
+
+            self._save_state(state)
+            return stats
@@ -0,0 +1,300 @@
+import json
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Union
+from utils.atomic_file import atomic_write_bytes, atomic_write_text
+
+# ==================== 文件格式 ====================
+# 头部：魔数、版本号、检查点间隔、保留字段
+HEADER = struct.Struct("<4sIII")
+MAGIC = b"SFPL"
+VERSION = 1
+# 每条记录：时间戳(秒)、积分变化、目标id序号、原因序号（序号对应names文件中的字符串）
+RECORD = struct.Struct("<qiII")
+# 检查点：每CHECKPOINT_INTERVAL条记录保存一次累计余额
+CHECKPOINT = struct.Struct("<q")
+CHECKPOINT_INTERVAL = 256
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"  # 与积分流水中的time字段一致
+
+NAME_TARGET = "t"  # names文件中的目标id
+NAME_REASON = "r"  # names文件中的原因文本
+
+
+def parse_time(value: Union[str, datetime, int, float]) -> int:
+    """时间 -> 时间戳（秒）；无法解析的时间记为0"""
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return int(datetime.strptime(value, TIME_FORMAT).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
+class PointsLedger:
+    """
+    二进制积分账本：由points_account["records"]派生的定长记录文件，可mmap随机访问。
+    - 分页读取流水不需要加载全部记录
+    - 每CHECKPOINT_INTERVAL条记录一个累计余额检查点，"某时刻的余额"只需二分定位 + 最多一个区间的求和
+    账本随时可以从积分流水重建，文件损坏或与流水对不上时直接重建
+    记录按追加顺序存储，时间早于上一条的记录（如系统时间被调整）时间戳按上一条记录，保证可二分
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        base = os.path.splitext(path)[0]
+        self.names_path = base + ".names.jsonl"  # 目标id/原因文本字符串表（追加式）
+        self.checkpoint_path = base + ".ckpt"  # 累计余额检查点
+        self.fsync = False
+        self._lock = threading.RLock()
+        self._generation = -1  # 已同步的文档修改代数（旧快照不会覆盖新内容）
+        self._rewrite = False  # 已有流水被修改/删除，下次同步时重建
+        self._reset_state()
+
+    def _reset_state(self):
+        self._count = 0
+        self._balance = 0
+        self._last_time = 0
+        self._checkpoints: List[int] = []  # 第i个检查点 = 前(i+1)*CHECKPOINT_INTERVAL条记录的余额
+        self._names = {NAME_TARGET: [""], NAME_REASON: [""]}  # 序号0保留给"无"
+        self._name_ids = {NAME_TARGET: {"": 0}, NAME_REASON: {"": 0}}
+        self._close_map()
+
+    # ==================== mmap ====================
+    def _close_map(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+        self._map: Optional[mmap.mmap] = None
+        self._mapped_count = 0
+
+    def _record(self, i: int):
+        """读取第i条记录（按需重新映射追加后变大的文件）"""
+        if i >= self._mapped_count:
+            self._close_map()
+            with open(self.path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mapped_count = (len(self._map) - HEADER.size) // RECORD.size
+        return RECORD.unpack_from(self._map, HEADER.size + i * RECORD.size)
+
+    def _time_at(self, i: int) -> int:
+        return self._record(i)[0]
+
+    def _sum(self, start: int, end: int) -> int:
+        return sum(self._record(i)[1] for i in range(start, end))
+
+    # ==================== 打开/重建 ====================
+    def open(self) -> bool:
+        """读取已有账本文件，格式不对或文件不完整时返回False（需要重建）"""
+        with self._lock:
+            self._reset_state()
+            try:
+                with open(self.path, "rb") as f:
+                    header = f.read(HEADER.size)
+                size = os.path.getsize(self.path)
+                magic, version, interval, _ = HEADER.unpack(header)
+                if magic != MAGIC or version != VERSION or interval != CHECKPOINT_INTERVAL:
+                    return False
+                if (size - HEADER.size) % RECORD.size:
+                    return False  # 末尾有崩溃留下的半条记录
+                self._load_names()
+                with open(self.checkpoint_path, "rb") as f:
+                    raw = f.read()
+            except (OSError, struct.error, ValueError):
+                self._reset_state()
+                return False
+
+            self._count = (size - HEADER.size) // RECORD.size
+            self._checkpoints = [value for (value,) in CHECKPOINT.iter_unpack(raw[:len(raw) - len(raw) % CHECKPOINT.size])]
+            if len(self._checkpoints) != self._count // CHECKPOINT_INTERVAL:
+                self._checkpoints = self._scan_checkpoints()
+                self._write_checkpoints()
+            if self._count:
+                last = self._record(self._count - 1)
+                if last[2] >= len(self._names[NAME_TARGET]) or last[3] >= len(self._names[NAME_REASON]):
+                    self._reset_state()
+                    return False  # 字符串表比记录少（写入中途崩溃）
+                self._last_time = last[0]
+            self._balance = self._balance_through(self._count)
+            return True
+
+    def _load_names(self):
+        if not os.path.exists(self.names_path):
+            return
+        with open(self.names_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    raise ValueError("names文件末尾不完整")
+                kind, value = json.loads(line)
+                self._name_ids[kind][value] = len(self._names[kind])
+                self._names[kind].append(value)
+
+    def _scan_checkpoints(self) -> List[int]:
+        checkpoints, balance = [], 0
+        for i in range(self._count):
+            balance += self._record(i)[1]
+            if (i + 1) % CHECKPOINT_INTERVAL == 0:
+                checkpoints.append(balance)
+        return checkpoints
+
+    def _write_checkpoints(self):
+        atomic_write_bytes(self.checkpoint_path, b"".join(CHECKPOINT.pack(v) for v in self._checkpoints),
+                           fsync=self.fsync)
+
+    def rebuild(self, entries: List[Dict]):
+        """根据积分流水整体重建账本文件"""
+        with self._lock:
+            self._reset_state()
+            new_names = []
+            records = [self._encode(entry, new_names) for entry in entries]
+            atomic_write_text(self.names_path, "".join(json.dumps(n, ensure_ascii=False) + "\n" for n in new_names),
+                              fsync=self.fsync)
+            atomic_write_bytes(self.path, HEADER.pack(MAGIC, VERSION, CHECKPOINT_INTERVAL, 0) + b"".join(records),
+                               fsync=self.fsync)
+            self._write_checkpoints()
+            self._rewrite = False
+
+    # ==================== 写入 ====================
+    def _name_id(self, kind: str, value, new_names: List) -> int:
+        value = "" if value is None else str(value)
+        ids = self._name_ids[kind]
+        if value not in ids:
+            ids[value] = len(self._names[kind])
+            self._names[kind].append(value)
+            new_names.append([kind, value])
+        return ids[value]
+
+    def _encode(self, entry: Dict, new_names: List) -> bytes:
+        """编码一条流水并更新内存中的余额/检查点"""
+        timestamp = max(parse_time(entry.get("time")), self._last_time)
+        delta = int(entry.get("points", 0))
+        record = RECORD.pack(timestamp, delta,
+                             self._name_id(NAME_TARGET, entry.get("target_id"), new_names),
+                             self._name_id(NAME_REASON, entry.get("reason"), new_names))
+        self._last_time = timestamp
+        self._balance += delta
+        self._count += 1
+        if self._count % CHECKPOINT_INTERVAL == 0:
+            self._checkpoints.append(self._balance)
+        return record
+
+    def _append(self, entries: List[Dict]):
+        new_names = []
+        old_checkpoints = len(self._checkpoints)
+        records = [self._encode(entry, new_names) for entry in entries]
+        # 先写字符串表，再写记录：崩溃时最多多出没有被引用的字符串
+        if new_names:
+            with open(self.names_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(n, ensure_ascii=False) + "\n" for n in new_names))
+                self._flush(f)
+        with open(self.path, "ab") as f:
+            f.write(b"".join(records))
+            self._flush(f)
+        if len(self._checkpoints) != old_checkpoints:
+            with open(self.checkpoint_path, "ab") as f:
+                f.write(b"".join(CHECKPOINT.pack(v) for v in self._checkpoints[old_checkpoints:]))
+                self._flush(f)
+
+    def _flush(self, f):
+        if self.fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def matches(self, entries: List[Dict]) -> bool:
+        """粗略核对账本与积分流水是否对应（条数不多于流水，且最后一条记录一致）"""
+        with self._lock:
+            if self._count > len(entries):
+                return False
+            if not self._count:
+                return True
+            entry = entries[self._count - 1]
+            timestamp, delta, _, reason_idx = self._record(self._count - 1)
+            return (delta == int(entry.get("points", 0))
+                    and self._names[NAME_REASON][reason_idx] == str(entry.get("reason") or "")
+                    and timestamp >= parse_time(entry.get("time")))
+
+    def mark_rewrite(self):
+        """已有流水被修改/删除时调用，下次同步时重建"""
+        self._rewrite = True
+
+    def sync(self, entries: List[Dict], generation: int):
+        """把积分流水中新增的条目追加到账本；流水变短或被标记重写时重建"""
+        with self._lock:
+            if generation < self._generation:
+                return
+            self._generation = generation
+            if self._rewrite or len(entries) < self._count:
+                self.rebuild(entries)
+            elif len(entries) > self._count:
+                self._append(entries[self._count:])
+
+    # ==================== 查询 ====================
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def balance(self) -> int:
+        """所有流水的累计积分"""
+        return self._balance
+
+    def _balance_through(self, n: int) -> int:
+        """前n条记录的累计余额：最近的检查点 + 不超过一个区间的求和"""
+        block = n // CHECKPOINT_INTERVAL
+        base = self._checkpoints[block - 1] if block else 0
+        return base + self._sum(block * CHECKPOINT_INTERVAL, n)
+
+    def count_until(self, when: Union[str, datetime, int, float]) -> int:
+        """时间不晚于when的记录条数（二分查找）"""
+        timestamp = parse_time(when)
+        with self._lock:
+            low, high = 0, self._count
+            while low < high:
+                mid = (low + high) // 2
+                if self._time_at(mid) <= timestamp:
+                    low = mid + 1
+                else:
+                    high = mid
+            return low
+
+    def balance_at(self, when: Union[str, datetime, int, float]) -> int:
+        """截至某一时刻（含）的累计积分"""
+        with self._lock:
+            return self._balance_through(self.count_until(when))
+
+    def verify(self, total: int) -> bool:
+        """核对积分总额与流水累计是否一致"""
+        return self._balance == total
+
+    def page(self, offset: int = 0, limit: int = 50, newest_first: bool = True) -> List[Dict]:
+        """
+        分页读取流水（默认最新的在前），每条附带该条之后的余额
+        :return: [{"time", "reason", "points", "target_id", "balance"}, ...]
+        """
+        with self._lock:
+            if newest_first:
+                end = max(self._count - offset, 0)
+                start = max(end - limit, 0)
+            else:
+                start = min(offset, self._count)
+                end = min(start + limit, self._count)
+            balance = self._balance_through(start)
+            items = []
+            for i in range(start, end):
+                timestamp, delta, target_idx, reason_idx = self._record(i)
+                balance += delta
+                items.append({
+                    "time": datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT),
+                    "reason": self._names[NAME_REASON][reason_idx],
+                    "points": delta,
+                    "target_id": self._names[NAME_TARGET][target_idx] or None,
+                    "balance": balance,
+                })
+            return items[::-1] if newest_first else items
+
+    def close(self):
+        with self._lock:
+            self._close_map()
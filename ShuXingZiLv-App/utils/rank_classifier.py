@@ -0,0 +1,49 @@
+from typing import Dict, List
+
+DEFAULT_RANK = "F"  # 没有规则匹配时的段位（与原get_ability_rank一致）
+TABLE_SCALE = 10  # 查表精度0.1，与update_ability_value中round(value, 1)一致
+TABLE_SIZE = 100 * TABLE_SCALE + 1  # 0.0 ~ 100.0
+
+
+class RankClassifier:
+    """
+    预编译的段位判定器：段位规则保存时构建一次，之后判定不再排序
+    0~100之间0.1精度的数值直接查表，其他数值按预排序的规则逐条匹配（结果与原逻辑一致）
+    """
+
+    def __init__(self, rank_rules: List[Dict]):
+        # 按最小值降序排序（确保高段位优先匹配）
+        self._rules = [(rule["min"], rule["max"], rule["rank"])
+                       for rule in sorted(rank_rules, key=lambda x: x["min"], reverse=True)]
+        self._table = [self._match(i / TABLE_SCALE) for i in range(TABLE_SIZE)]
+        self._np_table = None  # NumPy查表数组（首次批量判定时才构建）
+
+    def _match(self, value: float) -> str:
+        for low, high, rank in self._rules:
+            if low <= value <= high:
+                return rank
+        return DEFAULT_RANK
+
+    def classify(self, value: float) -> str:
+        """判定单个数值的段位"""
+        i = round(value * TABLE_SCALE)
+        if 0 <= i < TABLE_SIZE and i / TABLE_SCALE == value:
+            return self._table[i]
+        return self._match(value)
+
+    def classify_array(self, values):
+        """批量判定（NumPy向量化），返回段位字符串数组"""
+        import numpy as np
+
+        if self._np_table is None:
+            self._np_table = np.array(self._table, dtype=object)
+        values = np.asarray(values, dtype=float)
+        scaled = np.rint(values * TABLE_SCALE)
+        on_grid = (scaled >= 0) & (scaled < TABLE_SIZE) & (scaled / TABLE_SCALE == values)
+
+        result = np.empty(values.shape, dtype=object)
+        result[on_grid] = self._np_table[scaled[on_grid].astype(np.intp)]
+        # 不在0.1网格上的数值（很少见）逐个匹配
+        for pos in zip(*np.nonzero(~on_grid)):
+            result[pos] = self._match(float(values[pos]))
+        return result
@@ -0,0 +1,45 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class RatingSystemIndex:
+    """
+    评分系统索引：id→评分系统（与文档中的rating_systems列表共享同一批字典），
+    切换评分系统、保存修改时按id直接定位，不再线性查找rating_systems列表
+    """
+
+    def __init__(self, rating_systems: List[Dict]):
+        self.rating_systems = rating_systems  # 文档中的rating_systems列表（增删会同步修改它）
+        self.rebuild()
+
+    def rebuild(self):
+        self.by_id: Dict[str, Dict] = {rs.get("id"): rs for rs in self.rating_systems}
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, system_id):
+        return system_id in self.by_id
+
+    # ==================== 查询 ====================
+    def get(self, system_id: str) -> Optional[Dict]:
+        return self.by_id.get(system_id)
+
+    def first(self) -> Optional[Dict]:
+        return self.rating_systems[0] if self.rating_systems else None
+
+    def summaries(self) -> List[Tuple[str, str]]:
+        """[(id, 名称)]，按列表顺序（切换器只需要这些，不触碰能力项）"""
+        return [(rs.get("id"), rs.get("name", "")) for rs in self.rating_systems]
+
+    # ==================== 增量更新 ====================
+    def add(self, rating_system: Dict):
+        """添加评分系统（同时追加到rating_systems列表）"""
+        self.rating_systems.append(rating_system)
+        self.by_id[rating_system["id"]] = rating_system
+
+    def remove(self, system_id: str) -> Optional[Dict]:
+        """删除评分系统（同时从rating_systems列表移除）"""
+        rating_system = self.by_id.pop(system_id, None)
+        if rating_system is not None:
+            self.rating_systems[:] = [rs for rs in self.rating_systems if rs is not rating_system]
+        return rating_system
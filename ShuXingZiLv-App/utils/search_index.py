@@ -0,0 +1,130 @@
+import heapq
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+# ==================== 分词配置 ====================
+# 中日韩文字：连续的汉字按单字+二元组（bigram）建索引，不需要分词词典
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[^\W{_CJK}_]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+MAX_PREFIX_LENGTH = 16  # 英文/数字单词按前缀建索引的最大长度（输入"pyth"即可匹配"Python"）
+_EMPTY = frozenset()
+
+
+def normalize(text) -> str:
+    return str(text or "").lower()
+
+
+def index_terms(text: str) -> Set[str]:
+    """文档的索引词：汉字的单字和二元组，其他单词的各级前缀"""
+    terms = set()
+    for token in _TOKEN_RE.findall(normalize(text)):
+        if _CJK_RE.match(token):
+            terms.update(token)
+            terms.update(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.update(token[:i] for i in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1))
+    return terms
+
+
+def query_terms(query: str) -> Set[str]:
+    """查询词：汉字取二元组（单个汉字取单字），其他单词取（截断后的）前缀"""
+    terms = set()
+    for token in _TOKEN_RE.findall(normalize(query)):
+        if _CJK_RE.match(token):
+            terms.update([token] if len(token) == 1 else (token[i:i + 2] for i in range(len(token) - 1)))
+        else:
+            terms.add(token[:MAX_PREFIX_LENGTH])
+    return terms
+
+
+class SearchIndex:
+    """
+    内存倒排索引：索引词 -> 文档id集合，随增/改/删增量更新
+    查询时从最短的倒排列表开始求交集，再用原文做子串校验（排除二元组不相邻等误命中），
+    结果按文档加入索引的顺序返回
+    """
+
+    def __init__(self, items: List[Dict] = (), field: str = "name", key: str = "id"):
+        self.field = field  # 被索引的文本字段
+        self.key = key  # 文档id字段
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._docs: Dict[str, tuple] = {}  # 文档id -> (顺序号, 规范化文本, 索引词)
+        self._order: Dict[str, int] = {}  # 文档id -> 顺序号（排序结果用）
+        self._seq = 0
+        self.source = None  # 建立索引时的源列表（数据仓库据此判断是否需要重建）
+        self.source_size = 0  # 源列表条数（含没有id、未被索引的条目）
+        for item in items:
+            self.add_item(item)
+        self.source_size = len(items)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._docs
+
+    # ==================== 增量更新 ====================
+    def add(self, doc_id: str, text: str):
+        """添加文档；已存在时按新文本更新（保留原来的顺序）"""
+        old = self._docs.get(doc_id)
+        if old is not None:
+            seq = old[0]
+            self._unlink(doc_id, old[2])
+        else:
+            seq = self._seq
+            self._seq += 1
+            self.source_size += 1
+        terms = index_terms(text)
+        self._docs[doc_id] = (seq, normalize(text), terms)
+        self._order[doc_id] = seq
+        for term in terms:
+            self._postings[term].add(doc_id)
+
+    def add_item(self, item: Dict):
+        """按字段添加/更新一条目标或成长记录（没有id的条目不建索引）"""
+        doc_id = item.get(self.key) if isinstance(item, dict) else None
+        if doc_id is not None:
+            self.add(doc_id, item.get(self.field, ""))
+
+    def remove(self, doc_id: str) -> bool:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        del self._order[doc_id]
+        self._unlink(doc_id, doc[2])
+        self.source_size -= 1
+        return True
+
+    def remove_many(self, doc_ids: Iterable[str]):
+        for doc_id in doc_ids:
+            self.remove(doc_id)
+
+    def _unlink(self, doc_id: str, terms: Set[str]):
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[term]
+
+    # ==================== 查询 ====================
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """返回包含查询中所有词（空格分隔）的文档id，按加入顺序排列"""
+        pieces = normalize(query).split()
+        piece_terms = [query_terms(piece) for piece in pieces]
+        terms = set().union(*piece_terms)
+        if not terms:
+            return []
+        postings = sorted((self._postings.get(term, _EMPTY) for term in terms), key=len)
+        candidates = postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+        docs = self._docs
+        # 一个查询片段拆成多个索引词时，片段必须在原文中连续出现（排除各二元组都命中但并不相邻的情况）
+        long_pieces = [p for p, t in zip(pieces, piece_terms) if len(t) > 1 or not _TOKEN_RE.fullmatch(p)]
+        if long_pieces:
+            candidates = [doc_id for doc_id in candidates if all(p in docs[doc_id][1] for p in long_pieces)]
+        order = self._order
+        if limit is not None and limit < len(candidates):
+            return heapq.nsmallest(limit, candidates, key=order.__getitem__)
+        return sorted(candidates, key=order.__getitem__)
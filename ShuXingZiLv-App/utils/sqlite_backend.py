@@ -0,0 +1,345 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Collection, Dict, List, Optional
+from utils.history_journal import HISTORY_LISTS, get_history_list
+from utils.storage_backend import StorageBackend, JsonBackend, backup_file
+
+SCHEMA_VERSION = "1"
+
+# 数值列不声明类型（无类型亲和性），int/float原样存取，避免90读回来变成90.0
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS targets (
+    id TEXT PRIMARY KEY,
+    parent_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    deadline TEXT,
+    status TEXT,
+    points,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_targets_parent ON targets(parent_id, position);
+CREATE INDEX IF NOT EXISTS idx_targets_deadline ON targets(deadline);
+CREATE TABLE IF NOT EXISTS rating_systems (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS abilities (
+    id TEXT PRIMARY KEY,
+    rating_system_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    value,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_abilities_system ON abilities(rating_system_id, position);
+CREATE TABLE IF NOT EXISTS rank_rules (
+    rating_system_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    rank TEXT,
+    min,
+    max,
+    extra TEXT,
+    PRIMARY KEY (rating_system_id, position)
+);
+CREATE TABLE IF NOT EXISTS points_ledger (
+    seq INTEGER PRIMARY KEY,
+    time TEXT,
+    reason TEXT,
+    points,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_points_time ON points_ledger(time);
+CREATE TABLE IF NOT EXISTS growth_records (
+    seq INTEGER PRIMARY KEY,
+    id TEXT,
+    time TEXT,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_growth_time ON growth_records(time);
+"""
+
+# 表名 -> (主键列, 普通列)；行的最后一列固定为extra（放不进普通列的其余字段，JSON）
+TABLES = {
+    "targets": (("id",), ("parent_id", "position", "name", "deadline", "status", "points")),
+    "rating_systems": (("id",), ("position", "name")),
+    "abilities": (("id",), ("rating_system_id", "position", "name", "value")),
+    "rank_rules": (("rating_system_id", "position"), ("rank", "min", "max")),
+}
+# 主文档中已拆成表的顶层字段，其余顶层字段整体存到meta
+TABLE_KEYS = {"targets", "rating_systems", "growth_records", "points_account"}
+
+
+def _split(entry: Dict, fields, key_fields=()) -> tuple:
+    """
+    条目 -> (各列的值..., extra)：普通列和主键列之外的字段放进extra；
+    值为None的字段也写进extra，这样读回时能区分"字段为None"和"没有这个字段"
+    """
+    extra = {k: v for k, v in entry.items()
+             if k not in key_fields and (k not in fields or v is None)}
+    return tuple(entry.get(f) for f in fields) + (json.dumps(extra, ensure_ascii=False) if extra else None,)
+
+
+def _join(fields, row) -> Dict:
+    """(各列的值..., extra) -> 条目（_split的逆操作）"""
+    entry = {f: v for f, v in zip(fields, row) if v is not None}
+    if row[-1]:
+        entry.update(json.loads(row[-1]))
+    return entry
+
+
+def document_rows(data: Dict) -> Dict[str, Dict[tuple, tuple]]:
+    """把文档拆成各表的行：表名 -> {主键: 整行}"""
+    rows = {table: {} for table in TABLES}
+    for position, target in enumerate(data.get("targets", [])):
+        row = (target["id"],) + _split(dict(target, position=position), TABLES["targets"][1], ("id",))
+        rows["targets"][row[:1]] = row
+    for position, rs in enumerate(data.get("rating_systems", [])):
+        rs_fields = {k: v for k, v in rs.items() if k not in ("abilities", "rank_rules")}
+        row = (rs["id"],) + _split(dict(rs_fields, position=position), TABLES["rating_systems"][1], ("id",))
+        rows["rating_systems"][row[:1]] = row
+        for a_pos, ability in enumerate(rs.get("abilities", [])):
+            fields = dict(ability, rating_system_id=rs["id"], position=a_pos)
+            row = (ability["id"],) + _split(fields, TABLES["abilities"][1], ("id",))
+            rows["abilities"][row[:1]] = row
+        for r_pos, rule in enumerate(rs.get("rank_rules", [])):
+            row = (rs["id"], r_pos) + _split(rule, TABLES["rank_rules"][1])
+            rows["rank_rules"][row[:2]] = row
+    return rows
+
+
+class SqliteBackend(StorageBackend):
+    """
+    SQLite后端：目标、评分系统、能力项、段位规则、积分流水、成长记录各占一张表。
+    写入时与上次落盘的行逐行比较，只写变化的行；一次保存（包括check_parent_complete
+    这类级联修改）在同一个事务中提交，崩溃时要么全部生效要么全部不生效。
+    首次使用时自动从JSON文件迁移数据（JSON文件保留不动）。
+    """
+    name = "sqlite"
+
+    def __init__(self, path: str, json_path: str, journal_path: str,
+                 default_factory: Callable[[], Dict], migrate: Callable[[Dict], bool]):
+        self.path = path
+        self.json_path = json_path  # 迁移来源
+        self.journal_path = journal_path
+        self.default_factory = default_factory
+        self.migrate = migrate
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()  # 连接在GUI线程（读）和保存线程（写）之间共享
+        self._rows: Dict[str, Dict[tuple, tuple]] = {table: {} for table in TABLES}  # 已落盘的行
+        self._persisted = {key: 0 for key in HISTORY_LISTS}  # 各历史列表已写入的条数
+        self._synchronous = None
+
+    # ==================== 连接与事务 ====================
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA_SQL)
+            self._conn = conn
+            self._synchronous = None
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _meta(self, conn, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== 读取 ====================
+    def load(self) -> Dict:
+        with self._lock:
+            conn = self._connection()
+            if self._meta(conn, "schema_version") is None:
+                self._initialize(conn)
+            data = self._read_document(conn)
+            # 旧版本数据只在内存中升级，与JSON后端一样由DataStore经写锁写回
+            self.needs_write_back = self.migrate(data)
+            return data
+
+    def _initialize(self, conn):
+        """新建的数据库：从JSON文件一次性迁移（没有JSON文件时写入默认数据）"""
+        data, source = None, None
+        if os.path.exists(self.json_path):
+            # JsonBackend.load会回放history journal并升级旧数据（包括reward_points -> points），但不写回JSON文件
+            try:
+                data = JsonBackend(self.json_path, self.journal_path, self.default_factory, self.migrate).load()
+                source = self.json_path
+            except json.JSONDecodeError:
+                print(f"⚠️  {self.json_path} 格式错误，未迁移（文件保留不动），使用默认数据")
+        if data is None:
+            data = self.default_factory()
+
+        self._rows = {table: {} for table in TABLES}
+        self._persisted = {key: 0 for key in HISTORY_LISTS}
+        self._write_document(data, extra_meta={
+            "migrated_from": source or "",
+            "migrated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        if source:
+            print(f"✅ 已将 {source} 迁移到 {self.path}（原JSON文件保留作为备份）")
+        else:
+            print(f"✅ 初始化数据成功：创建 {self.path}")
+
+    def _read_document(self, conn) -> Dict:
+        rows = {table: {} for table in TABLES}
+        for table, (keys, fields) in TABLES.items():
+            columns = ", ".join(keys + fields + ("extra",))
+            for row in conn.execute(f"SELECT {columns} FROM {table}"):
+                rows[table][row[:len(keys)]] = row
+
+        target_fields = ("id",) + TABLES["targets"][1]
+        targets = sorted((_join(target_fields, row) for row in rows["targets"].values()),
+                         key=lambda t: t["position"])
+        for target in targets:
+            del target["position"]
+
+        abilities_of, rules_of = {}, {}
+        ability_fields = ("id",) + TABLES["abilities"][1]
+        for row in sorted(rows["abilities"].values(), key=lambda r: r[2]):
+            ability = _join(ability_fields, row)
+            del ability["position"]
+            abilities_of.setdefault(ability.pop("rating_system_id"), []).append(ability)
+        for row in sorted(rows["rank_rules"].values(), key=lambda r: r[1]):
+            rules_of.setdefault(row[0], []).append(_join(TABLES["rank_rules"][1], row[2:]))
+
+        rating_systems = []
+        rs_fields = ("id",) + TABLES["rating_systems"][1]
+        for row in sorted(rows["rating_systems"].values(), key=lambda r: r[1]):
+            rs = _join(rs_fields, row)
+            del rs["position"]
+            rs["abilities"] = abilities_of.get(rs["id"], [])
+            rs["rank_rules"] = rules_of.get(rs["id"], [])
+            rating_systems.append(rs)
+
+        data = json.loads(self._meta(conn, "document") or "{}")
+        data["targets"] = targets
+        data["rating_systems"] = rating_systems
+        data["points_account"] = json.loads(self._meta(conn, "points_account") or '{"total": 0}')
+        data["points_account"]["records"] = [
+            _join(("time", "reason", "points"), row)
+            for row in conn.execute("SELECT time, reason, points, extra FROM points_ledger ORDER BY seq")]
+        data["growth_records"] = [
+            json.loads(entry) for (entry,) in conn.execute("SELECT entry FROM growth_records ORDER BY seq")]
+
+        self._rows = rows
+        self._persisted = {key: len(get_history_list(data, key)) for key in HISTORY_LISTS}
+        return data
+
+    # ==================== 写入 ====================
+    def write(self, data: Dict, fsync: bool, rewrite: Collection[str] = ()):
+        with self._lock:
+            conn = self._connection()
+            synchronous = "FULL" if fsync else "OFF"
+            if synchronous != self._synchronous:
+                conn.execute(f"PRAGMA synchronous={synchronous}")  # 不能在事务中修改
+                self._synchronous = synchronous
+            self._write_document(data, rewrite)
+
+    def _write_document(self, data: Dict, rewrite: Collection[str] = (), extra_meta: Dict = None):
+        """在一个事务中写入与上次落盘相比变化的行（rewrite中的历史列表整表重写）"""
+        new_rows = document_rows(data)
+        with self._transaction() as conn:
+            for table, (keys, fields) in TABLES.items():
+                old, new = self._rows[table], new_rows[table]
+                removed = [key for key in old if key not in new]
+                if removed:
+                    where = " AND ".join(f"{k} = ?" for k in keys)
+                    conn.executemany(f"DELETE FROM {table} WHERE {where}", removed)
+                changed = [row for key, row in new.items() if old.get(key) != row]
+                if changed:
+                    columns = keys + fields + ("extra",)
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+                        f"VALUES ({', '.join('?' * len(columns))})", changed)
+
+            self._write_history(conn, data, rewrite)
+
+            doc_meta = {k: v for k, v in data.items() if k not in TABLE_KEYS}
+            account = {k: v for k, v in data.get("points_account", {}).items() if k != "records"}
+            meta = {"schema_version": SCHEMA_VERSION,
+                    "document": json.dumps(doc_meta, ensure_ascii=False),
+                    "points_account": json.dumps(account, ensure_ascii=False)}
+            meta.update(extra_meta or {})
+            conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+        self._rows = new_rows
+        self._persisted = {key: len(get_history_list(data, key)) for key in HISTORY_LISTS}
+
+    def _write_history(self, conn, data: Dict, rewrite):
+        """历史列表只插入新增条目；有条目被修改/删除时整表重写"""
+        for key, table in (("points", "points_ledger"), ("growth", "growth_records")):
+            entries = get_history_list(data, key)
+            start = self._persisted[key]
+            if key in rewrite or len(entries) < start:
+                conn.execute(f"DELETE FROM {table}")
+                start = 0
+            if start >= len(entries):
+                continue
+            if key == "points":
+                conn.executemany(
+                    "INSERT INTO points_ledger (seq, time, reason, points, extra) VALUES (?, ?, ?, ?, ?)",
+                    [(seq,) + _split(entry, ("time", "reason", "points"))
+                     for seq, entry in enumerate(entries[start:], start)])
+            else:
+                conn.executemany(
+                    "INSERT INTO growth_records (seq, id, time, entry) VALUES (?, ?, ?, ?)",
+                    [(seq, entry.get("id"), entry.get("time"), json.dumps(entry, ensure_ascii=False))
+                     for seq, entry in enumerate(entries[start:], start)])
+
+    # ==================== 其他 ====================
+    def stat(self):
+        # 只看数据库和-wal文件的修改时间/大小，不取连接锁：后台保存事务进行中时GUI线程读数据也不会被阻塞
+        # （自己的写入也会改变文件状态，DataStore在每次落盘后会更新记录的状态）
+        marks = []
+        for path in (self.path, self.path + "-wal"):
+            try:
+                st = os.stat(path)
+                marks.extend((st.st_mtime_ns, st.st_size))
+            except OSError:
+                if path == self.path:
+                    return None
+                marks.extend((0, 0))
+        return tuple(marks)
+
+    def backup_corrupt(self) -> str:
+        with self._lock:
+            self.close()
+            self._rows = {table: {} for table in TABLES}
+            self._persisted = {key: 0 for key in HISTORY_LISTS}
+            backup_path = backup_file(self.path)
+            # -wal中可能有尚未checkpoint的已提交事务：跟着数据库一起改名，备份仍可直接用SQLite打开
+            for suffix in ("-wal", "-shm"):
+                try:
+                    os.replace(self.path + suffix, backup_path + suffix)
+                except OSError:
+                    pass
+            return backup_path
+
+    def recover_history(self) -> Dict[str, List]:
+        # 历史列表与主数据在同一个数据库文件中，无法单独恢复
+        return {}
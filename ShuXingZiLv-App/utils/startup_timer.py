@@ -0,0 +1,52 @@
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+PROCESS_START = time.perf_counter()  # 以本模块被导入的时刻作为启动起点（main.py第一行导入）
+
+
+class StartupTimer:
+    """启动耗时统计：记录各模块导入耗时和关键时间点（如首帧绘制），用于跟踪冷启动回归"""
+
+    def __init__(self):
+        self.durations = {}  # 名称 -> 耗时(ms)
+        self.milestones = {}  # 名称 -> 距启动起点的时间(ms)
+        self.reported = False
+
+    @contextmanager
+    def measure(self, name: str):
+        """统计一段代码（通常是import）的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = (time.perf_counter() - start) * 1000
+
+    def mark(self, name: str):
+        """记录距启动起点的时间"""
+        self.milestones[name] = (time.perf_counter() - PROCESS_START) * 1000
+
+    def report(self, log_path: str = None):
+        """打印统计结果；传入log_path时追加一行JSON，便于对比历史数据"""
+        self.reported = True
+        print("⏱️  启动耗时统计：")
+        for name, ms in self.durations.items():
+            print(f"    {name:<32}{ms:8.1f} ms")
+        for name, ms in self.milestones.items():
+            print(f"    [{name}]{'':<{max(0, 30 - len(name))}}{ms:8.1f} ms")
+
+        if log_path:
+            record = {
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "durations_ms": {k: round(v, 2) for k, v in self.durations.items()},
+                "milestones_ms": {k: round(v, 2) for k, v in self.milestones.items()},
+            }
+            try:
+                with open(log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            except OSError as e:
+                print(f"❌ 写入启动耗时日志失败：{str(e)}")
+
+
+startup_timer = StartupTimer()
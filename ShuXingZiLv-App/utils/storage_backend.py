@@ -0,0 +1,101 @@
+import json
+import os
+from datetime import datetime
+from typing import Callable, Collection, Dict, List
+from utils.history_journal import HistoryJournal, set_history_list, strip_history
+from utils.atomic_file import atomic_write_json
+
+
+class StorageBackend:
+    """
+    存储后端接口：DataStore只通过这几个方法读写磁盘，内存中始终是同一份文档结构
+    （targets / rating_systems / growth_records / points_account）
+    """
+    name = ""
+    needs_write_back = False  # 最近一次load()是否在内存中升级了旧数据，需要由DataStore经写锁写回
+
+    def load(self) -> Dict:
+        """读取完整文档（首次访问或外部修改后调用）"""
+        raise NotImplementedError
+
+    def write(self, data: Dict, fsync: bool, rewrite: Collection[str] = ()):
+        """持久化文档（调用方保证串行调用）；rewrite为这份文档中有已有条目被修改/删除的历史列表"""
+        raise NotImplementedError
+
+    def stat(self):
+        """返回可比较的存储状态标记，变化说明数据被外部修改；不存在时返回None"""
+        raise NotImplementedError
+
+    def backup_corrupt(self) -> str:
+        """把无法解析的数据文件改名保留，返回备份路径"""
+        raise NotImplementedError
+
+    def recover_history(self) -> Dict[str, List]:
+        """数据文件损坏时，尽量从其他位置恢复历史列表"""
+        return {}
+
+    def close(self):
+        pass
+
+
+def backup_file(path: str) -> str:
+    """损坏的文件改名保留（加时间戳后缀），返回备份路径"""
+    backup_path = f"{path}.corrupt_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    try:
+        os.replace(path, backup_path)
+    except OSError:
+        pass
+    return backup_path
+
+
+class JsonBackend(StorageBackend):
+    """
+    JSON文件后端：主文档原子写入user_data.json，
+    积分流水和成长记录追加到同目录的history journal中
+    """
+    name = "json"
+
+    def __init__(self, path: str, journal_path: str,
+                 default_factory: Callable[[], Dict], migrate: Callable[[Dict], bool]):
+        self.path = path
+        self.journal = HistoryJournal(journal_path)
+        self.default_factory = default_factory  # 文件不存在时生成默认文档
+        self.migrate = migrate  # 旧版本数据升级（返回是否执行了迁移）
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> Dict:
+        """读取文档；旧版本数据只在内存中升级，由DataStore经写锁写回（见needs_write_back）"""
+        if not self.exists():
+            # 直接原子写文件（不经过data_store，避免在加载过程中重入写锁）
+            atomic_write_json(self.path, self.default_factory())
+            print(f"✅ 初始化数据成功：创建 {self.path}")
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        # 有journal时历史列表以journal为准；没有时（旧版数据）沿用主文件中的列表，首次写入时迁移
+        for key, entries in self.journal.load().items():
+            set_history_list(data, key, entries)
+        # 不在这里直接写文件：加载时不持有写锁，会与后台线程的快照写入并发
+        self.needs_write_back = self.migrate(data)
+        return data
+
+    def write(self, data: Dict, fsync: bool, rewrite: Collection[str] = ()):
+        """先追加历史增量，再原子替换主文件（主文件不含历史列表）"""
+        self.journal.fsync = fsync
+        self.journal.sync(data, rewrite)
+        atomic_write_json(self.path, strip_history(data), fsync=fsync)
+
+    def stat(self):
+        try:
+            st = os.stat(self.path)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def backup_corrupt(self) -> str:
+        return backup_file(self.path)
+
+    def recover_history(self) -> Dict[str, List]:
+        # 积分流水/成长记录不在主文件中，仍可从history journal恢复
+        return self.journal.load()
@@ -0,0 +1,227 @@
+import warnings
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from utils.deadline_index import DONE_STATUS, parse_deadline
+
+# ==================== 汇总列 ====================
+POINTS, DONE, TOTAL, OVERDUE = range(4)  # 子树积分、已完成数、目标数、逾期数
+COLUMNS = 4
+BATCH_RECOMPUTE_THRESHOLD = 64  # 一次修改的目标超过这个数时整体自底向上重算，否则沿祖先路径增量更新
+MAX_DEPTH = 1024  # 深度超过这个值（或parent_id成环）的目标不向上汇总
+
+
+class TargetAggregates:
+    """
+    目标子树汇总：把目标排成数组（父节点下标数组 + 自身积分/完成/截止时间），
+    用NumPy按层自底向上一次算出每个目标子树（含自身）的积分合计、已完成数/目标数、逾期未完成数；
+    单个目标变化时只沿祖先路径加上差值，批量变化时整体重算
+    """
+
+    def __init__(self, targets: List[Dict], today: date = None):
+        self.today = (today or date.today()).toordinal()
+        self.source = None  # 建立索引时的targets列表（数据仓库据此判断是否需要重建）
+        self._pos: Dict[str, int] = {}  # 目标id -> 数组下标
+        parent_ids, points, done, deadlines = [], [], [], []
+        for target in targets:
+            target_id = target.get("id")
+            if target_id is None or target_id in self._pos:
+                continue
+            self._pos[target_id] = len(parent_ids)
+            parent_ids.append(target.get("parent_id"))
+            points.append(self._points_of(target))
+            done.append(target.get("status") == DONE_STATUS)
+            deadlines.append(self._deadline_of(target))
+        self._n = len(parent_ids)
+        capacity = max(16, self._n)
+        self._parent = np.full(capacity, -1, dtype=np.int64)
+        self._parent[:self._n] = [self._pos.get(pid, -1) for pid in parent_ids]
+        self._points = np.zeros(capacity, dtype=np.float64)
+        self._points[:self._n] = points
+        self._done = np.zeros(capacity, dtype=bool)
+        self._done[:self._n] = done
+        self._deadline = np.full(capacity, -1, dtype=np.int64)  # 日期序数，无法解析为-1
+        self._deadline[:self._n] = deadlines
+        self._alive = np.zeros(capacity, dtype=bool)  # 已删除的目标保留空位，不参与汇总
+        self._alive[:self._n] = True
+        self._agg = np.zeros((capacity, COLUMNS), dtype=np.float64)
+        self.source_size = len(targets)
+        self.recompute()
+
+    def __len__(self):
+        return len(self._pos)
+
+    def __contains__(self, target_id):
+        return target_id in self._pos
+
+    @staticmethod
+    def _points_of(target: Dict) -> float:
+        try:
+            return float(target.get("points", 0) or 0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @staticmethod
+    def _deadline_of(target: Dict) -> int:
+        ordinal = parse_deadline(target.get("deadline"))
+        return -1 if ordinal is None else ordinal
+
+    # ==================== 计算 ====================
+    def _own(self, idx) -> np.ndarray:
+        """目标自身的汇总值（idx可以是下标或下标数组）"""
+        idx = np.atleast_1d(idx)
+        alive = self._alive[idx]
+        done = self._done[idx] & alive
+        deadline = self._deadline[idx]
+        own = np.empty((len(idx), COLUMNS), dtype=np.float64)
+        own[:, POINTS] = np.where(alive, self._points[idx], 0.0)
+        own[:, DONE] = done
+        own[:, TOTAL] = alive
+        own[:, OVERDUE] = alive & ~done & (deadline >= 0) & (deadline < self.today)
+        return own
+
+    @staticmethod
+    def _depths(parent: np.ndarray):
+        """
+        每个目标的深度（指针倍增：每轮把"到当前祖先的距离"加上祖先的距离，祖先跳到祖先的祖先，
+        O(n·log depth)）；返回(深度, 过深或父子关系成环、无法正常汇总的目标掩码)
+        """
+        depth = (parent >= 0).astype(np.int64)
+        ancestor = parent.copy()
+        for _ in range(MAX_DEPTH.bit_length()):
+            pending = np.flatnonzero(ancestor >= 0)
+            if not len(pending):
+                break
+            up = ancestor[pending]
+            depth[pending] += depth[up]
+            ancestor[pending] = ancestor[up]
+        return depth, (ancestor >= 0) | (depth > MAX_DEPTH)
+
+    def recompute(self):
+        """
+        整体自底向上重算：按深度分层（计数排序），从最深一层开始把每层目标的汇总值用np.add.at累加到父节点，
+        每个目标只参与一次累加，O(n)（另有每层一次的固定开销）
+        """
+        n = self._n
+        parent = self._parent[:n]
+        depth, cut = self._depths(parent)
+        while cut.any():
+            # 断开这些目标与父节点的联系（它们各自作为根汇总），增量更新沿祖先路径上移时也不会陷入环
+            warnings.warn(f"{int(cut.sum())}个目标的父子关系过深或成环，不参与上级目标的子树汇总", RuntimeWarning)
+            parent[cut] = -1
+            depth, cut = self._depths(parent)
+        agg = self._own(np.arange(n))
+        order = np.argsort(depth.astype(np.int16), kind="stable")  # 深度不超过MAX_DEPTH，按小整数基数排序
+        bounds = np.searchsorted(depth[order], np.arange(int(depth.max(initial=0)) + 2))
+        for level in range(len(bounds) - 2, 0, -1):
+            idx = order[bounds[level]:bounds[level + 1]]
+            np.add.at(agg, parent[idx], agg[idx])
+        self._agg[:n] = agg
+
+    def _propagate(self, i: int, delta: np.ndarray):
+        """把差值加到目标自身和所有祖先上"""
+        for _ in range(MAX_DEPTH + 1):
+            if i < 0:
+                return
+            self._agg[i] += delta
+            i = int(self._parent[i])
+
+    def refresh_today(self, today: date = None) -> bool:
+        """日期变化后（跨过零点）重算逾期数，返回是否重算"""
+        ordinal = (today or date.today()).toordinal()
+        if ordinal == self.today:
+            return False
+        self.today = ordinal
+        self.recompute()
+        return True
+
+    # ==================== 增量更新 ====================
+    def _grow(self):
+        capacity = len(self._parent) * 2
+        for name in ("_parent", "_points", "_done", "_deadline", "_alive"):
+            array = getattr(self, name)
+            grown = np.full(capacity, -1 if name in ("_parent", "_deadline") else 0, dtype=array.dtype)
+            grown[:len(array)] = array
+            setattr(self, name, grown)
+        agg = np.zeros((capacity, COLUMNS), dtype=np.float64)
+        agg[:len(self._agg)] = self._agg
+        self._agg = agg
+
+    def _store(self, target: Dict) -> Optional[int]:
+        """写入目标自身的字段，返回下标；父节点变了（移动）时返回None，需要整体重算"""
+        target_id = target.get("id")
+        i = self._pos.get(target_id)
+        parent = self._pos.get(target.get("parent_id"), -1)
+        if i is None:
+            if self._n == len(self._parent):
+                self._grow()
+            i = self._pos[target_id] = self._n
+            self._n += 1
+            self._alive[i] = True
+            self._parent[i] = parent
+            self.source_size += 1
+        elif self._parent[i] != parent:
+            self._parent[i] = parent
+            i = None
+        index = i if i is not None else self._pos[target_id]
+        self._points[index] = self._points_of(target)
+        self._done[index] = target.get("status") == DONE_STATUS
+        self._deadline[index] = self._deadline_of(target)
+        return i
+
+    def add_item(self, target: Dict):
+        """添加目标，或目标的积分/状态/截止时间/父节点变化后调用"""
+        self.add_many([target])
+
+    def add_many(self, targets: Iterable[Dict]):
+        """批量添加/更新目标（如完成状态联动），数量多时整体重算"""
+        targets = [t for t in targets if t.get("id") is not None]
+        if len(targets) > BATCH_RECOMPUTE_THRESHOLD:
+            for target in targets:
+                self._store(target)
+            self.recompute()
+            return
+        for target in targets:
+            i = self._pos.get(target["id"])
+            old = self._own(i)[0] if i is not None else np.zeros(COLUMNS)
+            stored = self._store(target)
+            if stored is None:
+                self.recompute()
+                continue
+            if i is None:
+                self._agg[stored] = 0.0  # 新目标：子树只有自身
+            self._propagate(stored, self._own(stored)[0] - old)
+
+    def remove(self, target_id: str) -> bool:
+        return self.remove_many([target_id]) > 0
+
+    def remove_many(self, target_ids: Iterable[str]) -> int:
+        """删除目标（删除子树时传入整棵子树的id），返回实际删除的数量"""
+        indexes = [self._pos.pop(tid) for tid in target_ids if tid in self._pos]
+        if len(indexes) > BATCH_RECOMPUTE_THRESHOLD:
+            self._alive[indexes] = False
+            self.recompute()
+        else:
+            for i in indexes:
+                delta = -self._own(i)[0]
+                self._alive[i] = False
+                self._propagate(i, delta)
+        self.source_size -= len(indexes)
+        return len(indexes)
+
+    # ==================== 查询 ====================
+    def get(self, target_id: str) -> Optional[Dict]:
+        """目标子树（含自身）的汇总：积分合计、已完成数、目标数、完成率、逾期未完成数"""
+        i = self._pos.get(target_id)
+        if i is None:
+            return None
+        points, done, total, overdue = self._agg[i]
+        return {
+            "points": int(points) if points.is_integer() else float(points),
+            "done": int(done),
+            "total": int(total),
+            "completion": float(done / total) if total else 0.0,
+            "overdue": int(overdue),
+        }
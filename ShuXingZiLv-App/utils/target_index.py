@@ -0,0 +1,127 @@
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+ROOT_ID = "root"  # 根节点的parent_id
+
+
+def _remove_item(items: List[Dict], target: Dict):
+    """按对象身份从列表中移除（避免字典按值比较误删内容相同的目标）"""
+    for i, item in enumerate(items):
+        if item is target:
+            del items[i]
+            return
+
+
+class TargetIndex:
+    """
+    目标索引：id→目标、parent_id→有序子目标列表，并缓存深度/子树大小
+    每次加载数据时构建一次，之后随增/改/删增量更新，避免反复线性扫描targets列表
+    """
+
+    def __init__(self, targets: List[Dict]):
+        self.targets = targets  # 文档中的targets列表（增删会同步修改它）
+        self.rebuild()
+
+    def rebuild(self):
+        """根据targets列表重建全部索引"""
+        self.by_id: Dict[str, Dict] = {}
+        self._children: Dict[str, List[Dict]] = defaultdict(list)
+        for target in self.targets:
+            self.by_id[target.get("id")] = target
+            self._children[target.get("parent_id", ROOT_ID)].append(target)
+        self._depth: Dict[str, int] = {}
+        self._subtree_size: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __contains__(self, target_id):
+        return target_id in self.by_id
+
+    # ==================== 查询 ====================
+    def get(self, target_id: str) -> Optional[Dict]:
+        return self.by_id.get(target_id)
+
+    def children_of(self, parent_id: str) -> List[Dict]:
+        """返回子目标列表（按添加顺序，调用方不要直接修改）"""
+        return self._children.get(parent_id, [])
+
+    def roots(self) -> List[Dict]:
+        return self.children_of(ROOT_ID)
+
+    def ancestors(self, target_id: str) -> List[str]:
+        """返回祖先id列表（由近及远，不含root）"""
+        result = []
+        seen = {target_id}  # 防御环形parent_id
+        target = self.by_id.get(target_id)
+        while target is not None:
+            parent_id = target.get("parent_id", ROOT_ID)
+            if parent_id == ROOT_ID or parent_id in seen:
+                break
+            result.append(parent_id)
+            seen.add(parent_id)
+            target = self.by_id.get(parent_id)
+        return result
+
+    def iter_subtree(self, target_id: str, include_self: bool = True) -> Iterator[Dict]:
+        """深度优先遍历子树（非递归，深层任务树不会触发递归上限）"""
+        if include_self and target_id in self.by_id:
+            yield self.by_id[target_id]
+        stack = list(reversed(self.children_of(target_id)))
+        while stack:
+            target = stack.pop()
+            yield target
+            stack.extend(reversed(self.children_of(target["id"])))
+
+    def depth(self, target_id: str) -> int:
+        """节点深度（根节点下的目标为0），带缓存"""
+        if target_id not in self._depth:
+            self._depth[target_id] = len(self.ancestors(target_id))
+        return self._depth[target_id]
+
+    def subtree_size(self, target_id: str) -> int:
+        """子树节点数（含自身），带缓存"""
+        if target_id not in self._subtree_size:
+            self._subtree_size[target_id] = sum(1 for _ in self.iter_subtree(target_id))
+        return self._subtree_size[target_id]
+
+    # ==================== 增量更新 ====================
+    def _invalidate_ancestors(self, target_id: str):
+        for ancestor_id in self.ancestors(target_id):
+            self._subtree_size.pop(ancestor_id, None)
+
+    def add(self, target: Dict):
+        """添加目标（同时追加到targets列表）"""
+        self.targets.append(target)
+        self.by_id[target["id"]] = target
+        self._children[target.get("parent_id", ROOT_ID)].append(target)
+        self._invalidate_ancestors(target["id"])
+
+    def move(self, target_id: str, new_parent_id: str):
+        """修改目标的父节点"""
+        target = self.by_id[target_id]
+        self._invalidate_ancestors(target_id)
+        _remove_item(self._children.get(target.get("parent_id", ROOT_ID), []), target)
+        target["parent_id"] = new_parent_id
+        self._children[new_parent_id].append(target)
+        self._invalidate_ancestors(target_id)
+        for node in self.iter_subtree(target_id):
+            self._depth.pop(node["id"], None)
+
+    def remove_subtree(self, target_id: str) -> List[str]:
+        """删除目标及全部子孙（同时从targets列表移除），返回被删除的id列表"""
+        target = self.by_id.get(target_id)
+        if target is None:
+            return []
+        self._invalidate_ancestors(target_id)
+        removed = [node["id"] for node in self.iter_subtree(target_id)]
+        _remove_item(self._children.get(target.get("parent_id", ROOT_ID), []), target)
+        for node_id in removed:
+            self.by_id.pop(node_id, None)
+            self._children.pop(node_id, None)
+            self._depth.pop(node_id, None)
+            self._subtree_size.pop(node_id, None)
+        # 一次过滤完成列表删除，避免逐个list.remove的O(n²)
+        removed_set = set(removed)
+        self.targets[:] = [t for t in self.targets if t.get("id") not in removed_set]
+        return removed